@@ -0,0 +1,72 @@
+"""
+Benchmark big-integer base conversion against the builtin int() and str().
+
+Parses and formats random numbers of 10^5 to 10^7 decimal digits with the
+divide-and-conquer conversions in convert/radix.py, in decimal and base58.
+The quadratic builtins are only timed up to --builtin-max digits, since they
+take tens of minutes at 10^7.
+
+Usage: python benchmarks/bench_base_bigint.py [--digits N ...] [--builtin-max N]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from util.commands.convert.radix import BASE58, format_int, parse_int, radix_digits
+
+DECIMAL = radix_digits(10)
+
+
+def timed(func):
+    """Return (result, duration in seconds) of one call."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def report(digits, case, seconds):
+    """Print the duration and throughput of one case."""
+    rate = digits / seconds / 1_000_000
+    print(f"{digits:>10} {case:<28} {seconds:9.2f} s  {rate:6.2f} M digits/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Big-integer base conversion benchmark"
+    )
+    parser.add_argument("--digits", type=int, nargs="+", default=[10**5, 10**6, 10**7])
+    parser.add_argument("--builtin-max", type=int, default=10**6)
+    args = parser.parse_args()
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    rng = random.Random(0)
+    for digits in args.digits:
+        text = str(rng.randrange(1, 10)) + "".join(
+            rng.choices("0123456789", k=digits - 1)
+        )
+
+        num, seconds = timed(lambda: parse_int(text, DECIMAL))
+        report(digits, "parse decimal", seconds)
+        if digits <= args.builtin_max:
+            _, seconds = timed(lambda: int(text))
+            report(digits, "parse decimal, int()", seconds)
+
+        result, seconds = timed(lambda: format_int(num, DECIMAL))
+        assert result == text
+        report(digits, "format decimal", seconds)
+        if digits <= args.builtin_max:
+            _, seconds = timed(lambda: str(num))
+            report(digits, "format decimal, str()", seconds)
+
+        encoded, seconds = timed(lambda: format_int(num, BASE58))
+        report(digits, "format base58", seconds)
+        decoded, seconds = timed(lambda: parse_int(encoded, BASE58))
+        assert decoded == num
+        report(digits, "parse base58", seconds)
+
+
+if __name__ == "__main__":
+    main()
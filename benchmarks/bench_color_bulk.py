@@ -0,0 +1,84 @@
+"""
+Benchmark bulk color conversion against converting one value at a time.
+
+Converts a mix of hex, rgb(), hsl() and integer colors, and looks up their
+nearest named colors, with the per-value convert() used for single colors and
+with convert_many() on both the NumPy and pure-Python backends.
+
+Usage: python benchmarks/bench_color_bulk.py [--colors N]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from util.commands.convert import color
+
+
+def make_colors(count, seed=0):
+    """Build a list of colors in every input format."""
+    rng = random.Random(seed)
+    formats = [
+        lambda r, g, b: f"#{r:02x}{g:02x}{b:02x}",
+        lambda r, g, b: f"rgb({r}, {g}, {b})",
+        lambda r, g, b: "hsl({}, {}%, {}%)".format(*color.rgb_to_hsl(r, g, b)),
+        lambda r, g, b: str((r << 16) | (g << 8) | b),
+    ]
+    colors = []
+    for i in range(count):
+        rgb = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+        colors.append(formats[i % len(formats)](*rgb))
+    return colors
+
+
+@contextlib.contextmanager
+def backend(name):
+    """Select the bulk conversion backend for the duration of a case."""
+    previous = os.environ.get("UTIL_COLOR_BACKEND")
+    os.environ["UTIL_COLOR_BACKEND"] = name
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["UTIL_COLOR_BACKEND"]
+        else:
+            os.environ["UTIL_COLOR_BACKEND"] = previous
+
+
+def timed(func):
+    """Return the duration of one call in seconds."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk color conversion benchmark")
+    parser.add_argument("--colors", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    colors = make_colors(args.colors)
+    backends = [("python", "pure Python")]
+    if color.numpy_module() is not None:
+        backends.append(("numpy", "NumPy"))
+    else:
+        print("NumPy not installed; only the pure-Python backend is measured")
+
+    print(f"{args.colors} mixed colors")
+    for target in ["hex", "hsl", "name"]:
+        seconds = timed(lambda: [color.convert(value, target) for value in colors])
+        print(f"to {target:<4} {'one at a time':<20} {seconds * 1000:9.0f} ms")
+        for name, label in backends:
+            with backend(name):
+                seconds = timed(lambda: color.convert_many(colors, target))
+            rate = args.colors / seconds / 1_000_000
+            print(
+                f"to {target:<4} {'bulk, ' + label:<20} {seconds * 1000:9.0f} ms"
+                f"  {rate:5.2f} M colors/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
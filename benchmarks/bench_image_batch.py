@@ -0,0 +1,73 @@
+"""
+Benchmark batch image conversion throughput in images/s.
+
+Compares one `util convert file` process per image (the old shell loop)
+with `convert_image_batch` running inline and in a process pool.
+
+Usage: python benchmarks/bench_image_batch.py [--images N] [--size PX]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from util.commands.convert.file import convert_image_batch
+
+
+def make_images(directory, count, size):
+    """Write count noisy RGBA PNGs so encoding does real work."""
+    for i in range(count):
+        img = Image.effect_noise((size, size), 64 + i % 64).convert("RGBA")
+        img.save(os.path.join(directory, f"img{i:04d}.png"))
+
+
+def report(name, count, seconds):
+    print(f"{name:<32} {seconds:7.2f}s  {count / seconds:8.1f} images/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch image conversion benchmark")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--size", type=int, default=512)
+    parser.add_argument(
+        "--loop-sample",
+        type=int,
+        default=20,
+        help="Images to convert with one process each (slow)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "src")
+        os.makedirs(src)
+        make_images(src, args.images, args.size)
+        pattern = os.path.join(src, "*.png")
+        print(f"{args.images} images, {args.size}x{args.size} PNG -> JPG")
+
+        sample = sorted(os.listdir(src))[: args.loop_sample]
+        start = time.perf_counter()
+        for name in sample:
+            subprocess.run(
+                [sys.executable, "-m", "util.main", "convert", "file"]
+                + [os.path.join(src, name), os.path.join(tmpdir, name + ".jpg")],
+                check=True,
+                capture_output=True,
+            )
+        report("process per image (loop)", len(sample), time.perf_counter() - start)
+
+        for jobs in sorted({1, os.cpu_count() or 1}):
+            out_dir = os.path.join(tmpdir, f"out{jobs}")
+            start = time.perf_counter()
+            results = convert_image_batch(pattern, out_dir, ".jpg", jobs=jobs)
+            elapsed = time.perf_counter() - start
+            assert all(result[2] for result in results)
+            report(f"--batch --jobs {jobs}", len(results), elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark peak memory of flattening transparent images to JPEG.
+
+Compares the previous flatten (convert to RGBA, split bands, paste onto a
+white background) with the current one, and with --low-memory strip decoding,
+for RGBA PNG, palette PNG and uncompressed RGBA TIFF inputs. Each case runs
+in a fresh process so its peak RSS is measured in isolation.
+
+Usage: python benchmarks/bench_image_memory.py [--width W --height H]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from util.commands.convert.file import convert_image_file
+
+INPUTS = ["rgba.png", "palette.png", "rgba.tif"]
+CASES = [
+    ("paste after split", "legacy"),
+    ("paste through alpha", "lean"),
+    ("--low-memory strips", "strips"),
+]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_inputs(directory, width, height):
+    """Write the transparent test images into directory."""
+    photo = Image.effect_noise((width // 8, height // 8), 48)
+    photo = photo.resize((width, height), Image.BICUBIC).convert("RGB")
+    alpha = Image.linear_gradient("L").resize((width, height))
+    photo.putalpha(alpha)
+    photo.save(os.path.join(directory, "rgba.png"), compress_level=1)
+    photo.save(os.path.join(directory, "rgba.tif"))
+    photo.quantize(255).save(os.path.join(directory, "palette.png"), transparency=0)
+
+
+def legacy_flatten(input_file, output_file):
+    """The flatten used before paste-through-alpha, for comparison."""
+    with Image.open(input_file) as img:
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
+        background.save(output_file)
+
+
+def run_case(case, input_file, output_file):
+    """Run one case in this process and return (seconds, extra peak RSS MB)."""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if case == "legacy":
+        legacy_flatten(input_file, output_file)
+    else:
+        success, error = convert_image_file(
+            input_file, output_file, low_memory=case == "strips"
+        )
+        assert success, error
+    return time.perf_counter() - start, peak_rss_mb() - baseline
+
+
+def spawn(*args):
+    """Run this script in a fresh process (ru_maxrss survives exec, so the
+    parent never touches large images itself)."""
+    return subprocess.run(
+        [sys.executable, __file__] + [str(arg) for arg in args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alpha flattening memory benchmark")
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--make", help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.make:
+        make_inputs(args.make, args.width, args.height)
+        return
+    if args.case:
+        seconds, rss = run_case(args.case, args.input, args.output)
+        print(json.dumps({"seconds": seconds, "rss": rss}))
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spawn("--make", tmpdir, "--width", args.width, "--height", args.height)
+        output_file = os.path.join(tmpdir, "flat.jpg")
+
+        megapixels = args.width * args.height / 1_000_000
+        print(f"{megapixels:.1f} MP transparent images to JPEG")
+        print(f"{'input':<12} {'case':<22} {'time':>9} {'peak RSS':>10}")
+        for name in INPUTS:
+            input_file = os.path.join(tmpdir, name)
+            for label, case in CASES:
+                output = spawn(
+                    *("--case", case),
+                    *("--input", input_file, "--output", output_file),
+                )
+                metrics = json.loads(output)
+                print(
+                    f"{name:<12} {label:<22} {metrics['seconds'] * 1000:7.0f}ms "
+                    f"{metrics['rss']:8.1f}MB"
+                )
+
+
+if __name__ == "__main__":
+    main()
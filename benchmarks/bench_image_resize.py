@@ -0,0 +1,121 @@
+"""
+Benchmark thumbnail generation from 40-megapixel JPEGs.
+
+Compares a full-resolution decode (and resize) with the draft-mode path used
+by `util convert file --max-size/--thumbnail`. Each case runs in a fresh
+process so its peak RSS is measured in isolation.
+
+Usage: python benchmarks/bench_image_resize.py [--width W --height H --box PX]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from util.commands.convert.file import convert_image_file
+
+CASES = [
+    ("decode: full", "full-decode"),
+    ("decode: draft", "draft-decode"),
+    ("resize: full decode", "full-resize"),
+    ("resize: --max-size", "max-size"),
+    ("resize: --thumbnail", "thumbnail"),
+]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_photo(path, width, height):
+    """Write a noisy JPEG photo of the given size."""
+    photo = Image.effect_noise((width // 8, height // 8), 48)
+    photo = photo.resize((width, height), Image.BICUBIC)
+    photo.convert("RGB").save(path, quality=90)
+
+
+def run_case(case, input_file, output_file, box):
+    """Run one case in this process and return (seconds, extra peak RSS MB)."""
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if case in ("full-decode", "draft-decode"):
+        with Image.open(input_file) as img:
+            if case == "draft-decode":
+                img.draft(img.mode, box)
+            img.load()
+    elif case == "full-resize":
+        with Image.open(input_file) as img:
+            img.load()
+            img.thumbnail(box, Image.LANCZOS, reducing_gap=None)
+            img.save(output_file)
+    else:
+        success, error = convert_image_file(
+            input_file, output_file, max_size=box, thumbnail=case == "thumbnail"
+        )
+        assert success, error
+    return time.perf_counter() - start, peak_rss_mb() - baseline
+
+
+def spawn(*args):
+    """Run this script in a fresh process (ru_maxrss survives exec, so the
+    parent never touches large images itself)."""
+    return subprocess.run(
+        [sys.executable, __file__] + [str(arg) for arg in args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Draft-mode thumbnail benchmark")
+    parser.add_argument("--width", type=int, default=7728)
+    parser.add_argument("--height", type=int, default=5152)
+    parser.add_argument("--box", type=int, default=800)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--make", help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    box = (args.box, args.box)
+
+    if args.make:
+        make_photo(args.make, args.width, args.height)
+        return
+    if args.case:
+        seconds, rss = run_case(args.case, args.input, args.output, box)
+        print(json.dumps({"seconds": seconds, "rss": rss}))
+        return
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "photo.jpg")
+        output_file = os.path.join(tmpdir, "thumb.jpg")
+        spawn("--make", input_file, "--width", args.width, "--height", args.height)
+
+        megapixels = args.width * args.height / 1_000_000
+        print(f"{megapixels:.1f} MP JPEG, fit within {args.box}x{args.box}")
+        print(f"{'case':<22} {'time':>9} {'peak RSS':>10}")
+        for label, case in CASES:
+            output = spawn(
+                *("--case", case, "--box", args.box),
+                *("--input", input_file, "--output", output_file),
+            )
+            metrics = json.loads(output)
+            print(
+                f"{label:<22} {metrics['seconds'] * 1000:7.0f}ms "
+                f"{metrics['rss']:8.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
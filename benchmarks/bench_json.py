@@ -0,0 +1,77 @@
+"""
+Benchmark the JSON backend against the standard library on large payloads.
+
+Usage: python benchmarks/bench_json.py [--records N]
+"""
+
+import argparse
+import json
+import time
+
+from util.commands import json_backend
+
+
+def make_payload(records):
+    """Build a list of nested records similar to API/config payloads."""
+    return [
+        {
+            "id": i,
+            "name": f"user-{i}",
+            "email": f"user{i}@example.com",
+            "active": i % 3 == 0,
+            "score": i * 0.25,
+            "tags": ["alpha", "beta", "gamma"][: i % 4],
+            "address": {"city": "Zürich", "zip": f"{8000 + i % 100}"},
+        }
+        for i in range(records)
+    ]
+
+
+def best_of(func, repeat=5):
+    """Return the fastest of several timed runs in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON backend benchmark")
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+
+    payload = make_payload(args.records)
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+
+    cases = [
+        ("stdlib loads", lambda: json.loads(text)),
+        (f"{json_backend.backend_name()} loads", lambda: json_backend.loads(text)),
+        (
+            "stdlib dumps indent=2",
+            lambda: json.dumps(payload, indent=2, ensure_ascii=False),
+        ),
+        (
+            f"{json_backend.backend_name()} dumps",
+            lambda: json_backend.dumps(payload),
+        ),
+        (
+            "stdlib dumps compact",
+            lambda: json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+        ),
+        (
+            f"{json_backend.backend_name()} dumps compact",
+            lambda: json_backend.dumps(payload, compact=True),
+        ),
+    ]
+
+    print(f"Payload: {args.records} records, {size_mb:.1f} MB")
+    for name, func in cases:
+        seconds = best_of(func)
+        print(f"{name:<28} {seconds * 1000:9.1f} ms  {size_mb / seconds:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark rewriting timestamps in log streams, in lines per second.
+
+Generates log lines whose epoch, ISO or Apache timestamps advance by one
+second every --lines-per-second lines, then rewrites them with
+rewrite_timestamps() (one regex pass per block, output cached per second)
+and with a per-line baseline that parses and formats every match. The
+Apache format is also parsed per line with datetime.strptime, to compare
+it with the compiled fixed-width parser.
+
+Usage: python benchmarks/bench_time_stream.py [--lines N] [--lines-per-second N]
+"""
+
+import argparse
+import io
+import time
+from datetime import datetime, timezone
+
+from util.commands.convert import time as convert_time
+
+APACHE_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+STAMP_FORMATS = {"iso": "%Y-%m-%dT%H:%M:%SZ", APACHE_FORMAT: f"[{APACHE_FORMAT}]"}
+
+
+def make_log(count, lines_per_second, from_format):
+    """Build a log with one timestamp per line."""
+    start = 1_700_000_000
+    stamp_format = STAMP_FORMATS.get(from_format)
+    lines = []
+    for i in range(count):
+        second = start + i // lines_per_second
+        if stamp_format:
+            stamp = datetime.fromtimestamp(second, timezone.utc).strftime(stamp_format)
+        else:
+            stamp = str(second)
+        lines.append(f"{stamp} INFO request {i} served in 12ms\n")
+    return "".join(lines)
+
+
+def per_line(log, from_format, to_format):
+    """Rewrite line by line, converting every timestamp from scratch."""
+    pattern = convert_time.stream_pattern(from_format)
+    formatter = convert_time.time_formatter(to_format)
+
+    def rewrite(match):
+        if "%" in from_format:
+            dt = datetime.strptime(match.group(0), from_format)
+        else:
+            dt = convert_time.parse_time(from_format, match.group(0))
+        return formatter(dt)
+
+    return "".join(pattern.sub(rewrite, line) for line in io.StringIO(log))
+
+
+def streamed(log, from_format, to_format):
+    """Rewrite with the block-wise, per-second cached stream rewriter."""
+    out = io.StringIO()
+    convert_time.rewrite_timestamps(io.StringIO(log), from_format, to_format, out)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log timestamp rewriting benchmark")
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--lines-per-second", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.lines} lines, {args.lines_per_second} per second")
+    cases = [("unix", "iso"), ("iso", "datetime"), (APACHE_FORMAT, "iso")]
+    for from_format, to_format in cases:
+        log = make_log(args.lines, args.lines_per_second, from_format)
+        results = []
+        for label, func in [("per line", per_line), ("stream", streamed)]:
+            start = time.perf_counter()
+            results.append(func(log, from_format, to_format))
+            seconds = time.perf_counter() - start
+            rate = args.lines / seconds / 1_000_000
+            print(
+                f"{from_format:<20} -> {to_format:<8} {label:<9} {seconds * 1000:9.0f} ms"
+                f"  {rate:5.2f} M lines/s"
+            )
+        assert results[0] == results[1]
+
+
+if __name__ == "__main__":
+    main()
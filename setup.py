@@ -14,5 +14,6 @@ setup(
         "tomli-w",
         "xmltodict",
     ],
+    extras_require={"fast": ["numpy", "orjson"]},
     entry_points={"console_scripts": ["util = util.main:main"]},
 )
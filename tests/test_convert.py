@@ -1,12 +1,23 @@
+import importlib.util
+import json
+import os
 import subprocess
+import tempfile
 
+import pytest
 
-def run_util_command(args):
+numpy_installed = importlib.util.find_spec("numpy") is not None
+skip_if_no_numpy = pytest.mark.skipif(not numpy_installed, reason="NumPy not installed")
+
+
+def run_util_command(args, input=None, env=None):
     """Helper function to run util command as a subprocess."""
     result = subprocess.run(
         ["python", "-m", "util.main"] + args,
         capture_output=True,
         text=True,
+        input=input,
+        env=env,
     )
     return result
 
@@ -106,6 +117,313 @@ def test_convert_color_black():
     assert result.stdout.strip() == "rgb(0, 0, 0)"
 
 
+def test_convert_color_name_exact():
+    result = run_util_command(["convert", "color", "#663399", "name"])
+    assert result.returncode == 0
+    assert result.stdout.strip() == "rebeccapurple"
+
+
+def test_convert_color_name_nearest():
+    result = run_util_command(["convert", "color", "#3a7bd5", "name"])
+    assert result.returncode == 0
+    assert result.stdout.strip() == "cornflowerblue"
+
+
+def test_convert_color_name_alias_prefers_first():
+    result = run_util_command(["convert", "color", "rgb(128, 128, 128)", "name"])
+    assert result.returncode == 0
+    assert result.stdout.strip() == "gray"
+
+
+# ============================================================================
+# BULK COLOR CONVERSION TESTS
+# ============================================================================
+
+BULK_COLORS = [
+    "#ff0000",
+    "#0f0",
+    "0x0000FF",
+    "3a7bd5",
+    "rgb(18, 52, 86)",
+    "rgba(255, 255, 255, 0.5)",
+    "hsl(210, 65%, 53%)",
+    "hsla(0, 0%, 50%, 1.0)",
+    "16711935",
+]
+
+
+def test_convert_color_bulk_stdin_matches_single():
+    for target in ["hex", "0x", "rgb", "hsl", "int"]:
+        expected = [
+            run_util_command(["convert", "color", value, target]).stdout.strip()
+            for value in BULK_COLORS
+        ]
+        result = run_util_command(
+            ["convert", "color", "-", target], input="\n".join(BULK_COLORS)
+        )
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == expected
+
+
+def test_convert_color_bulk_pure_python_backend():
+    env = dict(os.environ, UTIL_COLOR_BACKEND="python")
+    result = run_util_command(
+        ["convert", "color", "-", "hsl"], input="\n".join(BULK_COLORS), env=env
+    )
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[3:7] == [
+        "hsl(214, 64%, 53%)",
+        "hsl(210, 65%, 20%)",
+        "hsl(0, 0%, 100%)",
+        "hsl(210, 65%, 52%)",
+    ]
+
+
+def test_convert_color_bulk_names_match_single():
+    colors = BULK_COLORS + ["#fe0102", "#3a7bd5", "#f0f8fe"]
+    expected = [
+        run_util_command(["convert", "color", value, "name"]).stdout.strip()
+        for value in colors
+    ]
+    for backend in ["numpy", "python"]:
+        env = dict(os.environ, UTIL_COLOR_BACKEND=backend)
+        result = run_util_command(
+            ["convert", "color", "-", "name"], input="\n".join(colors), env=env
+        )
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == expected
+    assert expected[-3:] == ["red", "cornflowerblue", "aliceblue"]
+
+
+def test_convert_color_bulk_reports_bad_lines():
+    result = run_util_command(
+        ["convert", "color", "-", "hex"], input="#ff0000\nnot-a-color\n\n#00f\n"
+    )
+    assert result.returncode == 1
+    assert result.stdout.splitlines() == ["#ff0000", "#0000ff"]
+    assert "line 2: Unable to parse color value 'not-a-color'" in result.stderr
+
+
+def test_convert_color_bulk_json_tokens():
+    tokens = {
+        "color": {
+            "primary": {"$type": "color", "$value": "#3a7bd5"},
+            "muted": ["rgb(0, 0, 0)", "hsl(0, 100%, 50%)"],
+        },
+        "font": {"weight": "400", "family": "Inter", "size": 16},
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "tokens.json")
+        with open(path, "w") as f:
+            json.dump(tokens, f)
+
+        result = run_util_command(["convert", "color", "--file", path, "rgb"])
+        assert result.returncode == 0
+        converted = json.loads(result.stdout)
+        assert converted["color"]["primary"]["$value"] == "rgb(58, 123, 213)"
+        assert converted["color"]["primary"]["$type"] == "color"
+        assert converted["color"]["muted"] == ["rgb(0, 0, 0)", "rgb(255, 0, 0)"]
+        assert converted["font"] == tokens["font"]
+
+
+def test_convert_color_bulk_file_lines():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "colors.txt")
+        with open(path, "w") as f:
+            f.write("#ff0000\n#00ff00\n")
+
+        result = run_util_command(["convert", "color", "--file", path, "int"])
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == ["16711680", "65280"]
+
+
+# ============================================================================
+# PALETTE EXTRACTION TESTS
+# ============================================================================
+
+
+def create_palette_image(path, size=(200, 100), mode="RGB"):
+    """Save an image of three color bands covering 50%, 30% and 20% of it."""
+    from PIL import Image
+
+    width, height = size
+    img = Image.new(mode, size, (200, 30, 30, 255)[: len(mode)])
+    img.paste((20, 60, 200, 255)[: len(mode)], (0, 0, width * 3 // 10, height))
+    img.paste((240, 240, 240, 255)[: len(mode)], (width * 8 // 10, 0, width, height))
+    img.save(path)
+
+
+def test_convert_color_palette_from_image():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bands.png")
+        create_palette_image(path)
+
+        for backend in ["numpy", "python"]:
+            env = dict(os.environ, UTIL_COLOR_BACKEND=backend)
+            result = run_util_command(
+                ["convert", "color", "--from-image", path, "--palette", "3"], env=env
+            )
+            assert result.returncode == 0, result.stderr
+            assert result.stdout.splitlines() == ["#c81e1e", "#143cc8", "#f0f0f0"]
+
+
+def test_convert_color_palette_target_format():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bands.png")
+        create_palette_image(path)
+
+        result = run_util_command(
+            ["convert", "color", "--from-image", path, "--palette", "2", "rgb"]
+        )
+        assert result.returncode == 0, result.stderr
+        assert len(result.stdout.splitlines()) == 2
+        assert result.stdout.startswith("rgb(")
+
+
+def test_convert_color_palette_large_jpeg_downsampled():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "photo.jpg")
+        create_palette_image(path, size=(3000, 2000))
+
+        result = run_util_command(
+            ["convert", "color", "--from-image", path, "--palette", "3", "int"]
+        )
+        assert result.returncode == 0, result.stderr
+        colors = [int(line) for line in result.stdout.splitlines()]
+        expected = [(200, 30, 30), (20, 60, 200), (240, 240, 240)]
+        for color, rgb in zip(colors, expected):
+            channels = (color >> 16, (color >> 8) & 0xFF, color & 0xFF)
+            # JPEG compression shifts colors slightly
+            assert max(abs(a - b) for a, b in zip(channels, rgb)) <= 6
+
+
+def test_convert_color_palette_large_palette_and_16_bit_images():
+    from PIL import Image
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gif = os.path.join(tmpdir, "bands.gif")
+        png = os.path.join(tmpdir, "bands.png")
+        create_palette_image(png, size=(1200, 600))
+        Image.open(png).quantize(3).save(gif)
+        deep = os.path.join(tmpdir, "deep.png")
+        Image.new("I;16", (1200, 600), 40000).save(deep)
+
+        result = run_util_command(
+            ["convert", "color", "--from-image", gif, "--palette", "3"]
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["#c81e1e", "#143cc8", "#f0f0f0"]
+
+        result = run_util_command(["convert", "color", "--from-image", deep])
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["#ffffff"]
+
+
+def test_convert_color_palette_ignores_transparent_pixels():
+    from PIL import Image
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "logo.png")
+        img = Image.new("RGBA", (100, 100), (0, 0, 0, 0))
+        img.paste((255, 0, 0, 255), (0, 0, 20, 20))
+        img.save(path)
+
+        result = run_util_command(["convert", "color", "--from-image", path])
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["#ff0000"]
+
+
+def test_convert_color_palette_missing_image():
+    result = run_util_command(["convert", "color", "--from-image", "/nonexistent.png"])
+    assert result.returncode == 1
+    assert "Cannot read image" in result.stderr
+
+
+# ============================================================================
+# IMAGE HUE/SATURATION TESTS
+# ============================================================================
+
+
+def adjust_image(tmpdir, img, name, *options, env=None):
+    """Save img, run --image on it and return the opened output."""
+    from PIL import Image
+
+    input_file = os.path.join(tmpdir, "input.png")
+    output_file = os.path.join(tmpdir, name)
+    img.save(input_file)
+    result = run_util_command(
+        ["convert", "color", "--image", input_file, "-o", output_file, *options],
+        env=env,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Successfully adjusted" in result.stdout
+    return Image.open(output_file)
+
+
+def test_convert_color_image_hue_rotation():
+    from PIL import Image
+
+    img = Image.new("RGB", (4, 2), (255, 0, 0))
+    img.paste((0, 0, 255), (2, 0, 4, 2))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for backend in ["numpy", "python"]:
+            env = dict(os.environ, UTIL_COLOR_BACKEND=backend)
+            env["XDG_CACHE_HOME"] = os.path.join(tmpdir, "cache")
+            out = adjust_image(tmpdir, img, "out.png", "--hue", "120", env=env)
+            assert out.getpixel((0, 0)) == (0, 255, 0)
+            assert out.getpixel((3, 1)) == (255, 0, 0)
+
+
+def test_convert_color_image_desaturate_keeps_alpha():
+    from PIL import Image
+
+    img = Image.new("RGBA", (2, 2), (200, 40, 90, 128))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out = adjust_image(tmpdir, img, "out.png", "--saturation", "-100")
+        r, g, b, a = out.getpixel((1, 1))
+        assert r == g == b
+        assert a == 128
+
+        out = adjust_image(tmpdir, img, "out.jpg", "--hue", "30")
+        assert out.mode == "RGB"
+
+
+def test_convert_color_image_identity_shift_is_lossless():
+    from PIL import Image
+
+    noise = Image.effect_noise((32, 32), 80)
+    img = Image.merge("RGB", (noise, noise.rotate(90), noise.rotate(180)))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for backend in ["numpy", "python"]:
+            env = dict(os.environ, UTIL_COLOR_BACKEND=backend)
+            env["XDG_CACHE_HOME"] = os.path.join(tmpdir, "cache")
+            for options in [("--hue", "0", "--saturation", "0"), ("--hue", "360")]:
+                out = adjust_image(tmpdir, img, "out.png", *options, env=env)
+                assert out.tobytes() == img.tobytes()
+
+
+def test_convert_color_image_requires_output():
+    result = run_util_command(["convert", "color", "--image", "in.png"])
+    assert result.returncode == 1
+    assert "--output" in result.stderr
+
+
+@skip_if_no_numpy
+def test_convert_color_image_lookup_tables_cached():
+    from PIL import Image
+
+    img = Image.new("RGB", (8, 8), (10, 120, 250))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, XDG_CACHE_HOME=os.path.join(tmpdir, "cache"))
+        env.pop("UTIL_COLOR_BACKEND", None)
+        adjust_image(tmpdir, img, "out.png", "--hue", "45", env=env)
+        lut_dir = os.path.join(tmpdir, "cache", "cliutils", "color")
+        assert sorted(os.listdir(lut_dir)) == [
+            "hsl_to_rgb-v2.npy",
+            "rgb_to_hsl-v2.npy",
+        ]
+
+
 # ============================================================================
 # BASE CONVERSION TESTS
 # ============================================================================
@@ -189,6 +507,92 @@ def test_convert_base_large_number():
     assert result.stdout.strip() == "400"
 
 
+@pytest.mark.parametrize(
+    "from_base,value,to_base,expected",
+    [
+        ("dec", "255", "36", "73"),
+        ("base36", "ZZ", "dec", "1295"),
+        ("dec", "3843", "62", "zz"),
+        ("62", "Zz", "dec", "2231"),
+        ("dec", "255", "base58", "5Q"),
+        ("base58", "5Q", "hex", "ff"),
+        ("dec", "-255", "0x", "-0xff"),
+        ("3", "2101", "7", "121"),
+    ],
+)
+def test_convert_base_any_radix(from_base, value, to_base, expected):
+    result = run_util_command(["convert", "base", from_base, value, to_base])
+    assert result.returncode == 0
+    assert result.stdout.strip() == expected
+
+
+def test_convert_base_invalid_digit_for_radix():
+    result = run_util_command(["convert", "base", "base58", "0OIl", "dec"])
+    assert result.returncode == 1
+    assert "invalid digit '0'" in result.stderr
+
+
+def test_convert_base_unsupported_radix():
+    result = run_util_command(["convert", "base", "dec", "10", "63"])
+    assert result.returncode == 1
+    assert "Unsupported target base" in result.stderr
+
+
+def test_convert_base_huge_number_from_file():
+    # Past the default 4300-digit limit of int() and str()
+    digits = "9" * 20000
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "number.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(digits[i : i + 80] for i in range(0, len(digits), 80)))
+
+        result = run_util_command(["convert", "base", "dec", "hex", "--file", path])
+        assert result.returncode == 0
+        assert result.stdout.strip() == format(10**20000 - 1, "x")
+
+        result = run_util_command(
+            ["convert", "base", "hex", "dec", "--file", "-"], input=result.stdout
+        )
+        assert result.returncode == 0
+        assert result.stdout.strip() == digits
+
+
+def test_convert_base_stdin_lines():
+    result = run_util_command(
+        ["convert", "base", "hex", "-", "dec"], input="ff\n\nzz\n0x10\n"
+    )
+    assert result.returncode == 1
+    assert result.stdout == "255\n16\n"
+    assert "line 3: Invalid hex value 'zz'" in result.stderr
+
+
+def test_convert_base_csv_column_by_name():
+    result = run_util_command(
+        ["convert", "base", "hex", "-", "0x", "--column", "id"],
+        input='id,name\nff,"a, b"\n,c\n',
+    )
+    assert result.returncode == 0
+    assert result.stdout == 'id,name\n0xff,"a, b"\n,c\n'
+
+
+def test_convert_base_csv_column_by_index():
+    result = run_util_command(
+        ["convert", "base", "dec", "-", "base58", "--column", "2"],
+        input="a,255\nb,oops\n",
+    )
+    assert result.returncode == 1
+    assert result.stdout == "a,5Q\nb,oops\n"
+    assert "line 2: Invalid dec value 'oops'" in result.stderr
+
+
+def test_convert_base_csv_missing_column():
+    result = run_util_command(
+        ["convert", "base", "hex", "-", "dec", "--column", "id"], input="a,b\n1,2\n"
+    )
+    assert result.returncode == 1
+    assert "Column 'id' not found" in result.stderr
+
+
 # ============================================================================
 # DATA SIZE CONVERSION TESTS
 # ============================================================================
@@ -254,6 +658,39 @@ def test_convert_data_to_bytes():
     assert result.stdout.strip() == "1024 B"
 
 
+def test_convert_data_si_and_iec_units():
+    result = run_util_command(["convert", "data", "1500000", "auto", "--si"])
+    assert result.stdout.strip() == "1.50 MB"
+    result = run_util_command(["convert", "data", "1500000", "auto", "--iec"])
+    assert result.stdout.strip() == "1.43 MiB"
+    result = run_util_command(["convert", "data", "2GiB", "mb", "--si"])
+    assert result.stdout.strip() == "2147.48 MB"
+
+
+def test_convert_data_stream_rewrite():
+    result = run_util_command(
+        ["convert", "data", "-", "auto"], input="4096\t./a\n1234567\t./b c\ntotal\n"
+    )
+    assert result.returncode == 0
+    assert result.stdout == "4.00 KB\t./a\n1.18 MB\t./b c\ntotal\n"
+
+
+def test_convert_data_stream_column():
+    listing = "total 8\n-rw-r--r-- 1 u g 2048 Jan 1 a\n"
+    result = run_util_command(
+        ["convert", "data", "-", "auto", "--column", "5"], input=listing
+    )
+    assert result.stdout == "total 8\n-rw-r--r-- 1 u g 2.00 KB Jan 1 a\n"
+
+
+def test_convert_data_stream_sum():
+    result = run_util_command(
+        ["convert", "data", "-", "kb", "--sum"], input="1K\n2KB\nfoo\n1M\n"
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == "1027.00 KB"
+
+
 # ============================================================================
 # TIME CONVERSION TESTS
 # ============================================================================
@@ -298,6 +735,142 @@ def test_convert_time_zero():
     assert "1970" in result.stdout or "1969" in result.stdout  # Timezone difference
 
 
+def test_convert_time_stream_rewrites_timestamps():
+    log = (
+        "1699564800 GET /\n"
+        "1699564800.250 id=12345678901\n"
+        "2023-11-10T00:00:00Z start\n"
+        "2023-11-10 00:00:00.5+02:00 stop\n"
+        "bad 2023-13-45T00:00:00\n"
+    )
+    result = run_util_command(
+        ["convert", "time", "auto", "iso", "--stream"],
+        input=log,
+        env=dict(os.environ, TZ="UTC"),
+    )
+    assert result.returncode == 0
+    assert result.stdout == (
+        "2023-11-09T21:20:00 GET /\n"
+        "2023-11-09T21:20:00.250 id=12345678901\n"
+        "2023-11-10T00:00:00+00:00 start\n"
+        "2023-11-10T00:00:00.5+02:00 stop\n"
+        "bad 2023-13-45T00:00:00\n"
+    )
+
+
+def test_convert_time_stream_to_unix():
+    result = run_util_command(
+        ["convert", "time", "--stream", "iso", "unix"],
+        input="[2023-11-10T00:00:00.75Z] a 1699564800\n",
+    )
+    assert result.returncode == 0
+    assert result.stdout == "[1699574400.75] a 1699564800\n"
+
+
+def test_convert_time_tz_and_to_tz():
+    result = run_util_command(
+        ["convert", "time", "unix", "1699564800", "iso", "--tz", "Europe/Paris"]
+    )
+    assert result.stdout.strip() == "2023-11-09T22:20:00+01:00"
+    result = run_util_command(
+        ["convert", "time", "iso", "2023-11-10T00:00:00", "iso"]
+        + ["--tz", "Asia/Tokyo", "--to-tz", "UTC"]
+    )
+    assert result.stdout.strip() == "2023-11-09T15:00:00+00:00"
+
+
+def test_convert_time_unknown_tz():
+    result = run_util_command(
+        ["convert", "time", "unix", "0", "iso", "--tz", "Mars/Olympus_Mons"]
+    )
+    assert result.returncode == 1
+    assert "Unknown time zone" in result.stderr
+
+
+def test_convert_time_batch_across_dst():
+    # Around the 2023-03-26 and 2023-10-29 transitions in Paris
+    epochs = "1679792399\n1679792400\nabc\n\n1698541199\n1698541200\n"
+    result = run_util_command(
+        ["convert", "time", "unix", "-", "iso", "--to-tz", "Europe/Paris"],
+        input=epochs,
+    )
+    assert result.returncode == 1
+    assert result.stdout.split() == [
+        "2023-03-26T01:59:59+01:00",
+        "2023-03-26T03:00:00+02:00",
+        "2023-10-29T02:59:59+02:00",
+        "2023-10-29T02:00:00+01:00",
+    ]
+    assert "line 3: Invalid unix value 'abc'" in result.stderr
+
+
+@skip_if_no_numpy
+def test_convert_time_batch_numpy_matches_python():
+    epochs = "".join(f"{1698530000 + i * 397}\n" for i in range(200))
+    args = ["convert", "time", "unix", "-", "iso", "--to-tz", "America/New_York"]
+    fast = run_util_command(args, input=epochs)
+    slow = run_util_command(
+        args, input=epochs, env=dict(os.environ, UTIL_TIME_BACKEND="python")
+    )
+    assert fast.returncode == 0
+    assert fast.stdout == slow.stdout
+
+
+def test_convert_time_stream_unsupported_format():
+    result = run_util_command(["convert", "time", "now", "iso", "--stream"])
+    assert result.returncode == 1
+    assert "--stream" in result.stderr
+
+
+APACHE_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+
+
+def test_convert_time_from_format():
+    result = run_util_command(
+        ["convert", "time", "--from-format", APACHE_FORMAT]
+        + ["10/Oct/2000:13:55:36 -0700", "iso"]
+    )
+    assert result.returncode == 0
+    assert result.stdout.strip() == "2000-10-10T13:55:36-07:00"
+
+
+def test_convert_time_from_format_stream():
+    log = (
+        '127.0.0.1 - - [10/Oct/2000:13:55:36 -0700] "GET / HTTP/1.0" 200 2326\n'
+        '127.0.0.1 - - [1/oct/2000:13:55:36 +0000] "GET /a HTTP/1.0" 404 0\n'
+        "bad [31/Feb/2000:13:55:36 -0700]\n"
+    )
+    result = run_util_command(
+        ["convert", "time", "--from-format", APACHE_FORMAT, "--stream", "unix"],
+        input=log,
+    )
+    assert result.returncode == 0
+    assert result.stdout == (
+        '127.0.0.1 - - [971211336] "GET / HTTP/1.0" 200 2326\n'
+        '127.0.0.1 - - [970408536] "GET /a HTTP/1.0" 404 0\n'
+        "bad [31/Feb/2000:13:55:36 -0700]\n"
+    )
+
+
+def test_convert_time_from_format_batch():
+    result = run_util_command(
+        ["convert", "time", "--from-format", "%Y%m%d%H%M%S", "-", "iso"]
+        + ["--tz", "UTC"],
+        input="20231110000000\nnope\n",
+    )
+    assert result.returncode == 1
+    assert result.stdout == "2023-11-10T00:00:00+00:00\n"
+    assert "line 2: Invalid" in result.stderr
+
+
+def test_convert_time_from_format_extra_positional():
+    result = run_util_command(
+        ["convert", "time", "--from-format", APACHE_FORMAT, "unix", "0", "iso"]
+    )
+    assert result.returncode == 1
+    assert "--from-format" in result.stderr
+
+
 # ============================================================================
 # ERROR HANDLING TESTS
 # ============================================================================
@@ -4,12 +4,13 @@ import subprocess
 import tempfile
 
 
-def run_util_command(args):
+def run_util_command(args, env=None):
     """Helper function to run util command as a subprocess."""
     result = subprocess.run(
         ["python", "-m", "util.main"] + args,
         capture_output=True,
         text=True,
+        env=env,
     )
     return result
 
@@ -236,6 +237,69 @@ def test_convert_config_unicode():
         assert result.returncode == 0
 
 
+def test_convert_config_compact_json():
+    """Test compact JSON output."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "test.yaml")
+        with open(input_file, "w") as f:
+            f.write("name: test\nitems: [1, 2]\n")
+
+        result = run_util_command(
+            ["convert", "config", input_file, "json", "--compact"]
+        )
+        assert result.returncode == 0
+        assert result.stdout.strip() == '{"name":"test","items":[1,2]}'
+
+
+def test_convert_config_json_large_integers():
+    """Test that integers wider than 64 bits survive conversion."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "test.json")
+        with open(input_file, "w") as f:
+            f.write('{"big": 123456789012345678901234567890}')
+
+        result = run_util_command(["convert", "config", input_file, "json"])
+        assert result.returncode == 0
+        assert json.loads(result.stdout) == {"big": 123456789012345678901234567890}
+
+
+def test_convert_config_json_non_finite_floats():
+    """Test that NaN and infinities are written as the stdlib writes them."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yaml_file = os.path.join(tmpdir, "test.yaml")
+        with open(yaml_file, "w") as f:
+            f.write("x: .nan\ny: .inf\nz: null\n")
+        json_file = os.path.join(tmpdir, "test.json")
+        with open(json_file, "w") as f:
+            f.write('{"big": 1e400, "small": -1e400}')
+
+        result = run_util_command(["convert", "config", yaml_file, "json", "--compact"])
+        assert result.returncode == 0
+        assert result.stdout.strip() == '{"x":NaN,"y":Infinity,"z":null}'
+
+        result = run_util_command(["convert", "config", json_file, "json", "--compact"])
+        assert result.returncode == 0
+        assert result.stdout.strip() == '{"big":Infinity,"small":-Infinity}'
+
+
+def test_convert_config_json_dates_match_across_backends():
+    """Test that YAML dates are written as ISO strings by either JSON backend."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "dates.yaml")
+        with open(input_file, "w") as f:
+            f.write("day: 2024-01-02\nat: 2024-01-02 10:00:00\n")
+
+        for backend in ["orjson", "stdlib"]:
+            result = run_util_command(
+                ["convert", "config", input_file, "json", "--compact"],
+                env=dict(os.environ, UTIL_JSON_BACKEND=backend),
+            )
+            assert result.returncode == 0, result.stderr
+            assert result.stdout.strip() == (
+                '{"day":"2024-01-02","at":"2024-01-02T10:00:00"}'
+            )
+
+
 # ============================================================================
 # ROUNDTRIP TESTS
 # ============================================================================
@@ -270,6 +334,407 @@ def test_convert_config_roundtrip_json_yaml_json():
         assert result_data["count"] == 42
 
 
+# ============================================================================
+# RECURSIVE BATCH TESTS
+# ============================================================================
+
+
+def test_convert_config_recursive_mirrors_tree():
+    """Test converting a directory tree with --recursive."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "src")
+        out = os.path.join(tmpdir, "out")
+        os.makedirs(os.path.join(src, "nested"))
+
+        with open(os.path.join(src, "app.yaml"), "w") as f:
+            f.write("name: app\nport: 8080\n")
+        with open(os.path.join(src, "nested", "db.toml"), "w") as f:
+            f.write('host = "localhost"\n')
+        with open(os.path.join(src, "notes.txt"), "w") as f:
+            f.write("not a config")
+
+        result = run_util_command(
+            [
+                "convert",
+                "config",
+                "--recursive",
+                src,
+                "--to",
+                "json",
+                "--out-dir",
+                out,
+                "--jobs",
+                "2",
+            ]
+        )
+        assert result.returncode == 0
+        assert "Converted 2" in result.stdout
+
+        with open(os.path.join(out, "app.json")) as f:
+            assert json.load(f) == {"name": "app", "port": 8080}
+        with open(os.path.join(out, "nested", "db.json")) as f:
+            assert json.load(f) == {"host": "localhost"}
+        assert not os.path.exists(os.path.join(out, "notes.json"))
+
+
+def test_convert_config_recursive_skips_up_to_date():
+    """Test that outputs newer than their inputs are skipped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "src")
+        out = os.path.join(tmpdir, "out")
+        os.makedirs(src)
+        with open(os.path.join(src, "app.yaml"), "w") as f:
+            f.write("name: app\n")
+
+        args = ["convert", "config", "-r", src, "--to", "toml", "-o", out]
+        first = run_util_command(args)
+        assert first.returncode == 0
+        assert "Converted 1" in first.stdout
+
+        second = run_util_command(args)
+        assert second.returncode == 0
+        assert "Converted 0, skipped 1" in second.stdout
+
+
+def test_convert_config_recursive_reports_failures():
+    """Test that invalid files are reported without stopping the batch."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "src")
+        out = os.path.join(tmpdir, "out")
+        os.makedirs(src)
+        with open(os.path.join(src, "good.json"), "w") as f:
+            f.write('{"ok": true}')
+        with open(os.path.join(src, "bad.json"), "w") as f:
+            f.write("{invalid json")
+
+        result = run_util_command(
+            ["convert", "config", "-r", src, "--to", "yaml", "-o", out]
+        )
+        assert result.returncode != 0
+        assert "bad.json" in result.stderr
+        assert "failed 1" in result.stdout
+        assert os.path.exists(os.path.join(out, "good.yaml"))
+
+
+def test_convert_config_recursive_rejects_shared_outputs():
+    """Test that inputs converting to the same output fail instead of racing."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "src")
+        out = os.path.join(tmpdir, "out")
+        os.makedirs(src)
+        with open(os.path.join(src, "app.yaml"), "w") as f:
+            f.write("source: yaml\n")
+        with open(os.path.join(src, "app.toml"), "w") as f:
+            f.write('source = "toml"\n')
+        with open(os.path.join(src, "other.yaml"), "w") as f:
+            f.write("ok: true\n")
+
+        result = run_util_command(
+            ["convert", "config", "-r", src, "--to", "json", "-o", out]
+        )
+        assert result.returncode != 0
+        assert "Converted 1, skipped 0, failed 2" in result.stdout
+        assert "app.json' would also be written from" in result.stderr
+        assert not os.path.exists(os.path.join(out, "app.json"))
+        assert os.path.exists(os.path.join(out, "other.json"))
+
+
+def test_convert_config_recursive_requires_out_dir():
+    """Test error when --recursive is used without --out-dir."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = run_util_command(["convert", "config", "-r", tmpdir, "--to", "json"])
+        assert result.returncode != 0
+        assert "--out-dir" in result.stderr
+
+
+# ============================================================================
+# MERGE TESTS
+# ============================================================================
+
+
+def write_layers(tmpdir):
+    """Create base.yaml, env.toml and local.json layers for merge tests."""
+    base = os.path.join(tmpdir, "base.yaml")
+    env = os.path.join(tmpdir, "env.toml")
+    local = os.path.join(tmpdir, "local.json")
+    with open(base, "w") as f:
+        f.write("db:\n  host: localhost\n  port: 5432\ntags: [a, b]\nname: app\n")
+    with open(env, "w") as f:
+        f.write('tags = ["b", "c"]\n\n[db]\nhost = "db.internal"\n')
+    with open(local, "w") as f:
+        json.dump({"db": {"pool": {"size": 5}}}, f)
+    return base, env, local
+
+
+def test_convert_config_merge_across_formats():
+    """Test deep-merging YAML, TOML and JSON layers."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base, env, local = write_layers(tmpdir)
+
+        result = run_util_command(
+            ["convert", "config", "merge", base, env, local, "--to", "json"]
+        )
+        assert result.returncode == 0
+        assert json.loads(result.stdout) == {
+            "db": {"host": "db.internal", "port": 5432, "pool": {"size": 5}},
+            "tags": ["b", "c"],
+            "name": "app",
+        }
+
+
+def test_convert_config_merge_list_strategies():
+    """Test append and unique list strategies."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base, env, _ = write_layers(tmpdir)
+
+        expected = {"append": ["a", "b", "b", "c"], "unique": ["a", "b", "c"]}
+        for strategy, tags in expected.items():
+            result = run_util_command(
+                ["convert", "config", "merge", base, env, "--to", "json"]
+                + ["--lists", strategy]
+            )
+            assert result.returncode == 0
+            assert json.loads(result.stdout)["tags"] == tags
+
+
+def test_convert_config_merge_defaults_to_first_format():
+    """Test that merge output defaults to the first file's format."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base, env, _ = write_layers(tmpdir)
+
+        result = run_util_command(["convert", "config", "merge", base, env])
+        assert result.returncode == 0
+        assert "host: db.internal" in result.stdout
+
+
+def test_convert_config_merge_missing_file():
+    """Test merge error when a layer doesn't exist."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base, _, _ = write_layers(tmpdir)
+        missing = os.path.join(tmpdir, "missing.yaml")
+
+        result = run_util_command(["convert", "config", "merge", base, missing])
+        assert result.returncode != 0
+        assert "not found" in result.stderr.lower()
+
+
+# ============================================================================
+# DIFF TESTS
+# ============================================================================
+
+
+def write_diff_pair(tmpdir):
+    """Create old.yaml and new.json files for diff tests."""
+    old = os.path.join(tmpdir, "old.yaml")
+    new = os.path.join(tmpdir, "new.json")
+    with open(old, "w") as f:
+        f.write(
+            "db:\n  host: localhost\n  port: 5432\nports: [80, 443]\nlegacy: true\n"
+        )
+    with open(new, "w") as f:
+        json.dump(
+            {"db": {"host": "db.internal", "port": 5432}, "ports": [80], "tls": {}},
+            f,
+        )
+    return old, new
+
+
+def test_convert_config_diff_human():
+    """Test human-readable structural diff across formats."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old, new = write_diff_pair(tmpdir)
+
+        result = run_util_command(["convert", "config", "diff", old, new])
+        assert result.returncode == 0
+        lines = result.stdout.strip().splitlines()
+        assert '~ db.host: "localhost" -> "db.internal"' in lines
+        assert "- ports[1]: 443" in lines
+        assert "- legacy: true" in lines
+        assert "+ tls: {}" in lines
+        assert not any("db.port" in line for line in lines)
+
+
+def test_convert_config_diff_json_patch():
+    """Test JSON Patch output of config diff."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old, new = write_diff_pair(tmpdir)
+
+        result = run_util_command(
+            ["convert", "config", "diff", old, new, "--format", "patch"]
+        )
+        assert result.returncode == 0
+        patch = json.loads(result.stdout)
+        assert {"op": "replace", "path": "/db/host", "value": "db.internal"} in patch
+        assert {"op": "remove", "path": "/ports/1"} in patch
+        assert {"op": "add", "path": "/tls", "value": {}} in patch
+
+
+def test_convert_config_diff_identical_files():
+    """Test that identical configs produce no output and exit 0."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old, _ = write_diff_pair(tmpdir)
+
+        result = run_util_command(
+            ["convert", "config", "diff", old, old, "--exit-code"]
+        )
+        assert result.returncode == 0
+        assert result.stdout == ""
+
+
+def test_convert_config_diff_exit_code():
+    """Test that --exit-code reports differences via exit status."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old, new = write_diff_pair(tmpdir)
+
+        result = run_util_command(
+            ["convert", "config", "diff", old, new, "--exit-code"]
+        )
+        assert result.returncode == 1
+        assert result.stdout
+
+
+# ============================================================================
+# GET (PATH QUERY) TESTS
+# ============================================================================
+
+
+POD_SPEC = {
+    "kind": "Pod",
+    "spec": {
+        "containers": [
+            {"name": "web", "image": "nginx:1.25", "ports": [80, 443]},
+            {"name": "cache", "image": "redis:7"},
+        ],
+        "labels": {"app.kubernetes.io/name": "demo"},
+    },
+}
+
+
+def test_convert_config_get_json_path():
+    """Test extracting a single value from JSON."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "pod.json")
+        with open(input_file, "w") as f:
+            json.dump(POD_SPEC, f)
+
+        result = run_util_command(
+            ["convert", "config", "get", input_file, "spec.containers[0].image"]
+        )
+        assert result.returncode == 0
+        assert result.stdout == "nginx:1.25\n"
+
+
+def test_convert_config_get_multiple_paths():
+    """Test extracting several paths in one call, including negative indices."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "pod.json")
+        with open(input_file, "w") as f:
+            json.dump(POD_SPEC, f)
+
+        result = run_util_command(
+            ["convert", "config", "get", input_file, "kind"]
+            + ["spec.containers[-1].name", "spec.containers[0].ports[1]"]
+            + ['spec.labels["app.kubernetes.io/name"]']
+        )
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == ["Pod", "cache", "443", "demo"]
+
+
+def test_convert_config_get_yaml_container_value():
+    """Test that containers are printed as JSON when querying YAML."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "pod.yaml")
+        with open(input_file, "w") as f:
+            f.write("spec:\n  ports: [80, 443]\n  name: web\n")
+
+        result = run_util_command(
+            ["convert", "config", "get", input_file, "spec.ports", "spec.name"]
+            + ["--json"]
+        )
+        assert result.returncode == 0
+        assert result.stdout.startswith("[\n")
+        assert json.loads(result.stdout[: result.stdout.index("]") + 1]) == [80, 443]
+        assert result.stdout.splitlines()[-1] == '"web"'
+
+
+def test_convert_config_get_index_matches_numeric_key():
+    """Test that a[0] finds a "0" member in JSON as it does in YAML."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_file = os.path.join(tmpdir, "keys.json")
+        with open(json_file, "w") as f:
+            json.dump({"a": {"0": "x", "-1": "y"}}, f)
+        yaml_file = os.path.join(tmpdir, "keys.yaml")
+        with open(yaml_file, "w") as f:
+            f.write('a:\n  "0": x\n  "-1": "y"\n')
+
+        for input_file in [json_file, yaml_file]:
+            result = run_util_command(
+                ["convert", "config", "get", input_file, "a[0]", "a[-1]"]
+            )
+            assert result.returncode == 0, result.stderr
+            assert result.stdout.splitlines() == ["x", "y"]
+
+        result = run_util_command(
+            ["convert", "config", "get", json_file, "a[0]", 'a["0"]']
+        )
+        assert result.stdout.splitlines() == ["x", "x"]
+
+
+def test_convert_config_get_duplicate_keys_last_wins():
+    """Test that repeated JSON members resolve to the last, as json.loads does."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "dup.json")
+        with open(input_file, "w") as f:
+            f.write('{"a": 1, "l": [{"n": 1}, {"n": 2}], "a": 2, "b": {"x": 1}}')
+
+        for paths, expected in [
+            (["a"], ["2"]),
+            (["a", "."], ["2", '{"a": 2, "l": [{"n": 1}, {"n": 2}], "b": {"x": 1}}']),
+            (["l[0].n"], ["1"]),
+        ]:
+            result = run_util_command(
+                ["convert", "config", "get", input_file] + paths + ["--json"]
+            )
+            assert result.returncode == 0, result.stderr
+            lines = result.stdout.split("\n", 1)
+            assert lines[0] == expected[0]
+            if len(expected) > 1:
+                assert json.loads(lines[1]) == json.loads(expected[1])
+
+        with open(input_file, "w") as f:
+            f.write('{"b": {"x": 1}, "b": {"y": 2}}')
+        result = run_util_command(["convert", "config", "get", input_file, "b.x"])
+        assert result.returncode != 0
+        assert "b.x" in result.stderr
+
+
+def test_convert_config_get_missing_path():
+    """Test error when a path doesn't exist."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "pod.json")
+        with open(input_file, "w") as f:
+            json.dump(POD_SPEC, f)
+
+        result = run_util_command(
+            ["convert", "config", "get", input_file, "kind", "spec.volumes[0]"]
+        )
+        assert result.returncode != 0
+        assert result.stdout == "Pod\n"
+        assert "spec.volumes[0]" in result.stderr
+
+
+def test_convert_config_get_invalid_json():
+    """Test error with invalid JSON on the queried path."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "bad.json")
+        with open(input_file, "w") as f:
+            f.write('{"a": [1, 2')
+
+        result = run_util_command(["convert", "config", "get", input_file, "a[5]"])
+        assert result.returncode != 0
+        assert "error" in result.stderr.lower()
+
+
 # ============================================================================
 # ERROR HANDLING TESTS
 # ============================================================================
@@ -1,14 +1,18 @@
+import json
 import os
 import subprocess
+import sys
 import tempfile
 
 
-def run_util_command(args):
+def run_util_command(args, env=None, input=None):
     """Helper function to run util command as a subprocess."""
     result = subprocess.run(
         ["python", "-m", "util.main"] + args,
         capture_output=True,
         text=True,
+        env=env,
+        input=input,
     )
     return result
 
@@ -291,6 +295,390 @@ def test_convert_document_invalid_markdown():
         assert result.returncode in [0, 1]
 
 
+# ============================================================================
+# STUB PANDOC TESTS
+# ============================================================================
+
+STUB_PANDOC = """#!{python}
+import os, shutil, sys, time
+
+args = sys.argv[1:]
+
+
+def log(event):
+    with open(os.environ["STUB_PANDOC_LOG"], "a") as f:
+        f.write(f"{{time.time():.6f}} {{event}} {{' '.join(args)}}\\n")
+
+
+log("start")
+if args == ["--version"]:
+    print("pandoc 9.9-stub")
+elif args == ["--list-output-formats"]:
+    print("html\\nmarkdown\\nplain\\nrst")
+elif args == ["--list-input-formats"]:
+    print("docx\\nhtml\\nmarkdown\\nrst")
+else:
+    output = args[args.index("-o") + 1]
+    inputs = args[: args.index("-o")]
+    if inputs:
+        with open(inputs[0], "rb") as f:
+            data = f.read()
+    else:
+        data = sys.stdin.buffer.read()
+    if data.startswith(b"bad") or os.path.basename(args[0]).startswith("bad"):
+        print("Error at line 3: unexpected end of input", file=sys.stderr)
+        sys.exit(64)
+    if "--standalone" in args:
+        data = b"<html>" + data
+    time.sleep(0.2)
+    if output == "-":
+        sys.stdout.buffer.write(data.upper())
+    else:
+        with open(output, "wb") as f:
+            f.write(data)
+    log("end")
+"""
+
+
+def stub_pandoc_env(tmpdir):
+    """Put a stub pandoc first on PATH. Returns (env, log_path)."""
+    bin_dir = os.path.join(tmpdir, "bin")
+    os.makedirs(bin_dir)
+    script = os.path.join(bin_dir, "pandoc")
+    with open(script, "w") as f:
+        f.write(STUB_PANDOC.format(python=sys.executable))
+    os.chmod(script, 0o755)
+
+    log_path = os.path.join(tmpdir, "pandoc.log")
+    env = dict(os.environ, STUB_PANDOC_LOG=log_path)
+    env["XDG_CACHE_HOME"] = os.path.join(tmpdir, "cache")
+    env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+    return env, log_path
+
+
+def read_pandoc_log(log_path):
+    """Return the argument lines the stub pandoc was started with."""
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path) as f:
+        lines = [line.split(" ", 2) for line in f.read().splitlines()]
+    return [args for _, event, args in lines if event == "start"]
+
+
+def pandoc_peak_concurrency(log_path):
+    """Return the largest number of stub conversions running at once."""
+    with open(log_path) as f:
+        lines = sorted(line.split(" ", 2) for line in f.read().splitlines())
+    running, peak = 0, 0
+    for _, event, args in lines:
+        if args.startswith("--"):
+            continue
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    return peak
+
+
+def write_docs(directory, names):
+    """Write small Markdown documents into directory."""
+    for name in names:
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"# {name}")
+
+
+def test_convert_document_probe_cached_on_disk():
+    """Test that pandoc is probed once across runs."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        input_file = os.path.join(tmpdir, "notes.md")
+        with open(input_file, "w") as f:
+            f.write("# Notes")
+
+        for _ in range(2):
+            result = run_util_command(
+                ["convert", "doc", input_file, os.path.join(tmpdir, "notes.html")],
+                env=env,
+            )
+            assert result.returncode == 0, result.stderr
+
+        calls = read_pandoc_log(log_path)
+        assert calls.count("--version") == 1
+        assert calls.count("--list-output-formats") == 1
+        assert calls.count("--list-input-formats") == 1
+        assert len(calls) == 5
+
+        with open(
+            os.path.join(tmpdir, "cache", "cliutils", "tools", "tools.json")
+        ) as f:
+            (entry,) = json.load(f)["tools"].values()
+        assert entry["writers"] == ["html", "markdown", "plain", "rst"]
+        assert entry["readers"] == ["docx", "html", "markdown", "rst"]
+
+
+def test_convert_document_unsupported_output_format():
+    """Test that formats pandoc cannot write are rejected up front."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        input_file = os.path.join(tmpdir, "notes.md")
+        with open(input_file, "w") as f:
+            f.write("# Notes")
+
+        result = run_util_command(
+            ["convert", "doc", input_file, os.path.join(tmpdir, "notes.doc")],
+            env=env,
+        )
+        assert result.returncode != 0
+        assert "pandoc 9.9-stub cannot write 'doc'" in result.stderr
+
+        # Extensions are checked by their base format
+        result = run_util_command(
+            ["convert", "doc", input_file, os.path.join(tmpdir, "notes.txt")]
+            + ["--to-format", "markdown+smart"],
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+
+
+def test_convert_document_batch_directory():
+    """Test converting a docs tree concurrently."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        docs = os.path.join(tmpdir, "docs")
+        out = os.path.join(tmpdir, "site")
+        write_docs(docs, ["a.md", "b.md", "c.rst", os.path.join("guide", "d.md")])
+        write_docs(docs, ["index.html", ".hidden.md"])
+
+        result = run_util_command(
+            ["convert", "doc", "--batch", docs, "--to", "html", "--out-dir", out]
+            + ["--jobs", "2"],
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Converted 4/4 documents" in result.stdout
+        assert "0 up to date" in result.stdout
+        for name in ["a.html", "b.html", "c.html", os.path.join("guide", "d.html")]:
+            assert os.path.exists(os.path.join(out, name))
+        assert not os.path.exists(os.path.join(out, "index.html"))
+        assert not os.path.exists(os.path.join(out, ".hidden.html"))
+        assert pandoc_peak_concurrency(log_path) == 2
+
+        calls = read_pandoc_log(log_path)
+        assert any("-f rst -t html" in args for args in calls)
+
+
+def test_convert_document_batch_directory_skips_unreadable():
+    """Test that directories are searched only for formats pandoc can read."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        docs = os.path.join(tmpdir, "docs")
+        out = os.path.join(tmpdir, "site")
+        write_docs(docs, ["a.md", "manual.pdf", "old.doc", "README.txt", "b.odt"])
+
+        result = run_util_command(
+            ["convert", "doc", "--batch", docs, "--to", "html", "--out-dir", out],
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Converted 1/1 documents" in result.stdout
+        assert [name for name in os.listdir(out) if name[0] != "."] == ["a.html"]
+
+
+def test_convert_document_txt_input_has_no_plain_reader():
+    """Test that .txt inputs are left to pandoc instead of -f plain."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        write_docs(tmpdir, ["README.txt"])
+
+        result = run_util_command(
+            ["convert", "doc", os.path.join(tmpdir, "README.txt")]
+            + [os.path.join(tmpdir, "README.html")],
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        assert read_pandoc_log(log_path)[-1].endswith("-t html")
+        assert "-f plain" not in read_pandoc_log(log_path)[-1]
+
+
+def test_convert_document_batch_skips_unchanged():
+    """Test that up-to-date outputs are skipped unless --force is given."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        write_docs(tmpdir, ["a.md", "b.md"])
+        command = ["convert", "doc", "--batch", os.path.join(tmpdir, "*.md")]
+        command += ["--to", "txt", "--out-dir", os.path.join(tmpdir, "out")]
+
+        def conversions():
+            calls = read_pandoc_log(log_path)
+            return len([args for args in calls if not args.startswith("--")])
+
+        assert run_util_command(command, env=env).returncode == 0
+        assert conversions() == 2
+
+        result = run_util_command(command, env=env)
+        assert result.returncode == 0
+        assert "Converted 0/0 documents" in result.stdout
+        assert "2 up to date" in result.stdout
+        assert conversions() == 2
+
+        # Touching an input makes only that document stale
+        future = os.path.getmtime(os.path.join(tmpdir, "a.md")) + 10
+        os.utime(os.path.join(tmpdir, "a.md"), (future, future))
+        result = run_util_command(command, env=env)
+        assert "Converted 1/1 documents" in result.stdout
+        assert conversions() == 3
+
+        result = run_util_command(command + ["--force"], env=env)
+        assert "Converted 2/2 documents" in result.stdout
+        assert conversions() == 5
+
+        # Different Pandoc arguments or formats make every output stale
+        past = future - 20
+        os.utime(os.path.join(tmpdir, "a.md"), (past, past))
+        result = run_util_command(command + ["--pandoc-arg=--standalone"], env=env)
+        assert "Converted 2/2 documents" in result.stdout
+        assert conversions() == 7
+        result = run_util_command(command + ["--pandoc-arg=--standalone"], env=env)
+        assert "2 up to date" in result.stdout
+        result = run_util_command(command + ["--to-format", "rst"], env=env)
+        assert "Converted 2/2 documents" in result.stdout
+        assert conversions() == 9
+
+
+def test_convert_document_batch_reports_failures():
+    """Test that failed documents are reported together at the end."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = stub_pandoc_env(tmpdir)
+        write_docs(tmpdir, ["good.md", "bad1.md", "bad2.md"])
+
+        result = run_util_command(
+            ["convert", "doc", "--batch", os.path.join(tmpdir, "*.md")]
+            + ["--to", "html", "--out-dir", os.path.join(tmpdir, "out")],
+            env=env,
+        )
+        assert result.returncode != 0
+        assert "2 of 3 documents failed" in result.stderr
+        assert "bad1.md: Error at line 3: unexpected end of input" in result.stderr
+        assert "bad2.md" in result.stderr
+        assert "Converted 1/3 documents" in result.stdout
+
+
+def test_convert_document_batch_cache():
+    """Test that cached outputs are reused and hit/miss stats reported."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        write_docs(tmpdir, ["a.md", "b.md"])
+        command = ["convert", "doc", "--batch", os.path.join(tmpdir, "*.md")]
+        command += ["--to", "html", "--out-dir", os.path.join(tmpdir, "out")]
+        command += ["--cache", "--force"]
+
+        def conversions():
+            calls = read_pandoc_log(log_path)
+            return len([args for args in calls if not args.startswith("--")])
+
+        result = run_util_command(command, env=env)
+        assert result.returncode == 0, result.stderr
+        assert "Cache: 0 hits, 2 misses (0% hit rate)" in result.stdout
+        assert conversions() == 2
+
+        result = run_util_command(command, env=env)
+        assert result.returncode == 0, result.stderr
+        assert "Converted 2/2 documents" in result.stdout
+        assert "Cache: 2 hits, 0 misses (100% hit rate)" in result.stdout
+        assert conversions() == 2
+
+        # Extra pandoc arguments are part of the cache key
+        result = run_util_command(command + ["--pandoc-arg=--standalone"], env=env)
+        assert "Cache: 0 hits, 2 misses" in result.stdout
+        assert conversions() == 4
+        assert read_pandoc_log(log_path)[-1].endswith("--standalone")
+
+
+def test_convert_document_cache_single_file():
+    """Test that a single conversion is served from the cache."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        write_docs(tmpdir, ["notes.md"])
+        output_file = os.path.join(tmpdir, "notes.html")
+        command = ["convert", "doc", os.path.join(tmpdir, "notes.md"), output_file]
+        command += ["--cache"]
+
+        result = run_util_command(command, env=env)
+        assert result.returncode == 0, result.stderr
+        assert "(from cache)" not in result.stdout
+        os.remove(output_file)
+
+        result = run_util_command(command, env=env)
+        assert result.returncode == 0, result.stderr
+        assert "(from cache)" in result.stdout
+        with open(output_file) as f:
+            assert f.read() == "# notes.md"
+        assert len(read_pandoc_log(log_path)) == 4
+
+
+def test_convert_document_cache_miss_after_hit_keeps_entry():
+    """Test that a miss after a hit does not overwrite the linked entry."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = stub_pandoc_env(tmpdir)
+        write_docs(tmpdir, ["notes.md"])
+        output_file = os.path.join(tmpdir, "notes.html")
+        command = ["convert", "doc", os.path.join(tmpdir, "notes.md"), output_file]
+        command += ["--cache"]
+
+        assert run_util_command(command, env=env).returncode == 0
+        assert "(from cache)" in run_util_command(command, env=env).stdout
+
+        result = run_util_command(command + ["--pandoc-arg=--standalone"], env=env)
+        assert result.returncode == 0, result.stderr
+        assert "(from cache)" not in result.stdout
+        with open(output_file) as f:
+            assert f.read() == "<html># notes.md"
+
+        result = run_util_command(command, env=env)
+        assert "(from cache)" in result.stdout
+        with open(output_file) as f:
+            assert f.read() == "# notes.md"
+
+
+def test_convert_document_stdin_stdout():
+    """Test piping a document through pandoc with '-' for both files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = stub_pandoc_env(tmpdir)
+        result = run_util_command(
+            ["convert", "doc", "-", "-", "-t", "html"],
+            env=env,
+            input="# Generated\n",
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "# GENERATED\n"
+        assert read_pandoc_log(log_path)[-1] == "-o - -t html"
+
+
+def test_convert_document_stdin_to_file():
+    """Test converting stdin into an output file."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = stub_pandoc_env(tmpdir)
+        output_file = os.path.join(tmpdir, "out.html")
+        result = run_util_command(
+            ["convert", "doc", "-", output_file], env=env, input="# Piped"
+        )
+        assert result.returncode == 0, result.stderr
+        with open(output_file) as f:
+            assert f.read() == "# Piped"
+
+
+def test_convert_document_stream_failure():
+    """Test that pandoc errors on a stream are reported without output."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = stub_pandoc_env(tmpdir)
+        result = run_util_command(
+            ["convert", "doc", "-", "-"], env=env, input="bad input"
+        )
+        assert result.returncode != 0
+        assert result.stdout == ""
+        assert "unexpected end of input" in result.stderr
+
+
 # ============================================================================
 # HELP TESTS
 # ============================================================================
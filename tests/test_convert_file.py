@@ -1,14 +1,17 @@
+import json
 import os
 import subprocess
+import sys
 import tempfile
 
 
-def run_util_command(args):
+def run_util_command(args, env=None):
     """Helper function to run util command as a subprocess."""
     result = subprocess.run(
         ["python", "-m", "util.main"] + args,
         capture_output=True,
         text=True,
+        env=env,
     )
     return result
 
@@ -161,6 +164,569 @@ def test_convert_file_rgba_to_jpg():
         assert os.path.exists(output_file)
 
 
+# ============================================================================
+# RESIZE AND THUMBNAIL TESTS
+# ============================================================================
+
+
+def image_size(filepath):
+    """Return the (width, height) of an image file."""
+    from PIL import Image
+
+    with Image.open(filepath) as img:
+        return img.size
+
+
+def test_convert_file_max_size_keeps_aspect_ratio():
+    """Test shrinking a JPEG to fit within a box."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "photo.jpg")
+        output_file = os.path.join(tmpdir, "small.png")
+        assert create_test_image(input_file, "JPEG", size=(1600, 1200))
+
+        result = run_util_command(
+            ["convert", "file", input_file, output_file, "--max-size", "400x400"]
+        )
+        assert result.returncode == 0
+        assert image_size(output_file) == (400, 300)
+
+
+def test_convert_file_max_size_never_upscales():
+    """Test that images already within the box keep their size."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "small.png")
+        output_file = os.path.join(tmpdir, "small.jpg")
+        assert create_test_image(input_file, "PNG", size=(100, 50))
+
+        result = run_util_command(
+            ["convert", "file", input_file, output_file, "--max-size", "800x600"]
+        )
+        assert result.returncode == 0
+        assert image_size(output_file) == (100, 50)
+
+
+def test_convert_file_max_size_16_bit_png():
+    """Test shrinking a 16-bit greyscale PNG, a mode Image.reduce rejects."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        from PIL import Image
+
+        input_file = os.path.join(tmpdir, "depth.png")
+        output_file = os.path.join(tmpdir, "small.png")
+        Image.new("I;16", (800, 600), 40000).save(input_file)
+
+        result = run_util_command(
+            ["convert", "file", input_file, output_file, "--max-size", "100x100"]
+        )
+        assert result.returncode == 0, result.stderr
+        assert image_size(output_file) == (100, 75)
+
+
+def test_convert_file_thumbnail_default_size():
+    """Test that --thumbnail fits images within 256x256 by default."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "photo.jpg")
+        output_file = os.path.join(tmpdir, "thumb.webp")
+        assert create_test_image(input_file, "JPEG", size=(500, 1000))
+
+        result = run_util_command(
+            ["convert", "file", input_file, output_file, "--thumbnail"]
+            + ["--resample", "bicubic"]
+        )
+        assert result.returncode == 0
+        assert image_size(output_file) == (128, 256)
+
+
+def test_convert_file_quality():
+    """Test that --quality is passed to the encoder."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        from PIL import Image
+
+        input_file = os.path.join(tmpdir, "noise.png")
+        Image.effect_noise((200, 200), 64).convert("RGB").save(input_file)
+
+        sizes = {}
+        for quality in ["10", "95"]:
+            output_file = os.path.join(tmpdir, f"q{quality}.jpg")
+            result = run_util_command(
+                ["convert", "file", input_file, output_file, "--quality", quality]
+            )
+            assert result.returncode == 0
+            sizes[quality] = os.path.getsize(output_file)
+        assert sizes["10"] < sizes["95"]
+
+
+def test_convert_file_invalid_max_size():
+    """Test error with a malformed --max-size."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "test.png")
+        assert create_test_image(input_file, "PNG")
+
+        result = run_util_command(
+            ["convert", "file", input_file, os.path.join(tmpdir, "out.jpg")]
+            + ["--max-size", "big"]
+        )
+        assert result.returncode != 0
+        assert "invalid size" in result.stderr.lower()
+
+
+# ============================================================================
+# TRANSPARENCY AND LOW MEMORY TESTS
+# ============================================================================
+
+
+def create_transparent_image(filepath, size=(120, 90)):
+    """Create an RGBA image with a horizontal alpha gradient."""
+    from PIL import Image
+
+    img = Image.effect_noise(size, 64).convert("RGB")
+    img.putalpha(Image.linear_gradient("L").rotate(90).resize(size))
+    img.save(filepath)
+
+
+def test_convert_file_palette_transparency_to_jpg():
+    """Test that transparent palette entries become white in a JPEG."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        from PIL import Image
+
+        input_file = os.path.join(tmpdir, "palette.png")
+        output_file = os.path.join(tmpdir, "palette.jpg")
+        img = Image.new("P", (40, 40), 1)
+        img.putpalette([0, 0, 0, 255, 0, 0])
+        img.save(input_file, transparency=1)
+
+        result = run_util_command(["convert", "file", input_file, output_file])
+        assert result.returncode == 0
+        with Image.open(output_file) as out:
+            assert all(channel > 250 for channel in out.getpixel((20, 20)))
+
+
+def test_convert_file_gray_alpha_to_jpg():
+    """Test that grayscale images with alpha stay grayscale in a JPEG."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        from PIL import Image
+
+        input_file = os.path.join(tmpdir, "gray.png")
+        output_file = os.path.join(tmpdir, "gray.jpg")
+        Image.new("LA", (40, 40), (0, 0)).save(input_file)
+
+        result = run_util_command(["convert", "file", input_file, output_file])
+        assert result.returncode == 0
+        with Image.open(output_file) as out:
+            assert out.mode == "L"
+            assert out.getpixel((20, 20)) > 250
+
+
+def test_convert_file_low_memory_matches_full_decode():
+    """Test that --low-memory output is identical to a full decode."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in ["image.png", "image.tiff"]:
+            input_file = os.path.join(tmpdir, name)
+            create_transparent_image(input_file)
+            full = os.path.join(tmpdir, "full.jpg")
+            strips = os.path.join(tmpdir, "strips.jpg")
+
+            result = run_util_command(["convert", "file", input_file, full])
+            assert result.returncode == 0
+            result = run_util_command(
+                ["convert", "file", input_file, strips, "--low-memory"]
+            )
+            assert result.returncode == 0
+            with open(full, "rb") as a, open(strips, "rb") as b:
+                assert a.read() == b.read()
+
+
+def test_convert_file_low_memory_with_max_size():
+    """Test combining --low-memory with --max-size."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_file = os.path.join(tmpdir, "large.png")
+        output_file = os.path.join(tmpdir, "small.png")
+        create_transparent_image(input_file, size=(1200, 900))
+
+        result = run_util_command(
+            ["convert", "file", input_file, output_file]
+            + ["--low-memory", "--max-size", "100x100"]
+        )
+        assert result.returncode == 0
+        assert image_size(output_file) == (100, 75)
+
+
+# ============================================================================
+# BATCH CONVERSION TESTS
+# ============================================================================
+
+
+def test_convert_file_batch_glob():
+    """Test converting every image matching a glob in a process pool."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = os.path.join(tmpdir, "src")
+        out = os.path.join(tmpdir, "out")
+        os.makedirs(os.path.join(src, "icons"))
+        for name in ["a.png", "b.png", os.path.join("icons", "c.png")]:
+            assert create_test_image(os.path.join(src, name), "PNG")
+        assert create_test_image(os.path.join(src, "skip.bmp"), "BMP")
+
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(src, "**", "*.png")]
+            + ["--to", "jpg", "--out-dir", out, "--jobs", "2"]
+        )
+        assert result.returncode == 0
+        assert "Converted 3/3 images" in result.stdout
+        assert "images/s" in result.stdout
+        assert os.path.exists(os.path.join(out, "a.jpg"))
+        assert os.path.exists(os.path.join(out, "b.jpg"))
+        assert os.path.exists(os.path.join(out, "icons", "c.jpg"))
+        assert not os.path.exists(os.path.join(out, "skip.jpg"))
+
+
+def test_convert_file_batch_reports_failures():
+    """Test that a bad image fails alone and is reported in the summary."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out = os.path.join(tmpdir, "out")
+        assert create_test_image(os.path.join(tmpdir, "good.png"), "PNG")
+        with open(os.path.join(tmpdir, "bad.png"), "w") as f:
+            f.write("This is not a valid PNG file")
+
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(tmpdir, "*.png")]
+            + ["--to", "webp", "--out-dir", out]
+        )
+        assert result.returncode != 0
+        assert "bad.png" in result.stderr
+        assert "Converted 1/2 images" in result.stdout
+        assert os.path.exists(os.path.join(out, "good.webp"))
+
+
+def test_convert_file_batch_rejects_shared_outputs():
+    """Test that images converting to the same output fail instead of racing."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out = os.path.join(tmpdir, "out")
+        assert create_test_image(os.path.join(tmpdir, "logo.png"), "PNG")
+        assert create_test_image(os.path.join(tmpdir, "logo.bmp"), "BMP")
+
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(tmpdir, "logo.*")]
+            + ["--to", "webp", "--out-dir", out]
+        )
+        assert result.returncode != 0
+        assert "would also be written from" in result.stderr
+        assert "Converted 0/2 images" in result.stdout
+        assert not os.path.exists(os.path.join(out, "logo.webp"))
+
+
+def test_convert_file_batch_no_matches():
+    """Test error when the batch pattern matches nothing."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(tmpdir, "*.png")]
+            + ["--to", "jpg", "--out-dir", os.path.join(tmpdir, "out")]
+        )
+        assert result.returncode != 0
+        assert "no files match" in result.stderr.lower()
+
+
+# ============================================================================
+# MEDIA BATCH TESTS (fake ffmpeg)
+# ============================================================================
+
+FAKE_FFMPEG = """#!{python}
+import os, shutil, sys, time
+
+args = sys.argv[1:]
+with open(os.environ["FAKE_FFMPEG_LOG"], "a") as log:
+    log.write(f"{{time.time()}} start {{' '.join(args)}}\\n")
+if "-version" in args:
+    print("ffmpeg version 9.9-fake")
+    sys.exit(0)
+
+source = args[args.index("-i") + 1]
+if os.path.basename(source).startswith("bad"):
+    for line in range(100):
+        print(f"noise {{line}}", file=sys.stderr)
+    print("bad.wav: Invalid data found when processing input", file=sys.stderr)
+    sys.exit(1)
+print("  Duration: 00:00:10.00, start: 0.000000, bitrate: 1 kb/s", file=sys.stderr)
+for out_time in [2.5, 5.0, 10.0]:
+    print(f"frame={{int(out_time * 25)}}\\nfps=25.00\\nout_time_us={{int(out_time * 1e6)}}")
+    print(f"speed=2.00x\\nprogress={{'end' if out_time == 10 else 'continue'}}")
+    sys.stdout.flush()
+    time.sleep(0.1)
+shutil.copyfile(source, args[-1])
+with open(os.environ["FAKE_FFMPEG_LOG"], "a") as log:
+    log.write(f"{{time.time()}} end\\n")
+"""
+
+
+def fake_ffmpeg_env(tmpdir):
+    """Put a fake ffmpeg first on PATH. Returns (env, log_path)."""
+    bin_dir = os.path.join(tmpdir, "bin")
+    os.makedirs(bin_dir)
+    script = os.path.join(bin_dir, "ffmpeg")
+    with open(script, "w") as f:
+        f.write(FAKE_FFMPEG.format(python=sys.executable))
+    os.chmod(script, 0o755)
+
+    log_path = os.path.join(tmpdir, "ffmpeg.log")
+    env = dict(os.environ, FAKE_FFMPEG_LOG=log_path)
+    env["XDG_CACHE_HOME"] = os.path.join(tmpdir, "cache")
+    env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+    return env, log_path
+
+
+def read_ffmpeg_log(log_path):
+    """Return (version probes, conversion commands, peak concurrency)."""
+    probes, commands, running, peak = 0, [], 0, 0
+    with open(log_path) as f:
+        events = sorted(line.split(" ", 2) for line in f.read().splitlines())
+    for _, kind, *rest in events:
+        if kind == "start" and rest == ["-version"]:
+            probes += 1
+        elif kind == "start":
+            commands.append(rest[0])
+            running += 1
+            peak = max(peak, running)
+        else:
+            running -= 1
+    return probes, commands, peak
+
+
+def test_convert_file_media_batch_concurrent():
+    """Test that media batches run ffmpeg concurrently and probe it once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = fake_ffmpeg_env(tmpdir)
+        src = os.path.join(tmpdir, "src")
+        out = os.path.join(tmpdir, "out")
+        os.makedirs(src)
+        for name in ["a.wav", "b.wav", "c.wav", "d.wav"]:
+            with open(os.path.join(src, name), "w") as f:
+                f.write(name)
+
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(src, "*.wav")]
+            + ["--to", "mp3", "--out-dir", out, "--jobs", "2", "--threads", "1"],
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        assert "Converted 4/4 files" in result.stdout
+        assert "[4/4]" in result.stdout
+        with open(os.path.join(out, "c.mp3")) as f:
+            assert f.read() == "c.wav"
+
+        probes, commands, peak = read_ffmpeg_log(log_path)
+        assert probes == 1
+        assert len(commands) == 4
+        assert all("-threads 1" in command for command in commands)
+        assert peak == 2
+
+
+def test_convert_file_media_batch_reports_failures():
+    """Test that a failing ffmpeg job is reported with its stderr."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = fake_ffmpeg_env(tmpdir)
+        for name in ["good.wav", "bad.wav"]:
+            with open(os.path.join(tmpdir, name), "w") as f:
+                f.write(name)
+
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(tmpdir, "*.wav")]
+            + ["--to", "ogg", "--out-dir", os.path.join(tmpdir, "out")],
+            env=env,
+        )
+        assert result.returncode != 0
+        assert "Converted 1/2 files" in result.stdout
+        # Only a bounded tail of ffmpeg's stderr is kept
+        assert "Invalid data found" in result.stderr
+        assert "noise 99" in result.stderr
+        assert "noise 0\n" not in result.stderr
+
+
+def test_convert_file_media_batch_progress_json():
+    """Test that --progress-json emits progress, results and a summary."""
+    import json
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = fake_ffmpeg_env(tmpdir)
+        for name in ["a.wav", "b.wav"]:
+            with open(os.path.join(tmpdir, name), "w") as f:
+                f.write(name)
+
+        result = run_util_command(
+            ["convert", "file", "--batch", os.path.join(tmpdir, "*.wav")]
+            + ["--to", "mp3", "--out-dir", os.path.join(tmpdir, "out")]
+            + ["--progress-json"],
+            env=env,
+        )
+        assert result.returncode == 0, result.stderr
+        events = [json.loads(line) for line in result.stdout.splitlines()]
+
+        progress = [event for event in events if event["event"] == "progress"]
+        assert len(progress) == 6
+        first = progress[0]
+        assert first["speed"] == 2.0
+        assert first["fps"] == 25.0
+        assert first["out_time"] == 2.5
+        assert first["percent"] == 25.0
+        assert first["eta"] == 3.75
+        assert progress[-1]["done"] is True
+
+        finished = [event for event in events if event["event"] == "finish"]
+        assert [event["success"] for event in finished] == [True, True]
+        assert all(event["out_time"] == 10.0 for event in finished)
+        assert events[-1]["event"] == "summary"
+        assert events[-1]["converted"] == 2
+
+
+def test_convert_file_ffmpeg_probe_cached_on_disk():
+    """Test that ffmpeg is probed again only when the binary changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, log_path = fake_ffmpeg_env(tmpdir)
+        input_file = os.path.join(tmpdir, "clip.mp4")
+        with open(input_file, "w") as f:
+            f.write("video")
+
+        def convert():
+            result = run_util_command(
+                ["convert", "file", input_file, os.path.join(tmpdir, "clip.mkv")],
+                env=env,
+            )
+            assert result.returncode == 0, result.stderr
+            return read_ffmpeg_log(log_path)[0]
+
+        assert convert() == 1
+        assert convert() == 1
+        with open(
+            os.path.join(tmpdir, "cache", "cliutils", "tools", "tools.json")
+        ) as f:
+            (entry,) = json.load(f)["tools"].values()
+        # ffmpeg lists no formats, so its entry has no format fields
+        assert sorted(entry) == ["fingerprint", "name", "path", "version"]
+
+        # A new mtime means a different binary
+        os.utime(os.path.join(tmpdir, "bin", "ffmpeg"), (1, 1))
+        assert convert() == 2
+
+
+def test_convert_file_video_with_fake_ffmpeg():
+    """Test single-file video conversion through ffmpeg."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env, _ = fake_ffmpeg_env(tmpdir)
+        input_file = os.path.join(tmpdir, "clip.mp4")
+        output_file = os.path.join(tmpdir, "clip.webm")
+        with open(input_file, "w") as f:
+            f.write("video")
+
+        result = run_util_command(["convert", "file", input_file, output_file], env=env)
+        assert result.returncode == 0, result.stderr
+        assert "Successfully converted" in result.stdout
+        assert os.path.exists(output_file)
+
+
+# ============================================================================
+# CONVERSION CACHE TESTS
+# ============================================================================
+
+
+def test_convert_file_cache_hit():
+    """Test that identical input content is served from the cache."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_dir = os.path.join(tmpdir, "cache")
+        first = os.path.join(tmpdir, "first.png")
+        second = os.path.join(tmpdir, "renamed.png")
+        assert create_test_image(first, "PNG", color="blue")
+        with open(first, "rb") as src, open(second, "wb") as dst:
+            dst.write(src.read())
+
+        result1 = run_util_command(
+            ["convert", "file", first, os.path.join(tmpdir, "a.jpg")]
+            + ["--cache-dir", cache_dir]
+        )
+        assert result1.returncode == 0
+        assert "from cache" not in result1.stdout
+
+        result2 = run_util_command(
+            ["convert", "file", second, os.path.join(tmpdir, "b.jpg")]
+            + ["--cache-dir", cache_dir]
+        )
+        assert result2.returncode == 0
+        assert "(from cache)" in result2.stdout
+        with open(os.path.join(tmpdir, "a.jpg"), "rb") as a:
+            with open(os.path.join(tmpdir, "b.jpg"), "rb") as b:
+                assert a.read() == b.read()
+
+
+def test_convert_file_cache_keyed_on_target_format():
+    """Test that a different target format is a cache miss."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_dir = os.path.join(tmpdir, "cache")
+        input_file = os.path.join(tmpdir, "input.png")
+        assert create_test_image(input_file, "PNG")
+
+        for name in ["out.jpg", "out.webp"]:
+            result = run_util_command(
+                ["convert", "file", input_file, os.path.join(tmpdir, name)]
+                + ["--cache-dir", cache_dir]
+            )
+            assert result.returncode == 0
+            assert "from cache" not in result.stdout
+
+
+def test_convert_file_cache_miss_does_not_overwrite_linked_entry():
+    """Test that a miss after a hit writes a new output, not the old entry."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_dir = os.path.join(tmpdir, "cache")
+        input_file = os.path.join(tmpdir, "a.png")
+        output_file = os.path.join(tmpdir, "out.jpg")
+        assert create_test_image(input_file, "PNG", color="blue")
+        args = ["convert", "file", input_file, output_file, "--cache-dir", cache_dir]
+
+        assert run_util_command(args).returncode == 0
+        hit = run_util_command(args)
+        assert "(from cache)" in hit.stdout
+        with open(output_file, "rb") as f:
+            default_quality = f.read()
+
+        miss = run_util_command(args + ["--quality", "5"])
+        assert miss.returncode == 0
+        assert "from cache" not in miss.stdout
+        with open(output_file, "rb") as f:
+            assert f.read() != default_quality
+
+        again = run_util_command(args)
+        assert "(from cache)" in again.stdout
+        with open(output_file, "rb") as f:
+            assert f.read() == default_quality
+
+
+def test_convert_file_cache_batch_and_eviction():
+    """Test batch cache hits and size-based eviction."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_dir = os.path.join(tmpdir, "cache")
+        for i, color in enumerate(["red", "green", "blue"]):
+            assert create_test_image(os.path.join(tmpdir, f"{i}.png"), color=color)
+
+        args = ["convert", "file", "--batch", os.path.join(tmpdir, "*.png")]
+        args += ["--to", "bmp", "--out-dir", os.path.join(tmpdir, "out")]
+        args += ["--cache-dir", cache_dir]
+
+        first = run_util_command(args)
+        assert first.returncode == 0
+        assert "0 from cache" in first.stdout
+
+        second = run_util_command(args)
+        assert second.returncode == 0
+        assert "3 from cache" in second.stdout
+
+        # Each 100x100 BMP is ~30KB, so a 40KB limit keeps one entry
+        third = run_util_command(args + ["--cache-max-size", "40KB"])
+        assert third.returncode == 0
+        entries = [
+            name
+            for _, _, files in os.walk(cache_dir)
+            for name in files
+            if name.endswith(".bmp")
+        ]
+        assert len(entries) == 1
+
+
 # ============================================================================
 # ERROR HANDLING TESTS
 # ============================================================================
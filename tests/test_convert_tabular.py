@@ -51,6 +51,19 @@ def test_convert_tabular_csv_to_json_empty():
         assert data == []
 
 
+def test_convert_tabular_csv_to_json_compact():
+    """Test compact JSON output."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_file = os.path.join(tmpdir, "test.csv")
+        with open(csv_file, "w") as f:
+            f.write("name,city\n")
+            f.write("Zoë,Zürich\n")
+
+        result = run_util_command(["convert", "tabular", csv_file, "json", "--compact"])
+        assert result.returncode == 0
+        assert result.stdout.strip() == '[{"name":"Zoë","city":"Zürich"}]'
+
+
 # ============================================================================
 # JSON TO CSV TESTS
 # ============================================================================
@@ -1,61 +1,275 @@
+import csv
+import io
 import sys
 
+from .radix import BASE58, DIGITS, format_int, parse_int, radix_digits
+
+# Base name: (digit alphabet, prefix kept on output)
+BASE_NAMES = {
+    "dec": (radix_digits(10), ""),
+    "decimal": (radix_digits(10), ""),
+    "hex": (radix_digits(16), ""),
+    "hexadecimal": (radix_digits(16), ""),
+    "0x": (radix_digits(16), "0x"),
+    "0xhex": (radix_digits(16), "0x"),
+    "bin": (radix_digits(2), ""),
+    "binary": (radix_digits(2), ""),
+    "0b": (radix_digits(2), "0b"),
+    "0bbin": (radix_digits(2), "0b"),
+    "oct": (radix_digits(8), ""),
+    "octal": (radix_digits(8), ""),
+    "0o": (radix_digits(8), "0o"),
+    "0ooct": (radix_digits(8), "0o"),
+    "base36": (radix_digits(36), ""),
+    "base58": (BASE58, ""),
+    "base62": (radix_digits(62), ""),
+}
+PREFIXED_BASES = {"0x", "0xhex", "0b", "0bbin", "0o", "0ooct"}
+INPUT_PREFIXES = {2: "0b", 8: "0o", 16: "0x"}
+READ_CHUNK = 1024 * 1024
+WRITE_BATCH = 65536  # converted lines per write in bulk mode
+WRITE_BUFFER = 1024 * 1024  # bytes of CSV buffered per write
+# Digit alphabet: format() code for int()-compatible bases
+FORMAT_SPECS = {
+    radix_digits(2): "b",
+    radix_digits(8): "o",
+    radix_digits(10): "d",
+    radix_digits(16): "x",
+}
+
+
+def resolve_base(name, target=False):
+    """Return (digit alphabet, output prefix) for a base name, or None.
+
+    Bases are dec, hex, bin, oct, base36, base58, base62 or a number from
+    2 to 62; targets also accept 0x, 0b and 0o to keep the prefix.
+    """
+    name = name.lower()
+    if name in BASE_NAMES and (target or name not in PREFIXED_BASES):
+        return BASE_NAMES[name]
+    if name.isdigit() and 2 <= int(name) <= 62:
+        return radix_digits(int(name)), ""
+    return None
+
+
+def parse_value(value, digits):
+    """Parse a value written in a base, dropping its 0x/0b/0o prefix if any.
+
+    Raises ValueError on invalid digits.
+    """
+    value = value.strip()
+    sign = ""
+    if value[:1] in ("-", "+"):
+        sign, value = value[0], value[1:]
+    prefix = INPUT_PREFIXES.get(len(digits))
+    if prefix and digits == radix_digits(len(digits)):
+        if value[:2].lower() == prefix:
+            value = value[2:]
+    return parse_int(sign + value, digits)
+
+
+def format_value(num, digits, prefix=""):
+    """Format an integer in a base, with an optional prefix after the sign."""
+    result = format_int(num, digits)
+    if num < 0:
+        return "-" + prefix + result[1:]
+    return prefix + result
+
+
+def read_number(path):
+    """Read one number from a file or stdin ("-"), ignoring whitespace.
+
+    The file is read in chunks so numbers may be wrapped over many lines.
+    """
+    parts = []
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for chunk in iter(lambda: f.read(READ_CHUNK), ""):
+            parts.append("".join(chunk.split()))
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return "".join(parts)
+
+
+def make_converter(source, target):
+    """Return a function converting one value between two resolved bases.
+
+    Bases come from resolve_base, so dispatch happens once rather than per
+    value. int() and format() handle the common bases directly, falling
+    back to parse_value and format_value for other alphabets and for values
+    past the int()/str() digit limit. The function raises ValueError on an
+    invalid value.
+    """
+    digits = source[0]
+    base = len(digits)
+    native = digits == DIGITS[:base]
+    target_digits, prefix = target
+    spec = FORMAT_SPECS.get(target_digits)
+    if spec and prefix:
+        spec = "#" + spec
+
+    def parse(value):
+        if native:
+            try:
+                return int(value, base)
+            except ValueError:
+                pass
+        return parse_value(value, digits)
+
+    def convert_value(value):
+        num = parse(value)
+        if spec:
+            try:
+                return format(num, spec)
+            except ValueError:
+                pass
+        return format_value(num, target_digits, prefix)
+
+    return convert_value
+
+
+def resolve_bases(from_base, to_base):
+    """Resolve the source and target bases, exiting on an unsupported one."""
+    source = resolve_base(from_base)
+    if source is None:
+        print(f"Error: Unsupported source base '{from_base}'", file=sys.stderr)
+        sys.exit(1)
+    target = resolve_base(to_base, target=True)
+    if target is None:
+        print(f"Error: Unsupported target base '{to_base}'", file=sys.stderr)
+        sys.exit(1)
+    return source, target
+
+
+def invalid_value_message(from_base, value, error):
+    """Describe a value that cannot be parsed, shortening huge values."""
+    value = value.strip()
+    shown = value if len(value) <= 60 else value[:57] + "..."
+    return f"Invalid {from_base} value '{shown}': {error}"
+
 
 def convert(from_base, value, to_base):
     """Convert number from one base to another."""
-    from_base = from_base.lower()
-    to_base = to_base.lower()
-
-    # Parse input based on source base
+    convert_value = make_converter(*resolve_bases(from_base, to_base))
     try:
-        if from_base in ["dec", "decimal", "10"]:
-            num = int(value, 10)
-        elif from_base in ["hex", "hexadecimal", "16"]:
-            # Remove 0x prefix if present
-            if value.lower().startswith("0x"):
-                value = value[2:]
-            num = int(value, 16)
-        elif from_base in ["bin", "binary", "2"]:
-            # Remove 0b prefix if present
-            if value.lower().startswith("0b"):
-                value = value[2:]
-            num = int(value, 2)
-        elif from_base in ["oct", "octal", "8"]:
-            # Remove 0o prefix if present
-            if value.lower().startswith("0o"):
-                value = value[2:]
-            num = int(value, 8)
-        else:
-            print(f"Error: Unsupported source base '{from_base}'", file=sys.stderr)
-            sys.exit(1)
+        return convert_value(value)
     except ValueError as e:
-        print(f"Error: Invalid {from_base} value '{value}': {e}", file=sys.stderr)
+        print(f"Error: {invalid_value_message(from_base, value, e)}", file=sys.stderr)
         sys.exit(1)
 
-    # Convert to target base
-    if to_base in ["dec", "decimal", "10"]:
-        return str(num)
-    elif to_base in ["hex", "hexadecimal", "16"]:
-        return hex(num)[2:]  # Remove 0x prefix
-    elif to_base in ["0x", "0xhex"]:
-        return hex(num)  # Keep 0x prefix
-    elif to_base in ["bin", "binary", "2"]:
-        return bin(num)[2:]  # Remove 0b prefix
-    elif to_base in ["0b", "0bbin"]:
-        return bin(num)  # Keep 0b prefix
-    elif to_base in ["oct", "octal", "8"]:
-        return oct(num)[2:]  # Remove 0o prefix
-    elif to_base in ["0o", "0ooct"]:
-        return oct(num)  # Keep 0o prefix
+
+def convert_lines(lines, from_base, convert_value, out):
+    """Convert one value per line, writing results to out in large batches.
+
+    Blank lines are skipped and invalid values are reported on stderr with
+    their line number. Returns the number of invalid values.
+    """
+    failed = 0
+    batch = []
+    for number, line in enumerate(lines, 1):
+        value = line.strip()
+        if not value:
+            continue
+        try:
+            batch.append(convert_value(value))
+        except ValueError as e:
+            message = invalid_value_message(from_base, value, e)
+            print(f"Error: line {number}: {message}", file=sys.stderr)
+            failed += 1
+            continue
+        if len(batch) >= WRITE_BATCH:
+            batch.append("")
+            out.write("\n".join(batch))
+            batch = []
+    if batch:
+        batch.append("")
+        out.write("\n".join(batch))
+    return failed
+
+
+def convert_csv_column(lines, column, from_base, convert_value, out):
+    """Convert one column of CSV rows, leaving every other field as it is.
+
+    column is a header name, or a 1-based index for CSV without a header.
+    Invalid values are reported on stderr and kept unchanged. Returns the
+    number of invalid values.
+    """
+    reader = csv.reader(lines)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    if column.isdigit() and int(column) > 0:
+        index = int(column) - 1
     else:
-        print(f"Error: Unsupported target base '{to_base}'", file=sys.stderr)
+        header = next(reader, [])
+        if column not in header:
+            print(f"Error: Column '{column}' not found in CSV header", file=sys.stderr)
+            sys.exit(1)
+        index = header.index(column)
+        writer.writerow(header)
+
+    failed = 0
+    for row in reader:
+        if index < len(row) and row[index].strip():
+            try:
+                row[index] = convert_value(row[index])
+            except ValueError as e:
+                message = invalid_value_message(from_base, row[index], e)
+                print(f"Error: line {reader.line_num}: {message}", file=sys.stderr)
+                failed += 1
+        writer.writerow(row)
+        if buffer.tell() >= WRITE_BUFFER:
+            out.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+    out.write(buffer.getvalue())
+    return failed
+
+
+def handle_bulk_command(args):
+    """Convert every value on stdin, one per line or in a CSV column."""
+    convert_value = make_converter(*resolve_bases(args.from_base, args.to_base))
+    if args.column:
+        failed = convert_csv_column(
+            sys.stdin, args.column, args.from_base, convert_value, sys.stdout
+        )
+    else:
+        failed = convert_lines(sys.stdin, args.from_base, convert_value, sys.stdout)
+    sys.stdout.flush()
+    if failed:
         sys.exit(1)
 
 
 def handle_command(args):
     """Handle base conversion command."""
+    if args.file:
+        if args.to_base is None:
+            # With --file the value positional is left out
+            args.to_base, args.value = args.value, None
+        if args.value is not None or args.to_base is None:
+            print(
+                "Error: Use either a value or --file, with a target base",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        try:
+            args.value = read_number(args.file)
+        except OSError as e:
+            print(f"Error: Cannot read '{args.file}': {e}", file=sys.stderr)
+            sys.exit(1)
+    elif args.to_base is None:
+        print("Error: A value and a target base are required", file=sys.stderr)
+        sys.exit(1)
+    elif args.value == "-":
+        handle_bulk_command(args)
+        return
+    if args.column:
+        print("Error: --column needs - as the value", file=sys.stderr)
+        sys.exit(1)
+
     result = convert(args.from_base, args.value, args.to_base)
-    print(result)
+    sys.stdout.write(result + "\n")
 
 
 def setup_parser(subparsers):
@@ -63,13 +277,35 @@ def setup_parser(subparsers):
     base_parser = subparsers.add_parser(
         "base",
         help="Convert number bases",
-        description="Convert between decimal, hexadecimal, binary, and octal.",
+        description="Convert integers of any size between bases 2 to 62, including decimal, hexadecimal, binary, octal, base36 and base58.",
+    )
+    base_parser.add_argument(
+        "from_base",
+        type=str,
+        help="Source base: dec, hex, bin, oct, base36, base58, base62 or 2-62",
+    )
+    base_parser.add_argument(
+        "value",
+        type=str,
+        nargs="?",
+        help="Value to convert, or - to convert one value per line from stdin",
+    )
+    base_parser.add_argument(
+        "to_base",
+        type=str,
+        nargs="?",
+        help="Target base: any source base, or 0x, 0b, 0o to keep the prefix",
     )
     base_parser.add_argument(
-        "from_base", type=str, help="Source base: dec, hex, bin, oct"
+        "--file",
+        "-F",
+        type=str,
+        help="Read the value from a file (- for stdin); whitespace and line breaks are ignored",
     )
-    base_parser.add_argument("value", type=str, help="Value to convert")
     base_parser.add_argument(
-        "to_base", type=str, help="Target base: dec, hex, bin, oct, 0x, 0b, 0o"
+        "--column",
+        "-c",
+        type=str,
+        help="With -, read CSV from stdin and convert this column (header name, or 1-based index for CSV without a header)",
     )
     base_parser.set_defaults(func=handle_command)
@@ -0,0 +1,112 @@
+"""
+Input discovery shared by batch conversions.
+
+A batch source is either a glob pattern or a directory. Outputs mirror the
+inputs' paths relative to the pattern's fixed prefix (or the directory) under
+an output directory, with the target extension.
+"""
+
+import glob
+import os
+
+
+def glob_root(pattern):
+    """Return the leading directory of a glob pattern that has no wildcards."""
+    parts = []
+    for part in os.path.dirname(pattern).split(os.sep):
+        if any(char in part for char in "*?["):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or "."
+
+
+def batch_output_path(input_file, root, out_dir, extension):
+    """Map an input file to out_dir, keeping its path relative to root."""
+    relative = os.path.relpath(input_file, root)
+    return os.path.join(out_dir, os.path.splitext(relative)[0] + extension)
+
+
+def find_files(root, extensions, exclude=None):
+    """Recursively yield files under root whose extension is in extensions.
+
+    Hidden entries are skipped, as is the exclude directory so an output
+    directory inside the source tree is not read back in.
+    """
+    exclude = os.path.realpath(exclude) if exclude else None
+    stack = [root]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                entries = sorted(entries, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if exclude is None or os.path.realpath(entry.path) != exclude:
+                    stack.append(entry.path)
+            elif (
+                entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in extensions
+            ):
+                yield entry.path
+
+
+def split_output_conflicts(pairs):
+    """Split (input_file, output_file) pairs into jobs and output conflicts.
+
+    Inputs that map to the same output (app.yaml and app.toml to app.json)
+    would overwrite each other, so none of them is converted. Returns
+    (jobs, conflicts), where conflicts are
+    (input_file, output_file, error_message) tuples.
+    """
+    inputs_by_output = {}
+    for input_file, output_file in pairs:
+        key = os.path.normcase(os.path.abspath(output_file))
+        inputs_by_output.setdefault(key, []).append(input_file)
+
+    jobs, conflicts = [], []
+    for input_file, output_file in pairs:
+        inputs = inputs_by_output[os.path.normcase(os.path.abspath(output_file))]
+        if len(inputs) == 1:
+            jobs.append((input_file, output_file))
+            continue
+        others = ", ".join(f"'{other}'" for other in inputs if other != input_file)
+        error = f"Output '{output_file}' would also be written from {others}"
+        conflicts.append((input_file, output_file, error))
+    return jobs, conflicts
+
+
+def batch_jobs(source, out_dir, target_extension, extensions=()):
+    """Return (jobs, conflicts) for a glob pattern or directory.
+
+    jobs are (input_file, output_file) pairs and conflicts are inputs that
+    share an output, as returned by split_output_conflicts. Directories are
+    searched recursively for files with one of extensions; glob matches are
+    taken as given. Output directories are created up front.
+    """
+    if not target_extension.startswith("."):
+        target_extension = "." + target_extension
+
+    if os.path.isdir(source):
+        root = source
+        inputs = sorted(find_files(source, extensions, exclude=out_dir))
+    else:
+        root = glob_root(source)
+        inputs = sorted(
+            path for path in glob.glob(source, recursive=True) if os.path.isfile(path)
+        )
+
+    jobs, conflicts = split_output_conflicts(
+        [
+            (input_file, batch_output_path(input_file, root, out_dir, target_extension))
+            for input_file in inputs
+        ]
+    )
+    for output_dir in {os.path.dirname(job[1]) for job in jobs}:
+        os.makedirs(output_dir or ".", exist_ok=True)
+    return jobs, conflicts
@@ -0,0 +1,230 @@
+"""
+Content-addressed cache for conversion outputs.
+
+Entries are keyed on the input file's content hash plus the target format
+and conversion options, so renamed or touched-but-unchanged inputs still hit.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from .data import parse_size
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+
+
+def default_cache_dir(namespace):
+    """Return the per-user cache directory for a conversion type."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "cliutils", namespace)
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """A directory of conversion outputs evicted by total size, oldest first."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, input_file, target, options=None):
+        """Build a cache key from input content, target format and options."""
+        digest = hashlib.sha256()
+        digest.update(hash_file(input_file).encode("ascii"))
+        digest.update(
+            json.dumps(
+                [CACHE_VERSION, target.lower(), options or {}],
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def entry_path(self, key, target):
+        """Return the on-disk path of a cache entry."""
+        return os.path.join(self.cache_dir, key[:2], key[2:] + target.lower())
+
+    def fetch(self, key, target, output_file):
+        """Materialize a cached output at output_file. Returns True on a hit.
+
+        Outputs are hard-linked to the entry when possible and copied when the
+        cache lives on another filesystem. An output that is already a link
+        to the entry is left untouched. On a miss an output linked to an
+        older entry is removed, since converters rewrite the existing file
+        and would otherwise overwrite that entry through the link.
+        """
+        entry = self.entry_path(key, target)
+        try:
+            entry_stat = os.stat(entry)
+        except OSError:
+            return self._miss(output_file)
+
+        try:
+            if os.path.samestat(entry_stat, os.stat(output_file)):
+                self._touch(entry)
+                self.hits += 1
+                return True
+        except OSError:
+            pass
+
+        try:
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            if os.path.lexists(output_file):
+                os.remove(output_file)
+            try:
+                os.link(entry, output_file)
+            except OSError:
+                shutil.copyfile(entry, output_file)
+        except OSError:
+            return self._miss(output_file)
+
+        self._touch(entry)
+        self.hits += 1
+        return True
+
+    def store(self, key, target, output_file):
+        """Copy a freshly converted output into the cache."""
+        entry = self.entry_path(key, target)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        # Write to a temp file and rename so concurrent workers never see
+        # a partially written entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp, open(output_file, "rb") as src:
+                shutil.copyfileobj(src, tmp)
+            # mkstemp creates 0600 files; hard-linked outputs share this mode
+            shutil.copymode(output_file, tmp_path)
+            os.replace(tmp_path, entry)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes.
+
+        Returns the number of bytes freed.
+        """
+        entries = []
+        total = 0
+        try:
+            shards = list(os.scandir(self.cache_dir))
+        except OSError:
+            return 0
+
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        freed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        return freed
+
+    def _miss(self, output_file):
+        """Count a miss and unlink a hard-linked output so it is written anew."""
+        self.misses += 1
+        try:
+            if os.lstat(output_file).st_nlink > 1:
+                os.remove(output_file)
+        except OSError:
+            pass
+        return False
+
+    def _touch(self, entry):
+        """Mark an entry as recently used for eviction ordering."""
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+
+def cached_conversion(input_file, output_file, convert, cache=None, options=None):
+    """Run convert(input_file, output_file) through an optional output cache.
+
+    convert must return (success, error_message). Returns
+    (success, error_message, from_cache).
+    """
+    if cache is None:
+        return convert(input_file, output_file) + (False,)
+
+    target = os.path.splitext(output_file)[1].lower()
+    try:
+        key = cache.key(input_file, target, options)
+    except OSError as e:
+        return False, f"Cannot read '{input_file}': {e}", False
+
+    if cache.fetch(key, target, output_file):
+        return True, None, True
+
+    success, error = convert(input_file, output_file)
+    if success:
+        cache.store(key, target, output_file)
+    return success, error, False
+
+
+def add_cache_arguments(parser, namespace):
+    """Add the --cache, --cache-dir and --cache-max-size options to parser."""
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Reuse outputs of identical conversions from the cache (~/.cache/cliutils/{namespace}); outputs are hard-linked to cache entries",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Cache directory (implies --cache)",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=str,
+        help="Evict least recently used entries above this total size (default: 1GB)",
+    )
+
+
+def build_cache(args, namespace):
+    """Create the output cache requested on the command line, if any."""
+    if not args.cache and not args.cache_dir:
+        return None
+
+    max_bytes = DEFAULT_MAX_BYTES
+    if args.cache_max_size:
+        max_bytes = parse_size(args.cache_max_size)
+        if max_bytes is None:
+            print(
+                f"Error: Unable to parse cache size '{args.cache_max_size}'",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+
+    return ConversionCache(args.cache_dir or default_cache_dir(namespace), max_bytes)
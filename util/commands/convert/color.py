@@ -1,49 +1,114 @@
+"""
+Color conversion between hex, RGB, HSL and integer formats.
+
+Values are converted through RGB. Bulk conversions of files and streams
+parse every line with one combined regex and do the color math on NumPy
+arrays when NumPy is installed, falling back to pure Python otherwise.
+"""
+
+import functools
+import os
+import random
 import re
 import sys
 
+from .. import json_backend
+from .color_data import CSS_COLORS
+
+# One alternative per input format, tried in order; match.lastgroup names the
+# format that matched (rgb and hsl end with their "b" and "l" groups)
+COLOR_PATTERN = re.compile(
+    r"""
+      \#(?P<hex6>[0-9a-fA-F]{6})\Z
+    | \#(?P<hex3>[0-9a-fA-F]{3})\Z
+    | 0[xX](?P<hex0x>[0-9a-fA-F]{0,6})\Z
+    | (?P<hex>[0-9a-fA-F]{6})\Z
+    | rgba?\((?P<r>\d+),\s*(?P<g>\d+),\s*(?P<b>\d+)(?:,\s*[\d.]+)?\)
+    | hsla?\((?P<h>\d+),\s*(?P<s>\d+)%,\s*(?P<l>\d+)%(?:,\s*[\d.]+)?\)
+    | (?P<int>\d+)\Z
+    """,
+    re.VERBOSE,
+)
+
+# Group numbers of the rgb and hsl channels, keyed by the last one
+_CHANNEL_GROUPS = {
+    COLOR_PATTERN.groupindex[last]: tuple(
+        COLOR_PATTERN.groupindex[name] for name in names
+    )
+    for last, names in (("b", "rgb"), ("l", "hsl"))
+}
+
+# sRGB to CIE XYZ matrix and the D65 reference white
+RGB_TO_XYZ = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+D65_WHITE = (0.95047, 1.0, 1.08883)
+LAB_EPSILON = (6 / 29) ** 3
+LAB_SLOPE = 3 * (6 / 29) ** 2
+
+# Palette extraction: images are shrunk to about PALETTE_BOX pixels square,
+# then k-means runs on at most PALETTE_SAMPLES of their pixels
+PALETTE_BOX = 256
+PALETTE_SAMPLES = 20000
+KMEANS_BATCH = 1024
+KMEANS_ITERATIONS = 100
+KMEANS_TOLERANCE = 0.05
+
+TARGETS = {
+    "hex": "hex",
+    "#": "hex",
+    "0x": "0x",
+    "0xhex": "0x",
+    "rgb": "rgb",
+    "hsl": "hsl",
+    "int": "int",
+    "integer": "int",
+    "decimal": "int",
+    "name": "name",
+}
+
+
+def numpy_module():
+    """Return NumPy for bulk conversions, or None to use pure Python.
+
+    NumPy is imported on first use so single conversions don't pay for it.
+    Set UTIL_COLOR_BACKEND=python to force the pure-Python path.
+    """
+    if os.environ.get("UTIL_COLOR_BACKEND", "").lower() == "python":
+        return None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
 
 def parse_color_input(value):
     """Parse color input and detect format."""
-    value = value.strip()
-
-    # Hex with # prefix: #ff0000
-    if value.startswith("#"):
-        hex_val = value[1:]
-        if len(hex_val) == 6:
-            return "hex", hex_val
-        elif len(hex_val) == 3:
-            # Short hex: expand #f00 to #ff0000
-            return "hex", "".join([c * 2 for c in hex_val])
-
-    # Hex with 0x prefix: 0xFF0000
-    if value.lower().startswith("0x"):
-        hex_val = value[2:]
-        if len(hex_val) <= 6:
-            return "hex", hex_val.zfill(6)
-
-    # Plain hex: ff0000
-    if re.match(r"^[0-9a-fA-F]{6}$", value):
-        return "hex", value
-
-    # RGB: rgb(255, 0, 0) or rgba(255, 0, 0, 1.0)
-    rgb_match = re.match(r"rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*[\d.]+)?\)", value)
-    if rgb_match:
-        r, g, b = map(int, rgb_match.groups())
-        return "rgb", (r, g, b)
-
-    # HSL: hsl(0, 100%, 50%) or hsla(0, 100%, 50%, 1.0)
-    hsl_match = re.match(r"hsla?\((\d+),\s*(\d+)%,\s*(\d+)%(?:,\s*[\d.]+)?\)", value)
-    if hsl_match:
-        h, s, l = map(int, hsl_match.groups())
-        return "hsl", (h, s, l)
-
-    # Integer format: 16711680
-    if re.match(r"^\d+$", value):
-        num = int(value)
-        if 0 <= num <= 16777215:  # Max RGB value (0xFFFFFF)
-            return "int", num
-
-    return None, None
+    match = COLOR_PATTERN.match(value.strip())
+    if match is None:
+        return None, None
+
+    kind = match.lastgroup
+    if kind == "b":
+        # RGB: rgb(255, 0, 0) or rgba(255, 0, 0, 1.0)
+        return "rgb", tuple(int(match[group]) for group in "rgb")
+    if kind == "l":
+        # HSL: hsl(0, 100%, 50%) or hsla(0, 100%, 50%, 1.0)
+        return "hsl", tuple(int(match[group]) for group in "hsl")
+    if kind == "int":
+        # Integer format: 16711680
+        num = int(match[kind])
+        if num > 0xFFFFFF:  # Max RGB value
+            return None, None
+        return "int", num
+    if kind == "hex3":
+        # Short hex: expand #f00 to #ff0000
+        return "hex", "".join([c * 2 for c in match[kind]])
+    # Hex as #ff0000, 0xFF0000 (zero-padded) or plain ff0000
+    return "hex", match[kind].zfill(6)
 
 
 def hex_to_rgb(hex_val):
@@ -60,8 +125,12 @@ def rgb_to_hex(r, g, b):
     return f"{r:02x}{g:02x}{b:02x}"
 
 
-def rgb_to_hsl(r, g, b):
-    """Convert RGB to HSL."""
+def rgb_to_hsl(r, g, b, rounded=False):
+    """Convert RGB to HSL.
+
+    Components are truncated to integers, or rounded when rounded is set, as
+    image adjustments do to keep round trips close to the original color.
+    """
     r, g, b = r / 255.0, g / 255.0, b / 255.0
     max_c = max(r, g, b)
     min_c = min(r, g, b)
@@ -81,11 +150,13 @@ def rgb_to_hsl(r, g, b):
             h = (r - g) / d + 4
         h /= 6
 
+    if rounded:
+        return round(h * 360) % 360, round(s * 100), round(l * 100)
     return int(h * 360), int(s * 100), int(l * 100)
 
 
-def hsl_to_rgb(h, s, l):
-    """Convert HSL to RGB."""
+def hsl_to_rgb(h, s, l, rounded=False):
+    """Convert HSL to RGB, truncating components or rounding them if rounded."""
     h, s, l = h / 360.0, s / 100.0, l / 100.0
 
     if s == 0:
@@ -111,9 +182,396 @@ def hsl_to_rgb(h, s, l):
         g = hue_to_rgb(p, q, h)
         b = hue_to_rgb(p, q, h - 1 / 3)
 
+    if rounded:
+        return round(r * 255), round(g * 255), round(b * 255)
     return int(r * 255), int(g * 255), int(b * 255)
 
 
+def rgb_to_hsl_many(r, g, b):
+    """Convert sequences of R, G and B values to lists of H, S and L.
+
+    Gives the same results as rgb_to_hsl, computed on NumPy arrays when
+    NumPy is available.
+    """
+    np = numpy_module()
+    if np is None:
+        # Fill three lists rather than keeping a tuple per color alive
+        h, s, l = [], [], []
+        for color in zip(r, g, b):
+            hue, saturation, lightness = rgb_to_hsl(*color)
+            h.append(hue)
+            s.append(saturation)
+            l.append(lightness)
+        return [h, s, l]
+
+    return [channel.tolist() for channel in rgb_to_hsl_arrays(np, r, g, b)]
+
+
+def rgb_to_hsl_arrays(np, r, g, b, rounded=False):
+    """rgb_to_hsl over NumPy arrays, returning H, S and L int64 arrays."""
+    r, g, b = (np.asarray(channel, dtype=np.float64) / 255.0 for channel in (r, g, b))
+    max_c = np.maximum(np.maximum(r, g), b)
+    min_c = np.minimum(np.minimum(r, g), b)
+    l = (max_c + min_c) / 2.0
+    d = max_c - min_c
+
+    # Grays divide by zero here; their hue and saturation are zeroed below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(l > 0.5, d / (2.0 - max_c - min_c), d / (max_c + min_c))
+        h = np.where(
+            max_c == r,
+            (g - b) / d + np.where(g < b, 6, 0),
+            np.where(max_c == g, (b - r) / d + 2, (r - g) / d + 4),
+        )
+    gray = d == 0
+    h = np.where(gray, 0.0, h / 6)
+    s = np.where(gray, 0.0, s)
+    if rounded:
+        h, s, l = (
+            np.rint(channel * scale)
+            for channel, scale in ((h, 360), (s, 100), (l, 100))
+        )
+        return [h.astype(np.int64) % 360, s.astype(np.int64), l.astype(np.int64)]
+    return [
+        (channel * scale).astype(np.int64)
+        for channel, scale in ((h, 360), (s, 100), (l, 100))
+    ]
+
+
+def hsl_to_rgb_many(h, s, l):
+    """Convert sequences of H, S and L values to lists of R, G and B.
+
+    Gives the same results as hsl_to_rgb, computed on NumPy arrays when
+    NumPy is available.
+    """
+    np = numpy_module()
+    if np is None:
+        # Fill three lists rather than keeping a tuple per color alive
+        r, g, b = [], [], []
+        for color in zip(h, s, l):
+            red, green, blue = hsl_to_rgb(*color)
+            r.append(red)
+            g.append(green)
+            b.append(blue)
+        return [r, g, b]
+
+    return [channel.tolist() for channel in hsl_to_rgb_arrays(np, h, s, l)]
+
+
+def hsl_to_rgb_arrays(np, h, s, l, rounded=False):
+    """hsl_to_rgb over NumPy arrays, returning R, G and B int64 arrays."""
+    h = np.asarray(h, dtype=np.float64) / 360.0
+    s = np.asarray(s, dtype=np.float64) / 100.0
+    l = np.asarray(l, dtype=np.float64) / 100.0
+    q = np.where(l < 0.5, l * (1 + s), l + s - l * s)
+    p = 2 * l - q
+
+    def hue_to_rgb(t):
+        t = np.where(t < 0, t + 1, t)
+        t = np.where(t > 1, t - 1, t)
+        return np.select(
+            [t < 1 / 6, t < 1 / 2, t < 2 / 3],
+            [p + (q - p) * 6 * t, q, p + (q - p) * (2 / 3 - t) * 6],
+            p,
+        )
+
+    gray = s == 0
+    convert = np.rint if rounded else np.trunc
+    return [
+        convert(np.where(gray, l, hue_to_rgb(h + offset)) * 255).astype(np.int64)
+        for offset in (1 / 3, 0, -1 / 3)
+    ]
+
+
+def _linear(channel):
+    """Undo the sRGB transfer curve for a channel value in 0-255."""
+    channel /= 255.0
+    if channel <= 0.04045:
+        return channel / 12.92
+    return ((channel + 0.055) / 1.055) ** 2.4
+
+
+def _lab_f(t):
+    """The CIE Lab companding function."""
+    if t > LAB_EPSILON:
+        return t ** (1 / 3)
+    return t / LAB_SLOPE + 4 / 29
+
+
+def rgb_to_lab(r, g, b):
+    """Convert sRGB to CIE Lab (D65 white point)."""
+    r, g, b = _linear(r), _linear(g), _linear(b)
+    fx, fy, fz = (
+        _lab_f((mr * r + mg * g + mb * b) / white)
+        for (mr, mg, mb), white in zip(RGB_TO_XYZ, D65_WHITE)
+    )
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def rgb_to_lab_many(np, r, g, b):
+    """Convert NumPy arrays of R, G and B values to an (n, 3) array of Lab."""
+    rgb = np.stack([r, g, b], axis=-1).astype(np.float64) / 255.0
+    rgb = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = [
+        (mr * rgb[:, 0] + mg * rgb[:, 1] + mb * rgb[:, 2]) / white
+        for (mr, mg, mb), white in zip(RGB_TO_XYZ, D65_WHITE)
+    ]
+    fx, fy, fz = (
+        np.where(t > LAB_EPSILON, t ** (1 / 3), t / LAB_SLOPE + 4 / 29) for t in xyz
+    )
+    return np.stack([116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)], axis=-1)
+
+
+def _build_kdtree(points, depth=0):
+    """Build a KD-tree node (point, index, axis, left, right) from (lab, index) pairs."""
+    if not points:
+        return None
+    axis = depth % 3
+    points = sorted(points, key=lambda point: point[0][axis])
+    median = len(points) // 2
+    lab, index = points[median]
+    return (
+        lab,
+        index,
+        axis,
+        _build_kdtree(points[:median], depth + 1),
+        _build_kdtree(points[median + 1 :], depth + 1),
+    )
+
+
+def _kdtree_nearest(node, target, best):
+    """Return the (squared distance, index) of the point nearest target.
+
+    Ties go to the lowest index, matching an argmin over all points.
+    """
+    if node is None:
+        return best
+    lab, index, axis, left, right = node
+    distance = (
+        (target[0] - lab[0]) * (target[0] - lab[0])
+        + (target[1] - lab[1]) * (target[1] - lab[1])
+        + (target[2] - lab[2]) * (target[2] - lab[2])
+    )
+    if (distance, index) < best:
+        best = (distance, index)
+
+    offset = target[axis] - lab[axis]
+    near, far = (left, right) if offset < 0 else (right, left)
+    best = _kdtree_nearest(near, target, best)
+    # The far side can only hold a closer (or tying) point within offset
+    if offset * offset <= best[0]:
+        best = _kdtree_nearest(far, target, best)
+    return best
+
+
+@functools.lru_cache(maxsize=None)
+def named_color_index():
+    """Return (names, Lab points, KD-tree) of the CSS named colors.
+
+    Built once per process. Aliases sharing a value keep only their first
+    name.
+    """
+    names, points = [], []
+    seen = set()
+    for name, hex_val in CSS_COLORS.items():
+        if hex_val in seen:
+            continue
+        seen.add(hex_val)
+        names.append(name)
+        points.append(rgb_to_lab(*hex_to_rgb(hex_val[1:])))
+    tree = _build_kdtree([(point, index) for index, point in enumerate(points)])
+    return names, points, tree
+
+
+def nearest_color_name(r, g, b):
+    """Return the CSS named color nearest to an RGB color in Lab space."""
+    names, _, tree = named_color_index()
+    _, index = _kdtree_nearest(tree, rgb_to_lab(r, g, b), (float("inf"), -1))
+    return names[index]
+
+
+def nearest_color_names(r, g, b, chunk_size=16384):
+    """Return the nearest CSS named color of every color in R, G and B sequences.
+
+    Each distinct color is looked up once: in the KD-tree without NumPy, and
+    otherwise against all named colors at once, a chunk of colors at a time.
+    """
+    names, points, tree = named_color_index()
+    np = numpy_module()
+    if np is None:
+        found = {}
+        result = []
+        for color in zip(r, g, b):
+            name = found.get(color)
+            if name is None:
+                name = found[color] = nearest_color_name(*color)
+            result.append(name)
+        return result
+
+    packed = (
+        (np.asarray(r, dtype=np.int64) << 16)
+        | (np.asarray(g, dtype=np.int64) << 8)
+        | np.asarray(b, dtype=np.int64)
+    )
+    distinct, inverse = np.unique(packed, return_inverse=True)
+    lab = rgb_to_lab_many(np, distinct >> 16, (distinct >> 8) & 0xFF, distinct & 0xFF)
+    table = np.asarray(points)
+    table_norms = (table * table).sum(axis=1)
+    nearest = np.empty(len(distinct), dtype=np.int64)
+    for start in range(0, len(distinct), chunk_size):
+        block = lab[start : start + chunk_size]
+        # Squared distances less the per-row |x|^2 term, as one matrix product
+        approx = table_norms - 2 * (block @ table.T)
+        best = approx.argmin(axis=1)
+        closest = approx[np.arange(len(block)), best]
+        # Rows with a near tie are redone exactly, so rounding in the matrix
+        # product never picks a different color than the KD-tree would
+        tied = (approx <= closest[:, None] + 1e-6).sum(axis=1) > 1
+        if tied.any():
+            offsets = block[tied, None, :] - table[None, :, :]
+            best[tied] = (offsets * offsets).sum(axis=-1).argmin(axis=1)
+        nearest[start : start + chunk_size] = best
+    return np.asarray(names, dtype=object)[nearest[inverse.reshape(-1)]].tolist()
+
+
+def _hex_channels(texts):
+    """Split six-digit hex strings into R, G and B lists in one pass."""
+    data = bytes.fromhex("".join(texts))
+    np = numpy_module()
+    if np is None:
+        return [list(data[offset::3]) for offset in range(3)]
+    channels = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+    return [channels[:, offset].tolist() for offset in range(3)]
+
+
+def _int_channels(numbers):
+    """Split packed 0xRRGGBB integers into R, G and B lists."""
+    return [
+        [num >> 16 for num in numbers],
+        [(num >> 8) & 0xFF for num in numbers],
+        [num & 0xFF for num in numbers],
+    ]
+
+
+def parse_colors(values):
+    """Parse many color strings into parallel R, G and B lists.
+
+    Values are matched once against COLOR_PATTERN and grouped by format, so
+    that each format is decoded for all of its values together (hex digits
+    through a single bytes.fromhex call). Returns (r, g, b, index), where
+    index holds the position in values of each parsed color, grouped by
+    format rather than in input order; values that cannot be parsed are
+    left out.
+    """
+    # Bucket by group number, which is cheaper to read than group names
+    buckets = {}
+    match = COLOR_PATTERN.match
+    for position, value in enumerate(values):
+        found = match(value.strip())
+        if found is None:
+            continue
+        group = found.lastindex
+        if group not in buckets:
+            buckets[group] = ([], [])
+        positions, texts = buckets[group]
+        positions.append(position)
+        texts.append(found.group(*_CHANNEL_GROUPS.get(group, (group,))))
+
+    names = {number: name for name, number in COLOR_PATTERN.groupindex.items()}
+    r, g, b, index = [], [], [], []
+    hex_positions, hex_texts = [], []
+    for group, (positions, texts) in buckets.items():
+        kind = names[group]
+        if kind == "b":
+            channels = [list(map(int, channel)) for channel in zip(*texts)]
+        elif kind == "l":
+            hsl = [list(map(int, channel)) for channel in zip(*texts)]
+            channels = hsl_to_rgb_many(*hsl)
+        elif kind == "int":
+            numbers = list(map(int, texts))
+            if any(num > 0xFFFFFF for num in numbers):
+                kept = [i for i, num in enumerate(numbers) if num <= 0xFFFFFF]
+                positions = [positions[i] for i in kept]
+                numbers = [numbers[i] for i in kept]
+            channels = _int_channels(numbers)
+        else:
+            hex_positions += positions
+            if kind == "hex3":
+                hex_texts += ["".join([c * 2 for c in text]) for text in texts]
+            elif kind == "hex0x":
+                hex_texts += [text.zfill(6) for text in texts]
+            else:
+                hex_texts += texts
+            continue
+        index += positions
+        for channel, values in zip((r, g, b), channels):
+            channel += values
+
+    if hex_texts:
+        index += hex_positions
+        for channel, values in zip((r, g, b), _hex_channels(hex_texts)):
+            channel += values
+    return r, g, b, index
+
+
+def _hex_digits(r, g, b):
+    """Return the hex digits of every color as one string, six per color.
+
+    Returns None if a channel is outside 0-255, as rgb() input can be.
+    """
+    packed = bytearray(len(r) * 3)
+    try:
+        packed[0::3], packed[1::3], packed[2::3] = bytes(r), bytes(g), bytes(b)
+    except ValueError:
+        return None
+    return packed.hex()
+
+
+def format_colors(r, g, b, target):
+    """Format parallel R, G and B sequences as strings in a target format."""
+    if target in ("hex", "0x"):
+        prefix, digits = "#", _hex_digits(r, g, b)
+        if target == "0x":
+            prefix, digits = "0x", digits and digits.upper()
+        if digits is not None:
+            return [prefix + digits[i : i + 6] for i in range(0, len(digits), 6)]
+        spec = "02x" if target == "hex" else "02X"
+        return [
+            f"{prefix}{red:{spec}}{green:{spec}}{blue:{spec}}"
+            for red, green, blue in zip(r, g, b)
+        ]
+    elif target == "rgb":
+        return [f"rgb({red}, {green}, {blue})" for red, green, blue in zip(r, g, b)]
+    elif target == "hsl":
+        return [f"hsl({h}, {s}%, {l}%)" for h, s, l in zip(*rgb_to_hsl_many(r, g, b))]
+    elif target == "name":
+        return nearest_color_names(r, g, b)
+    elif target == "int":
+        return list(
+            map(
+                str,
+                [
+                    (red << 16) | (green << 8) | blue
+                    for red, green, blue in zip(r, g, b)
+                ],
+            )
+        )
+    raise ValueError(f"Unsupported target format '{target}'")
+
+
+def convert_many(values, target):
+    """Convert many color strings to a target format.
+
+    Returns a list aligned with values, holding None for values that
+    cannot be parsed.
+    """
+    r, g, b, index = parse_colors(values)
+    results = [None] * len(values)
+    for position, result in zip(index, format_colors(r, g, b, target)):
+        results[position] = result
+    return results
+
+
 def convert(value, target):
     """Convert color to target format."""
     fmt, data = parse_color_input(value)
@@ -148,14 +606,335 @@ def convert(value, target):
         return f"hsl({h}, {s}%, {l}%)"
     elif target in ["int", "integer", "decimal"]:
         return str((r << 16) | (g << 8) | b)
+    elif target == "name":
+        return nearest_color_name(r, g, b)
     else:
         print(f"Error: Unsupported target format '{target}'", file=sys.stderr)
         sys.exit(1)
 
 
+def image_pixels(path, box=PALETTE_BOX):
+    """Decode an image into R, G and B lists of its opaque pixels.
+
+    The image is shrunk to fit about box x box pixels while decoding: JPEGs
+    through Image.draft() at a reduced DCT scale, then Image.reduce() by an
+    integer factor, applied per strip where the format allows, so large
+    photos are never held at full size. Pixels less than half opaque are
+    dropped.
+    """
+    from PIL import Image
+
+    from .file import reducible
+    from .strips import read_strips, supports_strips
+
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", (box, box))
+        factor = int(max(img.size) / box)
+        if factor > 1 and supports_strips(img):
+            # Uncompressed TIFFs and PNGs are reduced strip by strip
+            img = read_strips(img, factor=factor)
+        elif factor > 1:
+            img = reducible(img).reduce(factor)
+        data = img.convert("RGBA").tobytes()
+
+    opaque = [alpha >= 128 for alpha in data[3::4]]
+    if all(opaque):
+        return [list(data[offset::4]) for offset in range(3)]
+    return [
+        [value for value, keep in zip(data[offset::4], opaque) if keep]
+        for offset in range(3)
+    ]
+
+
+def _kmeans_numpy(np, pixels, count, seed):
+    """Mini-batch k-means on an (n, 3) array. Returns (centers, populations)."""
+    rng = np.random.default_rng(seed)
+    if len(pixels) > PALETTE_SAMPLES:
+        pixels = pixels[rng.choice(len(pixels), PALETTE_SAMPLES, replace=False)]
+    count = min(count, len(np.unique(pixels, axis=0)))
+
+    def nearest(points, centers):
+        offsets = points[:, None, :] - centers[None, :, :]
+        return (offsets * offsets).sum(axis=-1).argmin(axis=1)
+
+    # k-means++ seeding: later centers favor pixels far from earlier ones
+    centers = pixels[[rng.integers(len(pixels))]]
+    distances = ((pixels - centers[0]) ** 2).sum(axis=1)
+    while len(centers) < count:
+        chosen = rng.choice(len(pixels), p=distances / distances.sum())
+        centers = np.vstack([centers, pixels[chosen]])
+        distances = np.minimum(distances, ((pixels - pixels[chosen]) ** 2).sum(axis=1))
+
+    # Each batch moves a center toward its points by 1 / (points seen so far)
+    seen = np.zeros(count)
+    for _ in range(KMEANS_ITERATIONS):
+        batch = pixels[rng.integers(0, len(pixels), KMEANS_BATCH)]
+        labels = nearest(batch, centers)
+        sizes = np.bincount(labels, minlength=count)
+        sums = np.stack(
+            [np.bincount(labels, batch[:, c], minlength=count) for c in range(3)],
+            axis=1,
+        )
+        seen += sizes
+        moved = sizes > 0
+        previous = centers.copy()
+        centers[moved] += (sums[moved] - sizes[moved, None] * centers[moved]) / seen[
+            moved, None
+        ]
+        if np.abs(centers - previous).max() < KMEANS_TOLERANCE:
+            break
+
+    populations = np.bincount(nearest(pixels, centers), minlength=count)
+    return centers.tolist(), populations.tolist()
+
+
+def _kmeans_python(pixels, count, seed):
+    """Mini-batch k-means on (r, g, b) tuples. Returns (centers, populations)."""
+    rng = random.Random(seed)
+    if len(pixels) > PALETTE_SAMPLES:
+        pixels = rng.sample(pixels, PALETTE_SAMPLES)
+    count = min(count, len(set(pixels)))
+
+    def distance(a, b):
+        return (a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2
+
+    def nearest(point, centers):
+        return min(range(len(centers)), key=lambda i: distance(point, centers[i]))
+
+    # k-means++ seeding: later centers favor pixels far from earlier ones
+    centers = [list(rng.choice(pixels))]
+    distances = [distance(pixel, centers[0]) for pixel in pixels]
+    while len(centers) < count:
+        chosen = rng.choices(pixels, weights=distances)[0]
+        centers.append(list(chosen))
+        distances = [min(d, distance(p, chosen)) for d, p in zip(distances, pixels)]
+
+    # Each point moves its center toward it by 1 / (points seen so far)
+    seen = [0] * count
+    for _ in range(KMEANS_ITERATIONS):
+        previous = [center[:] for center in centers]
+        for point in rng.choices(pixels, k=KMEANS_BATCH):
+            index = nearest(point, centers)
+            seen[index] += 1
+            rate = 1 / seen[index]
+            center = centers[index]
+            for c in range(3):
+                center[c] += (point[c] - center[c]) * rate
+        shift = max(
+            abs(a - b) for old, new in zip(previous, centers) for a, b in zip(old, new)
+        )
+        if shift < KMEANS_TOLERANCE:
+            break
+
+    populations = [0] * count
+    for pixel in pixels:
+        populations[nearest(pixel, centers)] += 1
+    return centers, populations
+
+
+def extract_palette(path, count, seed=0):
+    """Return the count dominant colors of an image as (r, g, b) tuples.
+
+    Pixels are clustered with mini-batch k-means on a random sample of the
+    downsampled image. Colors are ordered by how many pixels they cover,
+    and the seed is fixed so a given image always gives the same palette.
+    """
+    r, g, b = image_pixels(path)
+    if not r:
+        return []
+
+    np = numpy_module()
+    if np is None:
+        centers, populations = _kmeans_python(list(zip(r, g, b)), count, seed)
+    else:
+        pixels = np.stack([r, g, b], axis=1).astype(np.float64)
+        centers, populations = _kmeans_numpy(np, pixels, count, seed)
+
+    # Clusters that round to the same color are merged
+    palette = {}
+    for center, population in zip(centers, populations):
+        if population:
+            color = tuple(min(255, max(0, round(value))) for value in center)
+            palette[color] = palette.get(color, 0) + population
+    return sorted(palette, key=palette.get, reverse=True)
+
+
+def handle_palette_command(path, count, target):
+    """Print the dominant colors of an image, one per line."""
+    if count < 1:
+        print("Error: --palette must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    try:
+        palette = extract_palette(path, count)
+    except ImportError:
+        print(
+            "Error: Pillow library not installed. Install with: pip install Pillow",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read image '{path}': {e}", file=sys.stderr)
+        sys.exit(1)
+    if not palette:
+        print(f"Error: Image '{path}' has no opaque pixels", file=sys.stderr)
+        sys.exit(1)
+
+    r, g, b = (list(channel) for channel in zip(*palette))
+    print("\n".join(format_colors(r, g, b, target)))
+
+
+def handle_image_command(args):
+    """Shift the hue and saturation of a whole image."""
+    if not args.output:
+        print("Error: --image requires --output", file=sys.stderr)
+        sys.exit(1)
+    if args.saturation < -100:
+        print("Error: --saturation cannot be below -100", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        from PIL import Image
+
+        from .color_lut import shift_image
+        from .file import flatten_alpha
+    except ImportError:
+        print(
+            "Error: Pillow library not installed. Install with: pip install Pillow",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    try:
+        with Image.open(args.image) as img:
+            result = shift_image(img, args.hue, args.saturation)
+        if args.output.lower().endswith((".jpg", ".jpeg")):
+            result = flatten_alpha(result)
+        result.save(args.output)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot adjust image '{args.image}': {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Successfully adjusted '{args.image}' to '{args.output}'")
+
+
+def token_strings(data, found):
+    """Collect the string leaves of a JSON token document into found."""
+    if isinstance(data, dict):
+        for value in data.values():
+            token_strings(value, found)
+    elif isinstance(data, list):
+        for value in data:
+            token_strings(value, found)
+    elif isinstance(data, str):
+        found.append(data)
+    return found
+
+
+def replace_tokens(data, converted):
+    """Return data with string leaves replaced by their converted values."""
+    if isinstance(data, dict):
+        return {key: replace_tokens(value, converted) for key, value in data.items()}
+    elif isinstance(data, list):
+        return [replace_tokens(value, converted) for value in data]
+    elif isinstance(data, str):
+        return converted.get(data, data)
+    return data
+
+
+def convert_tokens(data, target):
+    """Convert every color string in a JSON token document.
+
+    Bare integers are left alone, since token files use them for weights
+    and sizes rather than colors; other strings that don't parse are kept
+    as they are.
+    """
+    strings = list(
+        {value for value in token_strings(data, []) if not value.strip().isdigit()}
+    )
+    converted = {
+        value: result
+        for value, result in zip(strings, convert_many(strings, target))
+        if result is not None
+    }
+    return replace_tokens(data, converted)
+
+
+def read_bulk_input(path):
+    """Read bulk input from a file, or from stdin when path is '-'."""
+    if path == "-":
+        return sys.stdin.read()
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError as e:
+        print(f"Error: Cannot read '{path}': {e.strerror}", file=sys.stderr)
+        sys.exit(1)
+
+
+def handle_bulk_command(path, target):
+    """Convert every color in a file or stdin, one per line or a JSON token file."""
+    text = read_bulk_input(path)
+
+    if path.lower().endswith(".json") or text.lstrip()[:1] in ("{", "["):
+        try:
+            data = json_backend.loads(text)
+        except ValueError as e:
+            print(f"Error: Cannot parse JSON token file: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(json_backend.dumps(convert_tokens(data, target)))
+        return
+
+    lines = text.splitlines()
+    results = convert_many(lines, target)
+    failed = 0
+    output = []
+    for number, (line, result) in enumerate(zip(lines, results), 1):
+        if result is not None:
+            output.append(result)
+        elif line.strip():
+            print(
+                f"Error: line {number}: Unable to parse color value '{line.strip()}'",
+                file=sys.stderr,
+            )
+            failed += 1
+    if output:
+        sys.stdout.write("\n".join(output) + "\n")
+    if failed:
+        sys.exit(1)
+
+
 def handle_command(args):
     """Handle color conversion command."""
-    result = convert(args.value, args.target)
+    if args.image:
+        handle_image_command(args)
+        return
+
+    value, target = args.value, args.target
+    if (args.file or args.from_image) and target is None:
+        # Only the target (if anything) was given alongside --file/--from-image
+        value, target = None, value
+    if args.from_image and target is None:
+        target = "hex"
+    if value is None and not (args.file or args.from_image):
+        print("Error: color value is required", file=sys.stderr)
+        sys.exit(1)
+    if target is None:
+        print("Error: target format is required", file=sys.stderr)
+        sys.exit(1)
+
+    if args.file or args.from_image or value == "-":
+        if target.lower() not in TARGETS:
+            print(f"Error: Unsupported target format '{target}'", file=sys.stderr)
+            sys.exit(1)
+        if args.from_image:
+            handle_palette_command(
+                args.from_image, args.palette, TARGETS[target.lower()]
+            )
+        else:
+            handle_bulk_command(args.file or "-", TARGETS[target.lower()])
+        return
+
+    result = convert(value, target)
     print(result)
 
 
@@ -167,11 +946,61 @@ def setup_parser(subparsers):
         description="Convert between hex, RGB, HSL, and integer color formats.",
     )
     color_parser.add_argument(
-        "value", type=str, help="Color value to convert (auto-detects format)"
+        "value",
+        type=str,
+        nargs="?",
+        help="Color value to convert (auto-detects format), or '-' to convert one color per line from stdin",
     )
     color_parser.add_argument(
         "target",
         type=str,
-        help="Target format: hex, 0x, rgb, hsl, int",
+        nargs="?",
+        help="Target format: hex, 0x, rgb, hsl, int, name (nearest CSS named color)",
+    )
+    color_parser.add_argument(
+        "--file",
+        "-F",
+        type=str,
+        metavar="PATH",
+        help="Convert every color in a file: one per line, or the color strings of a JSON token file",
+    )
+    color_parser.add_argument(
+        "--from-image",
+        type=str,
+        metavar="IMAGE",
+        help="Extract the dominant colors of an image (target defaults to hex)",
+    )
+    color_parser.add_argument(
+        "--palette",
+        type=int,
+        default=8,
+        metavar="N",
+        help="Number of colors to extract with --from-image (default: 8)",
+    )
+    color_parser.add_argument(
+        "--image",
+        type=str,
+        metavar="IMAGE",
+        help="Adjust the hue/saturation of a whole image (requires --output)",
+    )
+    color_parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        help="Output image for --image",
+    )
+    color_parser.add_argument(
+        "--hue",
+        type=int,
+        default=0,
+        metavar="DEGREES",
+        help="With --image, rotate every hue by this many degrees",
+    )
+    color_parser.add_argument(
+        "--saturation",
+        type=int,
+        default=0,
+        metavar="PERCENT",
+        help="With --image, change saturation by this percentage (-100 gives grayscale)",
     )
     color_parser.set_defaults(func=handle_command)
@@ -0,0 +1,169 @@
+"""
+Lookup tables for HSL <-> RGB conversion of whole images.
+
+rgb_to_hsl and hsl_to_rgb work in integers (hue in degrees, saturation and
+lightness in percent, rounded rather than truncated so colors drift as
+little as possible), so both directions fit in finite tables: 256^3
+entries from RGB to HSL and 360 x 101 x 101 from HSL to RGB. With NumPy the
+tables are built once from the vectorized conversions, saved in the user
+cache directory and memory-mapped on later runs, so adjusting an image costs
+two array lookups per pixel. Without NumPy each distinct color of an image
+is converted once and memoized.
+"""
+
+import functools
+import os
+import tempfile
+
+from .cache import default_cache_dir
+from .color import (
+    hsl_to_rgb,
+    hsl_to_rgb_arrays,
+    numpy_module,
+    rgb_to_hsl,
+    rgb_to_hsl_arrays,
+)
+
+LUT_VERSION = 2
+HSL_STRIDE = 101 * 101  # saturation x lightness values per hue
+LUT_SIZES = {"rgb_to_hsl": 1 << 24, "hsl_to_rgb": 360 * HSL_STRIDE}
+CHUNK_PIXELS = 1 << 20
+
+
+def lut_path(name):
+    """Return the on-disk path of a lookup table."""
+    return os.path.join(default_cache_dir("color"), f"{name}-v{LUT_VERSION}.npy")
+
+
+def _build_rgb_to_hsl(np):
+    """Pack the HSL of every 24-bit color as h << 16 | s << 8 | l."""
+    table = np.empty(LUT_SIZES["rgb_to_hsl"], dtype=np.uint32)
+    low = np.arange(1 << 16)
+    for red in range(256):
+        h, s, l = rgb_to_hsl_arrays(
+            np, np.full(1 << 16, red), low >> 8, low & 0xFF, rounded=True
+        )
+        table[red << 16 : (red + 1) << 16] = (h << 16) | (s << 8) | l
+    return table
+
+
+def _build_hsl_to_rgb(np):
+    """Pack the RGB of every integer HSL color as r << 16 | g << 8 | b.
+
+    Entries are indexed by h * HSL_STRIDE + s * 101 + l.
+    """
+    table = np.empty(LUT_SIZES["hsl_to_rgb"], dtype=np.uint32)
+    s, l = np.divmod(np.arange(HSL_STRIDE), 101)
+    for hue in range(360):
+        r, g, b = hsl_to_rgb_arrays(np, np.full(HSL_STRIDE, hue), s, l, rounded=True)
+        table[hue * HSL_STRIDE : (hue + 1) * HSL_STRIDE] = (r << 16) | (g << 8) | b
+    return table
+
+
+def _save_lut(np, path, table):
+    """Atomically write a table, leaving it in memory only if that fails."""
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, table)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@functools.lru_cache(maxsize=None)
+def load_lut(name):
+    """Return a lookup table, memory-mapped from the cache or built and saved."""
+    np = numpy_module()
+    path = lut_path(name)
+    try:
+        table = np.load(path, mmap_mode="r")
+        if table.dtype == np.uint32 and table.shape == (LUT_SIZES[name],):
+            return table
+    except (OSError, ValueError):
+        pass
+
+    builder = _build_rgb_to_hsl if name == "rgb_to_hsl" else _build_hsl_to_rgb
+    table = builder(np)
+    _save_lut(np, path, table)
+    return table
+
+
+def shift_color(color, hue=0, saturation=0):
+    """Rotate the hue of an RGB color by degrees and scale its saturation.
+
+    saturation is a percentage change: -100 removes all color and 100
+    doubles the saturation, up to its maximum. A shift that changes nothing
+    returns the color as it is, since the integer HSL round trip is lossy.
+    """
+    if hue % 360 == 0 and saturation == 0:
+        return tuple(color)
+    h, s, l = rgb_to_hsl(*color, rounded=True)
+    s = min(100, s * (100 + saturation) // 100)
+    return hsl_to_rgb((h + hue) % 360, s, l, rounded=True)
+
+
+def _shift_pixels(np, pixels, hue, saturation):
+    """shift_color over an (n, 3) uint8 array, through the lookup tables."""
+    to_hsl = load_lut("rgb_to_hsl")
+    to_rgb = load_lut("hsl_to_rgb")
+    channels = pixels.astype(np.uint32)
+    hsl = to_hsl[(channels[:, 0] << 16) | (channels[:, 1] << 8) | channels[:, 2]]
+
+    h = ((hsl >> 16).astype(np.int64) + hue) % 360
+    s = np.minimum(
+        100, ((hsl >> 8) & 0xFF).astype(np.int64) * (100 + saturation) // 100
+    )
+    rgb = to_rgb[h * HSL_STRIDE + s * 101 + (hsl & 0xFF)]
+    return np.stack([rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF], axis=1).astype(np.uint8)
+
+
+def shift_image(img, hue=0, saturation=0):
+    """Return a copy of a Pillow image with every pixel passed through shift_color.
+
+    Transparency is kept as it is, and a shift that changes nothing returns
+    an unchanged copy.
+    """
+    from PIL import Image
+
+    if hue % 360 == 0 and saturation == 0:
+        return img.copy()
+
+    alpha = None
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        img = img.convert("RGBA")
+        alpha = img.getchannel("A")
+    rgb = img.convert("RGB")
+
+    np = numpy_module()
+    if np is not None:
+        pixels = np.asarray(rgb).reshape(-1, 3)
+        shifted = np.empty_like(pixels)
+        # Chunks bound the size of the index arrays on large images
+        for start in range(0, len(pixels), CHUNK_PIXELS):
+            chunk = pixels[start : start + CHUNK_PIXELS]
+            shifted[start : start + CHUNK_PIXELS] = _shift_pixels(
+                np, chunk, hue, saturation
+            )
+        result = Image.fromarray(shifted.reshape(rgb.size[1], rgb.size[0], 3), "RGB")
+    else:
+        data = rgb.tobytes()
+        shifted = bytearray(len(data))
+        found = {}
+        for start in range(0, len(data), 3):
+            color = data[start : start + 3]
+            new = found.get(color)
+            if new is None:
+                new = found[color] = bytes(shift_color(color, hue, saturation))
+            shifted[start : start + 3] = new
+        result = Image.frombytes("RGB", rgb.size, bytes(shifted))
+
+    if alpha is not None:
+        result.putalpha(alpha)
+    return result
@@ -1,95 +1,137 @@
+import argparse
+import hashlib
 import json
 import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from json.decoder import scanstring
 
+from .. import json_backend
+from .batch import batch_output_path, find_files, split_output_conflicts
 
-def parse_config(data, format_type):
-    """Parse config data from specified format."""
+CONFIG_FORMATS = ["json", "yaml", "toml", "xml"]
+
+FORMAT_EXTENSIONS = {
+    "json": ".json",
+    "yaml": ".yaml",
+    "toml": ".toml",
+    "xml": ".xml",
+}
+
+# Extensions searched for by --recursive, as recognized by detect_format
+CONFIG_EXTENSIONS = [".json", ".yaml", ".yml", ".toml", ".xml"]
+
+LIST_STRATEGIES = ["replace", "append", "unique", "index"]
+
+# One segment of a query path: .name, [index] or ["quoted.key"]
+_PATH_TOKEN = re.compile(r'\.?([^.\[\]"]+)|\[(-?\d+)\]|\["((?:[^"\\]|\\.)*)"\]')
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def load_config(data, format_type):
+    """Parse config data from specified format, raising ValueError on failure."""
     format_type = format_type.lower()
 
-    try:
-        if format_type == "json":
-            return json.loads(data)
-        elif format_type == "yaml":
-            try:
-                import yaml
-            except ImportError:
-                print(
-                    "Error: PyYAML not installed. Install with: pip install PyYAML",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
+    if format_type == "json":
+        try:
+            return json_backend.loads(data)
+        except Exception as e:
+            raise ValueError(f"Cannot parse json: {e}")
+    elif format_type == "yaml":
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML not installed. Install with: pip install PyYAML")
+        try:
             return yaml.safe_load(data)
-        elif format_type == "toml":
-            try:
-                import tomli
-            except ImportError:
-                print(
-                    "Error: tomli not installed. Install with: pip install tomli",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
+        except Exception as e:
+            raise ValueError(f"Cannot parse yaml: {e}")
+    elif format_type == "toml":
+        try:
+            import tomli
+        except ImportError:
+            raise ValueError("tomli not installed. Install with: pip install tomli")
+        try:
             return tomli.loads(data)
-        elif format_type == "xml":
-            try:
-                import xmltodict
-            except ImportError:
-                print(
-                    "Error: xmltodict not installed. Install with: pip install xmltodict",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
+        except Exception as e:
+            raise ValueError(f"Cannot parse toml: {e}")
+    elif format_type == "xml":
+        try:
+            import xmltodict
+        except ImportError:
+            raise ValueError(
+                "xmltodict not installed. Install with: pip install xmltodict"
+            )
+        try:
             return xmltodict.parse(data)
-        else:
-            print(f"Error: Unsupported format '{format_type}'", file=sys.stderr)
-            sys.exit(1)
-    except Exception as e:
-        print(f"Error parsing {format_type}: {e}", file=sys.stderr)
-        sys.exit(1)
+        except Exception as e:
+            raise ValueError(f"Cannot parse xml: {e}")
+    else:
+        raise ValueError(f"Unsupported format '{format_type}'")
 
 
-def serialize_config(data, format_type):
-    """Serialize config data to specified format."""
+def dump_config(data, format_type, compact=False):
+    """Serialize config data to specified format, raising ValueError on failure.
+
+    compact only affects JSON output, which is then emitted without whitespace.
+    """
     format_type = format_type.lower()
 
-    try:
-        if format_type == "json":
-            return json.dumps(data, indent=2, ensure_ascii=False)
-        elif format_type == "yaml":
-            try:
-                import yaml
-            except ImportError:
-                print(
-                    "Error: PyYAML not installed. Install with: pip install PyYAML",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
+    if format_type == "json":
+        try:
+            return json_backend.dumps(data, compact=compact)
+        except Exception as e:
+            raise ValueError(f"Cannot serialize to json: {e}")
+    elif format_type == "yaml":
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML not installed. Install with: pip install PyYAML")
+        try:
             return yaml.dump(data, default_flow_style=False, allow_unicode=True)
-        elif format_type == "toml":
-            try:
-                import tomli_w
-            except ImportError:
-                print(
-                    "Error: tomli-w not installed. Install with: pip install tomli-w",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
+        except Exception as e:
+            raise ValueError(f"Cannot serialize to yaml: {e}")
+    elif format_type == "toml":
+        try:
+            import tomli_w
+        except ImportError:
+            raise ValueError("tomli-w not installed. Install with: pip install tomli-w")
+        try:
             return tomli_w.dumps(data)
-        elif format_type == "xml":
-            try:
-                import xmltodict
-            except ImportError:
-                print(
-                    "Error: xmltodict not installed. Install with: pip install xmltodict",
-                    file=sys.stderr,
-                )
-                sys.exit(1)
+        except Exception as e:
+            raise ValueError(f"Cannot serialize to toml: {e}")
+    elif format_type == "xml":
+        try:
+            import xmltodict
+        except ImportError:
+            raise ValueError(
+                "xmltodict not installed. Install with: pip install xmltodict"
+            )
+        try:
             return xmltodict.unparse(data, pretty=True)
-        else:
-            print(f"Error: Unsupported format '{format_type}'", file=sys.stderr)
-            sys.exit(1)
-    except Exception as e:
-        print(f"Error serializing to {format_type}: {e}", file=sys.stderr)
+        except Exception as e:
+            raise ValueError(f"Cannot serialize to xml: {e}")
+    else:
+        raise ValueError(f"Unsupported format '{format_type}'")
+
+
+def parse_config(data, format_type):
+    """Parse config data from specified format."""
+    try:
+        return load_config(data, format_type)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def serialize_config(data, format_type, compact=False):
+    """Serialize config data to specified format."""
+    try:
+        return dump_config(data, format_type, compact=compact)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 
@@ -109,8 +151,745 @@ def detect_format(filename):
         return None
 
 
+def convert_config_file(input_file, output_file, target_format, compact=False):
+    """Convert one config file on disk. Returns (success, error_message)."""
+    input_format = detect_format(input_file)
+    if input_format is None:
+        return False, "Cannot detect format from file extension"
+
+    try:
+        with open(input_file, "r", encoding="utf-8") as f:
+            input_data = f.read()
+        output_data = dump_config(
+            load_config(input_data, input_format), target_format, compact=compact
+        )
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(output_data)
+            f.write("\n")
+    except (OSError, ValueError) as e:
+        return False, str(e)
+
+    return True, None
+
+
+def _convert_job(job):
+    """Process pool worker: convert one (input, output, format, compact) job."""
+    input_file, output_file, target_format, compact = job
+    success, error = convert_config_file(
+        input_file, output_file, target_format, compact=compact
+    )
+    return input_file, output_file, success, error
+
+
+def convert_config_tree(root, out_dir, target_format, jobs=None, compact=False):
+    """Convert every config file under root into out_dir.
+
+    Outputs that are newer than their inputs are skipped, and inputs that
+    map to the same output (app.yaml and app.toml) fail. Returns a list of
+    (input_file, output_file, status, error_message) tuples where status is
+    "converted", "skipped" or "failed".
+    """
+    extension = FORMAT_EXTENSIONS[target_format]
+    inputs = find_files(root, CONFIG_EXTENSIONS, exclude=out_dir)
+    pairs, conflicts = split_output_conflicts(
+        [
+            (input_file, batch_output_path(input_file, root, out_dir, extension))
+            for input_file in inputs
+        ]
+    )
+    results = [
+        (input_file, output_file, "failed", error)
+        for input_file, output_file, error in conflicts
+    ]
+    pending = []
+
+    for input_file, output_file in pairs:
+        try:
+            if os.stat(output_file).st_mtime >= os.stat(input_file).st_mtime:
+                results.append((input_file, output_file, "skipped", None))
+                continue
+        except OSError:
+            pass
+        pending.append((input_file, output_file, target_format, compact))
+
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        completed = [_convert_job(job) for job in pending]
+    else:
+        # Hand each worker several chunks so uneven file sizes still balance
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            completed = list(executor.map(_convert_job, pending, chunksize=chunksize))
+
+    for input_file, output_file, success, error in completed:
+        status = "converted" if success else "failed"
+        results.append((input_file, output_file, status, error))
+
+    return results
+
+
+def handle_recursive_command(args):
+    """Handle batch conversion of a directory tree."""
+    root = args.recursive
+
+    if not os.path.isdir(root):
+        print(f"Error: Directory '{root}' not found", file=sys.stderr)
+        sys.exit(1)
+    if not args.to or not args.out_dir:
+        print("Error: --recursive requires --to and --out-dir", file=sys.stderr)
+        sys.exit(1)
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    results = convert_config_tree(
+        root, args.out_dir, args.to, jobs=args.jobs, compact=args.compact
+    )
+
+    counts = {"converted": 0, "skipped": 0, "failed": 0}
+    for input_file, _, status, error in results:
+        counts[status] += 1
+        if status == "failed":
+            print(f"Error: {input_file}: {error}", file=sys.stderr)
+
+    print(
+        f"Converted {counts['converted']}, skipped {counts['skipped']}, "
+        f"failed {counts['failed']}"
+    )
+    if counts["failed"]:
+        sys.exit(1)
+
+
+def _list_item_key(value):
+    """Return a hashable key used to de-duplicate list items."""
+    try:
+        hash(value)
+        return (type(value), value)
+    except TypeError:
+        return (type(value), json.dumps(value, sort_keys=True, default=str))
+
+
+def merge_lists(base, overlay, strategy="replace"):
+    """Merge two lists using one of LIST_STRATEGIES."""
+    if strategy == "replace":
+        return overlay
+    elif strategy == "append":
+        return base + overlay
+    elif strategy == "unique":
+        seen = {_list_item_key(item) for item in base}
+        merged = list(base)
+        for item in overlay:
+            key = _list_item_key(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+        return merged
+    elif strategy == "index":
+        merged = [merge_configs(old, new, strategy) for old, new in zip(base, overlay)]
+        longer = base if len(base) > len(overlay) else overlay
+        return merged + longer[len(merged) :]
+    else:
+        raise ValueError(f"Unsupported list strategy '{strategy}'")
+
+
+def merge_configs(base, overlay, lists="replace"):
+    """Deep-merge overlay onto base and return the result.
+
+    Neither input is mutated. Only the mappings along paths that the overlay
+    touches are copied; every other subtree is shared with the inputs, so
+    layering files costs time proportional to the overlays rather than to the
+    size of the base.
+    """
+    if isinstance(base, dict) and isinstance(overlay, dict):
+        if not overlay:
+            return base
+        if not base:
+            return overlay
+
+        merged = dict(base)
+        for key, value in overlay.items():
+            if key in merged:
+                merged[key] = merge_configs(merged[key], value, lists)
+            else:
+                merged[key] = value
+        return merged
+
+    if isinstance(base, list) and isinstance(overlay, list):
+        return merge_lists(base, overlay, lists)
+
+    return overlay
+
+
+def read_config_file(input_file):
+    """Read and parse a config file, exiting with an error message on failure."""
+    if not os.path.exists(input_file):
+        print(f"Error: Input file '{input_file}' not found", file=sys.stderr)
+        sys.exit(1)
+
+    input_format = detect_format(input_file)
+    if input_format is None:
+        print(
+            f"Error: Cannot detect format of '{input_file}'. Supported: .json, .yaml, .yml, .toml, .xml",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    try:
+        with open(input_file, "r", encoding="utf-8") as f:
+            input_data = f.read()
+    except Exception as e:
+        print(f"Error reading file: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    return parse_config(input_data, input_format)
+
+
+def handle_merge_command(argv):
+    """Handle 'config merge': deep-merge files, later files taking precedence."""
+    parser = argparse.ArgumentParser(
+        prog="util convert config merge",
+        description="Deep-merge config files of any supported format. Later files override earlier ones.",
+    )
+    parser.add_argument("files", nargs="+", help="Config files, base first")
+    parser.add_argument(
+        "--to",
+        type=str,
+        choices=CONFIG_FORMATS,
+        help="Output format (default: format of the first file)",
+    )
+    parser.add_argument(
+        "--lists",
+        type=str,
+        choices=LIST_STRATEGIES,
+        default="replace",
+        help="How to merge lists present in both files (default: replace)",
+    )
+    args = parser.parse_args(argv)
+
+    merged = None
+    for input_file in args.files:
+        data = read_config_file(input_file)
+        if data is None:
+            continue  # Empty file contributes nothing
+        merged = data if merged is None else merge_configs(merged, data, args.lists)
+
+    target_format = args.to or detect_format(args.files[0])
+    print(serialize_config(merged if merged is not None else {}, target_format))
+
+
+def subtree_digest(node, memo):
+    """Return a content digest for node, memoized by object identity.
+
+    Each subtree is hashed exactly once, bottom-up, so comparing two digests
+    tells in O(1) whether whole branches are identical.
+    """
+    key = id(node)
+    if key in memo:
+        return memo[key][0]
+
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(node, dict):
+        h.update(b"d")
+        for k in sorted(node, key=str):
+            h.update(repr(k).encode("utf-8"))
+            h.update(subtree_digest(node[k], memo))
+    elif isinstance(node, list):
+        h.update(b"l")
+        for item in node:
+            h.update(subtree_digest(item, memo))
+    else:
+        h.update(type(node).__name__.encode("utf-8"))
+        h.update(repr(node).encode("utf-8"))
+
+    digest = h.digest()
+    # Keep a reference to node so its id() can't be reused during the diff
+    memo[key] = (digest, node)
+    return digest
+
+
+def diff_configs(old, new, path=(), memo=None):
+    """Compute a structural diff between two parsed configs.
+
+    Returns a list of (op, path, old_value, new_value) tuples where op is
+    "add", "remove" or "replace" and path is a tuple of keys/indices.
+    """
+    if memo is None:
+        memo = {}
+    changes = []
+
+    if subtree_digest(old, memo) == subtree_digest(new, memo):
+        return changes
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                changes.append(("remove", path + (key,), old[key], None))
+            else:
+                changes.extend(diff_configs(old[key], new[key], path + (key,), memo))
+        for key in new:
+            if key not in old:
+                changes.append(("add", path + (key,), None, new[key]))
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for index in range(common):
+            changes.extend(diff_configs(old[index], new[index], path + (index,), memo))
+        for index in range(common, len(new)):
+            changes.append(("add", path + (index,), None, new[index]))
+        # Remove trailing items from the end so patch indices stay valid
+        for index in range(len(old) - 1, common - 1, -1):
+            changes.append(("remove", path + (index,), old[index], None))
+    else:
+        changes.append(("replace", path, old, new))
+
+    return changes
+
+
+def format_path(path):
+    """Format a diff path as a dotted query path, e.g. spec.items[0].name."""
+    parts = []
+    for key in path:
+        if isinstance(key, int):
+            parts.append(f"[{key}]")
+        else:
+            parts.append(f".{key}" if parts else str(key))
+    return "".join(parts) or "."
+
+
+def format_json_pointer(path):
+    """Format a diff path as an RFC 6901 JSON Pointer."""
+    return "".join("/" + str(key).replace("~", "~0").replace("/", "~1") for key in path)
+
+
+def changes_to_json_patch(changes):
+    """Convert diff_configs output to an RFC 6902 JSON Patch document."""
+    patch = []
+    for op, path, _, new_value in changes:
+        operation = {"op": op, "path": format_json_pointer(path)}
+        if op != "remove":
+            operation["value"] = new_value
+        patch.append(operation)
+    return patch
+
+
+def handle_diff_command(argv):
+    """Handle 'config diff': show structural differences between two files."""
+    parser = argparse.ArgumentParser(
+        prog="util convert config diff",
+        description="Show added, removed and changed paths between two config files of any supported format.",
+    )
+    parser.add_argument("old_file", help="Original config file")
+    parser.add_argument("new_file", help="Updated config file")
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=["human", "patch"],
+        default="human",
+        help="Output format: human-readable lines or JSON Patch (default: human)",
+    )
+    parser.add_argument(
+        "--exit-code",
+        action="store_true",
+        help="Exit with status 1 if the files differ",
+    )
+    args = parser.parse_args(argv)
+
+    old = read_config_file(args.old_file)
+    new = read_config_file(args.new_file)
+    changes = diff_configs(old, new)
+
+    if args.format == "patch":
+        print(json_backend.dumps(changes_to_json_patch(changes), default=str))
+    else:
+        symbols = {"add": "+", "remove": "-", "replace": "~"}
+        for op, path, old_value, new_value in changes:
+            line = f"{symbols[op]} {format_path(path)}: "
+            if op == "add":
+                line += json.dumps(new_value, ensure_ascii=False, default=str)
+            elif op == "remove":
+                line += json.dumps(old_value, ensure_ascii=False, default=str)
+            else:
+                line += (
+                    json.dumps(old_value, ensure_ascii=False, default=str)
+                    + " -> "
+                    + json.dumps(new_value, ensure_ascii=False, default=str)
+                )
+            print(line)
+
+    if changes and args.exit_code:
+        sys.exit(1)
+
+
+def compile_query(query):
+    """Compile a path such as spec.containers[0].image into a tuple of keys."""
+    if query in ("", "."):
+        return ()
+
+    keys = []
+    pos = 0
+    while pos < len(query):
+        match = _PATH_TOKEN.match(query, pos)
+        if not match:
+            raise ValueError(f"Invalid path '{query}' at position {pos}")
+        name, index, quoted = match.groups()
+        if index is not None:
+            keys.append(int(index))
+        elif quoted is not None:
+            keys.append(json.loads(f'"{quoted}"'))
+        else:
+            keys.append(name)
+        pos = match.end()
+    return tuple(keys)
+
+
+def build_query_trie(paths):
+    """Merge compiled paths into a trie so shared prefixes are walked once."""
+    root = {"targets": [], "children": {}}
+    for index, path in enumerate(paths):
+        node = root
+        for key in path:
+            node = node["children"].setdefault(key, {"targets": [], "children": {}})
+        node["targets"].append(index)
+    return root
+
+
+class _QueryState:
+    """Results of a query run plus the number of paths still unresolved."""
+
+    def __init__(self, count):
+        self.results = [None] * count
+        self.found = [False] * count
+        self.pending = count
+
+    def resolve(self, index, value):
+        if not self.found[index]:
+            self.found[index] = True
+            self.results[index] = value
+            self.pending -= 1
+
+
+class _QueryDone(Exception):
+    """Raised to abandon a lazy JSON scan once every path is resolved.
+
+    Carries the position the scan stopped at and, innermost first, the
+    member names wanted in each object left open (None for arrays).
+    """
+
+    def __init__(self, pos):
+        super().__init__(pos)
+        self.pos = pos
+        self.open = []
+
+
+class _QueryRepeat(Exception):
+    """Raised when a scanned object repeats a member a path passes through."""
+
+
+def _lookup(value, key):
+    """Look up a single path key in a parsed value, returning (found, child)."""
+    if isinstance(value, dict):
+        if key in value:
+            return True, value[key]
+        if isinstance(key, int) and str(key) in value:
+            return True, value[str(key)]
+    elif isinstance(value, list) and isinstance(key, int):
+        if -len(value) <= key < len(value):
+            return True, value[key]
+    return False, None
+
+
+def _resolve_tree(value, node, state):
+    """Resolve every path in a trie node against an already parsed value."""
+    for index in node["targets"]:
+        state.resolve(index, value)
+    for key, child in node["children"].items():
+        found, child_value = _lookup(value, key)
+        if found:
+            _resolve_tree(child_value, child, state)
+
+
+def _skip_json_value(text, pos, decoder):
+    """Return the end of the JSON value starting at pos, discarding the value."""
+    try:
+        return decoder.scan_once(text, pos)[1]
+    except StopIteration:
+        raise ValueError(f"Expecting value at position {pos}")
+
+
+def _scan_json_value(text, pos, node, state, decoder):
+    """Walk the JSON value at pos, decoding only what the trie node needs.
+
+    Returns the position just past the value. Values that no path passes
+    through are handed to the C scanner and discarded, and nothing after the
+    last resolved path is read at all.
+    """
+    char = text[pos : pos + 1]
+    wants_negative = any(isinstance(k, int) and k < 0 for k in node["children"])
+
+    if node["targets"] or (char == "[" and wants_negative):
+        value, end = decoder.raw_decode(text, pos)
+        _resolve_tree(value, node, state)
+    elif char == "{":
+        end = _scan_json_object(text, pos, node, state, decoder)
+    elif char == "[":
+        end = _scan_json_array(text, pos, node, state, decoder)
+    else:
+        end = _skip_json_value(text, pos, decoder)
+
+    if state.pending == 0:
+        raise _QueryDone(end)
+    return end
+
+
+def _scan_json_object(text, pos, node, state, decoder):
+    """Scan a JSON object, descending only into members named in the trie.
+
+    Index keys also match members with the same name, as in _lookup, so
+    a[0] finds {"a": {"0": ...}}.
+    """
+    children = node["children"]
+    numeric = {str(k): child for k, child in children.items() if isinstance(k, int)}
+    seen = set()
+    pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+    if text[pos : pos + 1] == "}":
+        return pos + 1
+
+    while True:
+        if text[pos : pos + 1] != '"':
+            raise ValueError(f"Expecting property name at position {pos}")
+        key, pos = scanstring(text, pos + 1)
+        pos = _JSON_WHITESPACE.match(text, pos).end()
+        if text[pos : pos + 1] != ":":
+            raise ValueError(f"Expecting ':' at position {pos}")
+        pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+
+        child = children.get(key)
+        numeric_child = numeric.get(key)
+        if child is not None or numeric_child is not None:
+            if key in seen:
+                raise _QueryRepeat()
+            seen.add(key)
+        try:
+            if child is not None and numeric_child is not None:
+                # Both a["0"] and a[0] were asked for: decode the member once
+                value, pos = decoder.raw_decode(text, pos)
+                _resolve_tree(value, child, state)
+                _resolve_tree(value, numeric_child, state)
+                if state.pending == 0:
+                    raise _QueryDone(pos)
+            elif child is not None or numeric_child is not None:
+                node_child = numeric_child if child is None else child
+                pos = _scan_json_value(text, pos, node_child, state, decoder)
+            else:
+                pos = _skip_json_value(text, pos, decoder)
+        except _QueryDone as done:
+            done.open.append(
+                {key for key in children if isinstance(key, str)} | set(numeric)
+            )
+            raise
+
+        pos = _JSON_WHITESPACE.match(text, pos).end()
+        char = text[pos : pos + 1]
+        if char == "}":
+            return pos + 1
+        if char != ",":
+            raise ValueError(f"Expecting ',' or '}}' at position {pos}")
+        pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+
+
+def _scan_json_array(text, pos, node, state, decoder):
+    """Scan a JSON array, descending only into indices named in the trie."""
+    children = node["children"]
+    pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+    if text[pos : pos + 1] == "]":
+        return pos + 1
+
+    index = 0
+    while True:
+        if index in children:
+            try:
+                pos = _scan_json_value(text, pos, children[index], state, decoder)
+            except _QueryDone as done:
+                done.open.append(None)
+                raise
+        else:
+            pos = _skip_json_value(text, pos, decoder)
+
+        pos = _JSON_WHITESPACE.match(text, pos).end()
+        char = text[pos : pos + 1]
+        if char == "]":
+            return pos + 1
+        if char != ",":
+            raise ValueError(f"Expecting ',' or ']' at position {pos}")
+        pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+        index += 1
+
+
+def _finish_json_scan(text, done, decoder):
+    """Read the containers a stopped scan left open, skipping their values.
+
+    Raises _QueryRepeat if an open object repeats a member a path passed
+    through. Reading stops once the rest of the text cannot name any such
+    member: names are searched for as JSON strings, and any \\u or \\/
+    escape could spell one differently.
+    """
+    pos = done.pos
+    for depth, wanted in enumerate(done.open):
+        needles = {"\\u", "\\/"}
+        for names in done.open[depth:]:
+            needles.update(json.dumps(name, ensure_ascii=False) for name in names or ())
+        if not any(text.find(needle, pos) != -1 for needle in needles):
+            return
+        closing = "]" if wanted is None else "}"
+        while True:
+            pos = _JSON_WHITESPACE.match(text, pos).end()
+            char = text[pos : pos + 1]
+            if char == closing:
+                pos += 1
+                break
+            if char != ",":
+                raise ValueError(f"Expecting ',' or '{closing}' at position {pos}")
+            pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+            if wanted is not None:
+                if text[pos : pos + 1] != '"':
+                    raise ValueError(f"Expecting property name at position {pos}")
+                key, pos = scanstring(text, pos + 1)
+                if key in wanted:
+                    raise _QueryRepeat()
+                pos = _JSON_WHITESPACE.match(text, pos).end()
+                if text[pos : pos + 1] != ":":
+                    raise ValueError(f"Expecting ':' at position {pos}")
+                pos = _JSON_WHITESPACE.match(text, pos + 1).end()
+            pos = _skip_json_value(text, pos, decoder)
+
+
+def query_json_text(text, paths):
+    """Resolve compiled paths against raw JSON text with a single lazy scan.
+
+    The scan stops as soon as every path is resolved; anything off the
+    requested paths is skipped without being decoded. Duplicate member
+    names resolve to the last one, as json.loads does: while the rest of
+    the text may name a requested member again, the objects left open are
+    read on, and if a member a path passes through repeats the document is
+    decoded in full instead. Returns a list of (found, value)
+    pairs in the order of paths.
+    """
+    state = _QueryState(len(paths))
+    if paths:
+        pos = _JSON_WHITESPACE.match(text, 0).end()
+        trie = build_query_trie(paths)
+        decoder = json.JSONDecoder()
+        try:
+            try:
+                _scan_json_value(text, pos, trie, state, decoder)
+                repeated = False
+            except _QueryDone as done:
+                try:
+                    _finish_json_scan(text, done, decoder)
+                    repeated = False
+                except _QueryRepeat:
+                    repeated = True
+            except _QueryRepeat:
+                repeated = True
+            if repeated:
+                state = _QueryState(len(paths))
+                _resolve_tree(decoder.raw_decode(text, pos)[0], trie, state)
+        except (IndexError, json.JSONDecodeError) as e:
+            raise ValueError(f"Cannot parse json: {e}")
+    return list(zip(state.found, state.results))
+
+
+def query_config(data, paths):
+    """Resolve compiled paths against an already parsed config tree."""
+    state = _QueryState(len(paths))
+    _resolve_tree(data, build_query_trie(paths), state)
+    return list(zip(state.found, state.results))
+
+
+def handle_get_command(argv):
+    """Handle 'config get': print the values at one or more paths."""
+    parser = argparse.ArgumentParser(
+        prog="util convert config get",
+        description="Print values at paths like spec.containers[0].image from a config file. "
+        "JSON files are scanned lazily and only as far as needed.",
+    )
+    parser.add_argument("input_file", help="Config file to query")
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help='Paths such as a.b[0].c or a["dotted.key"] (use . for the whole document)',
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print every value as JSON (strings are quoted)",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        compiled = [compile_query(path) for path in args.paths]
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if detect_format(args.input_file) == "json" and os.path.exists(args.input_file):
+        try:
+            with open(args.input_file, "r", encoding="utf-8") as f:
+                text = f.read()
+            results = query_json_text(text, compiled)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        results = query_config(read_config_file(args.input_file), compiled)
+
+    missing = False
+    for path, (found, value) in zip(args.paths, results):
+        if not found:
+            print(f"Error: Path '{path}' not found", file=sys.stderr)
+            missing = True
+        elif isinstance(value, str) and not args.json:
+            print(value)
+        elif isinstance(value, (dict, list)):
+            print(json_backend.dumps(value, default=str))
+        else:
+            print(json.dumps(value, ensure_ascii=False, default=str))
+
+    if missing:
+        sys.exit(1)
+
+
+CONFIG_ACTIONS = {
+    "merge": handle_merge_command,
+    "diff": handle_diff_command,
+    "get": handle_get_command,
+}
+
+
 def handle_command(args):
     """Handle config conversion command."""
+    if args.input_file in CONFIG_ACTIONS:
+        argv = [args.target_format] if args.target_format else []
+        CONFIG_ACTIONS[args.input_file](argv + args.operands)
+        return
+
+    if args.operands:
+        # Options given after the positional arguments end up in operands
+        option_parser = argparse.ArgumentParser(prog="util convert config")
+        add_conversion_arguments(option_parser)
+        option_parser.parse_args(args.operands, namespace=args)
+
+    if args.recursive:
+        handle_recursive_command(args)
+        return
+
+    if not args.input_file or not args.target_format:
+        print(
+            "Error: input_file and target_format are required (or use --recursive)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     input_file = args.input_file
     target_format = args.target_format.lower()
 
@@ -129,7 +908,7 @@ def handle_command(args):
         sys.exit(1)
 
     # Validate target format
-    if target_format not in ["json", "yaml", "toml", "xml"]:
+    if target_format not in CONFIG_FORMATS:
         print(
             f"Error: Unsupported target format '{target_format}'. Use: json, yaml, toml, xml",
             file=sys.stderr,
@@ -148,24 +927,68 @@ def handle_command(args):
     parsed_data = parse_config(input_data, input_format)
 
     # Convert to target format
-    output_data = serialize_config(parsed_data, target_format)
+    output_data = serialize_config(parsed_data, target_format, compact=args.compact)
 
     # Print to stdout
     print(output_data)
 
 
+def add_conversion_arguments(parser):
+    """Add the options shared by single-file and --recursive conversion."""
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Emit JSON output without indentation or whitespace",
+    )
+    parser.add_argument(
+        "--recursive",
+        "-r",
+        type=str,
+        metavar="DIR",
+        help="Convert every config file under DIR (requires --to and --out-dir)",
+    )
+    parser.add_argument(
+        "--to",
+        type=str,
+        choices=CONFIG_FORMATS,
+        help="Target format for --recursive",
+    )
+    parser.add_argument(
+        "--out-dir",
+        "-o",
+        type=str,
+        help="Output directory for --recursive (mirrors the input tree)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of worker processes for --recursive (default: CPU count)",
+    )
+
+
 def setup_parser(subparsers):
     """Setup config conversion subparser."""
     config_parser = subparsers.add_parser(
         "config",
         help="Convert config file formats",
         description="Convert between JSON, YAML, TOML, and XML configuration files.",
+        epilog="Actions: 'util convert config merge FILE [FILE ...]' deep-merges files, 'util convert config diff OLD NEW' shows structural differences, 'util convert config get FILE PATH [PATH ...]' prints values (see '<action> --help').",
+    )
+    config_parser.add_argument(
+        "input_file",
+        type=str,
+        nargs="?",
+        help="Input config file, or an action: merge, diff, get",
     )
-    config_parser.add_argument("input_file", type=str, help="Input config file")
     config_parser.add_argument(
         "target_format",
         type=str,
-        choices=["json", "yaml", "toml", "xml"],
-        help="Target format",
+        nargs="?",
+        help="Target format: json, yaml, toml, xml",
+    )
+    config_parser.add_argument(
+        "operands", nargs=argparse.REMAINDER, help=argparse.SUPPRESS
     )
+    add_conversion_arguments(config_parser)
     config_parser.set_defaults(func=handle_command)
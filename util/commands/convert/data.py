@@ -1,75 +1,168 @@
 import re
 import sys
 
+# Number, optional unit prefix, optional "i" for IEC units, optional "B"
+SIZE_PATTERN = re.compile(
+    r"^(\d+(?:\.\d*)?|\.\d+)\s*(?:([KMGTP])(I?)B?|B)?$", re.IGNORECASE
+)
+PREFIXES = "KMGTP"
 
-def parse_size(value):
-    """Parse data size input and return bytes."""
-    value = value.strip().upper()
+# Unit system: (multiplier, unit labels from bytes up)
+UNIT_SYSTEMS = {
+    "binary": (1024, ["B", "KB", "MB", "GB", "TB", "PB"]),
+    "iec": (1024, ["B", "KiB", "MiB", "GiB", "TiB", "PiB"]),
+    "si": (1000, ["B", "kB", "MB", "GB", "TB", "PB"]),
+}
+WRITE_BATCH = 65536  # rewritten lines per write in filter mode
+
+
+def parse_size(value, si=False):
+    """Parse data size input and return bytes.
+
+    K, M, G, T and P units are powers of 1024, or of 1000 when si is set;
+    KiB, MiB and the other IEC units are always powers of 1024.
+    """
+    value = value.strip()
 
     # Try to parse with unit suffix
-    match = re.match(r"^([\d.]+)\s*([KMGT]?B?)$", value, re.IGNORECASE)
+    match = SIZE_PATTERN.match(value)
     if match:
-        num_str, unit = match.groups()
-        num = float(num_str)
-        unit = unit.upper()
-
-        if unit in ["", "B"]:
+        number, prefix, iec = match.groups()
+        num = float(number)
+        if not prefix:
             return int(num)
-        elif unit in ["K", "KB"]:
-            return int(num * 1024)
-        elif unit in ["M", "MB"]:
-            return int(num * 1024 * 1024)
-        elif unit in ["G", "GB"]:
-            return int(num * 1024 * 1024 * 1024)
-        elif unit in ["T", "TB"]:
-            return int(num * 1024 * 1024 * 1024 * 1024)
+        multiplier = 1000 if si and not iec else 1024
+        return int(num * multiplier ** (PREFIXES.index(prefix.upper()) + 1))
 
     # Try plain number (assume bytes)
     try:
         return int(float(value))
-    except ValueError:
+    except (ValueError, OverflowError):
         return None
 
 
-def format_bytes(bytes_val, target_unit):
-    """Format bytes to target unit."""
+def size_formatter(target_unit, system="binary"):
+    """Return a function formatting a byte count in a target unit, or None.
+
+    The unit is resolved once, so the function is cheap to call per value
+    when rewriting streams. Unit labels and multipliers follow system:
+    binary (1024, KB), iec (1024, KiB) or si (1000, kB).
+    """
     target_unit = target_unit.lower()
+    if target_unit.endswith("ib"):
+        # An IEC unit selects IEC labels whatever the system
+        system = "iec"
+        target_unit = target_unit[0]
+    multiplier, labels = UNIT_SYSTEMS[system]
 
     if target_unit in ["b", "bytes"]:
-        return f"{bytes_val} B"
-    elif target_unit in ["kb", "k"]:
-        return f"{bytes_val / 1024:.2f} KB"
-    elif target_unit in ["mb", "m"]:
-        return f"{bytes_val / (1024 * 1024):.2f} MB"
-    elif target_unit in ["gb", "g"]:
-        return f"{bytes_val / (1024 * 1024 * 1024):.2f} GB"
-    elif target_unit in ["tb", "t"]:
-        return f"{bytes_val / (1024 * 1024 * 1024 * 1024):.2f} TB"
-    elif target_unit in ["auto", "smart"]:
+        return lambda bytes_val: f"{bytes_val} B"
+    if target_unit in ["auto", "smart"]:
         # Automatically choose best unit
-        if bytes_val < 1024:
-            return f"{bytes_val} B"
-        elif bytes_val < 1024 * 1024:
-            return f"{bytes_val / 1024:.2f} KB"
-        elif bytes_val < 1024 * 1024 * 1024:
-            return f"{bytes_val / (1024 * 1024):.2f} MB"
-        elif bytes_val < 1024 * 1024 * 1024 * 1024:
-            return f"{bytes_val / (1024 * 1024 * 1024):.2f} GB"
-        else:
-            return f"{bytes_val / (1024 * 1024 * 1024 * 1024):.2f} TB"
-    else:
+        def auto(bytes_val):
+            if -multiplier < bytes_val < multiplier:
+                return f"{bytes_val} B"
+            if multiplier == 1024:
+                exponent = min((abs(bytes_val).bit_length() - 1) // 10, 5)
+            else:
+                exponent = min((len(str(abs(bytes_val))) - 1) // 3, 5)
+            return f"{bytes_val / multiplier ** exponent:.2f} {labels[exponent]}"
+
+        return auto
+
+    prefix = target_unit[:-1] if target_unit.endswith("b") else target_unit
+    prefix = prefix.upper()
+    if len(prefix) != 1 or prefix not in PREFIXES:
+        return None
+    exponent = PREFIXES.index(prefix) + 1
+    scale = multiplier**exponent
+    label = labels[exponent]
+    return lambda bytes_val: f"{bytes_val / scale:.2f} {label}"
+
+
+def format_bytes(bytes_val, target_unit, system="binary"):
+    """Format bytes to target unit."""
+    formatter = size_formatter(target_unit, system)
+    if formatter is None:
         print(f"Error: Unsupported target unit '{target_unit}'", file=sys.stderr)
         sys.exit(1)
+    return formatter(bytes_val)
+
+
+def field_scanner(column):
+    """Compile a regex matching the 1-based whitespace-separated column of a line."""
+    return re.compile(r"\s*(?:\S+\s+){%d}(\S+)" % (column - 1))
+
+
+def rewrite_sizes(lines, column, formatter, si=False, out=None):
+    """Rewrite the byte count in one column of every line, keeping the rest.
+
+    Lines whose column is missing or is not a size pass through unchanged,
+    so headers and totals survive. Output is written in large batches.
+    """
+    out = out or sys.stdout
+    scanner = field_scanner(column)
+    batch = []
+    for line in lines:
+        match = scanner.match(line)
+        if match:
+            field = match.group(1)
+            try:
+                size = int(field)
+            except ValueError:
+                size = parse_size(field, si)
+            if size is not None:
+                line = line[: match.start(1)] + formatter(size) + line[match.end(1) :]
+        batch.append(line)
+        if len(batch) >= WRITE_BATCH:
+            out.write("".join(batch))
+            batch = []
+    out.write("".join(batch))
+
+
+def sum_sizes(lines, column, si=False):
+    """Return the total of the sizes in one column of every line."""
+    scanner = field_scanner(column)
+    total = 0
+    for line in lines:
+        match = scanner.match(line)
+        if not match:
+            continue
+        field = match.group(1)
+        try:
+            size = int(field)
+        except ValueError:
+            size = parse_size(field, si)
+        if size is not None:
+            total += size
+    return total
 
 
 def handle_command(args):
     """Handle data size conversion command."""
-    bytes_val = parse_size(args.value)
+    system = "si" if args.si else "iec" if args.iec else "binary"
+    formatter = size_formatter(args.target, system)
+    if formatter is None:
+        print(f"Error: Unsupported target unit '{args.target}'", file=sys.stderr)
+        sys.exit(1)
+    if args.column < 1:
+        print("Error: --column must be 1 or more", file=sys.stderr)
+        sys.exit(1)
+
+    if args.value == "-":
+        if args.sum:
+            total = sum_sizes(sys.stdin, args.column, args.si)
+            print(formatter(total))
+        else:
+            rewrite_sizes(sys.stdin, args.column, formatter, args.si)
+        return
+
+    bytes_val = parse_size(args.value, args.si)
     if bytes_val is None:
         print(f"Error: Unable to parse data size '{args.value}'", file=sys.stderr)
         sys.exit(1)
 
-    result = format_bytes(bytes_val, args.target)
+    result = formatter(bytes_val)
     print(result)
 
 
@@ -78,14 +171,39 @@ def setup_parser(subparsers):
     data_parser = subparsers.add_parser(
         "data",
         help="Convert data sizes",
-        description="Convert between bytes, KB, MB, GB, TB.",
+        description="Convert between bytes, KB, MB, GB, TB, PB, or rewrite sizes in a stream of lines (e.g. du -b or ls -l output).",
     )
     data_parser.add_argument(
-        "value", type=str, help="Data size value (e.g., 1024, 1KB, 1.5MB)"
+        "value",
+        type=str,
+        help="Data size value (e.g., 1024, 1KB, 1.5MB, 2GiB), or - to rewrite sizes in stdin lines",
     )
     data_parser.add_argument(
         "target",
         type=str,
-        help="Target unit: bytes, kb, mb, gb, tb, auto",
+        help="Target unit: bytes, kb, mb, gb, tb, pb, kib..pib, auto",
+    )
+    units = data_parser.add_mutually_exclusive_group()
+    units.add_argument(
+        "--si",
+        action="store_true",
+        help="Use powers of 1000 (kB, MB, ...) for input and output units",
+    )
+    units.add_argument(
+        "--iec",
+        action="store_true",
+        help="Label powers of 1024 with IEC units (KiB, MiB, ...)",
+    )
+    data_parser.add_argument(
+        "--column",
+        "-c",
+        type=int,
+        default=1,
+        help="With -, the whitespace-separated column holding sizes (default: 1, as in du -b; 5 for ls -l)",
+    )
+    data_parser.add_argument(
+        "--sum",
+        action="store_true",
+        help="With -, print the total of the sizes in the column instead of rewriting lines",
     )
     data_parser.set_defaults(func=handle_command)
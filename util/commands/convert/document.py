@@ -1,127 +1,434 @@
+import collections
+import functools
+import json
 import os
-import platform
+import re
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+from .batch import batch_jobs
+from .cache import add_cache_arguments, build_cache, cached_conversion
+from .media import STDERR_TAIL_LINES
+from .tools import install_instructions, probe_tool
 
-def get_pandoc_install_instructions():
-    """Get OS-specific Pandoc installation instructions."""
-    system = platform.system()
-
-    if system == "Darwin":  # macOS
-        return "brew install pandoc"
-    elif system == "Linux":
-        # Try to detect the distro
-        try:
-            with open("/etc/os-release") as f:
-                os_info = f.read().lower()
-                if "ubuntu" in os_info or "debian" in os_info:
-                    return "sudo apt install pandoc"
-                elif "fedora" in os_info or "rhel" in os_info or "centos" in os_info:
-                    return "sudo dnf install pandoc"
-                elif "arch" in os_info:
-                    return "sudo pacman -S pandoc"
-        except FileNotFoundError:
-            pass
-        return "sudo apt install pandoc  # or dnf/yum/pacman depending on your distro"
-    elif system == "Windows":
-        return "choco install pandoc  # or download from pandoc.org"
-    else:
-        return "Visit: https://pandoc.org/installing.html"
+# Options each batch output was converted with, kept in the output directory;
+# hidden so directory batches never pick it up
+BATCH_STATE_FILE = ".cliutils-doc-batch.json"
 
 
 def check_pandoc_installed():
     """Check if Pandoc is installed."""
-    try:
-        subprocess.run(
-            ["pandoc", "--version"],
-            capture_output=True,
-            check=True,
-        )
+    return probe_tool("pandoc") is not None
+
+
+def pandoc_can_write(output_format):
+    """Return False if the installed Pandoc does not list output_format.
+
+    Formats with extensions (gfm+smart) are checked by their base name. PDF
+    goes through a separate engine and custom Lua writers are paths, so
+    neither is checked.
+    """
+    pandoc = probe_tool("pandoc")
+    base = re.split(r"[+-]", output_format, maxsplit=1)[0]
+    if not pandoc or not pandoc.get("writers") or base == "pdf" or "." in base:
         return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    return base in pandoc["writers"]
+
+
+def pandoc_can_read(input_format):
+    """Return False if the installed Pandoc cannot read input_format.
+
+    Formats with extensions are checked by their base name. When Pandoc did
+    not list its readers only UNREADABLE_FORMATS are refused.
+    """
+    base = re.split(r"[+-]", input_format, maxsplit=1)[0]
+    if base in UNREADABLE_FORMATS:
         return False
+    pandoc = probe_tool("pandoc")
+    if not pandoc or not pandoc.get("readers") or "." in base:
+        return True
+    return base in pandoc["readers"]
+
+
+# Map extensions to Pandoc format names
+FORMAT_MAP = {
+    ".md": "markdown",
+    ".markdown": "markdown",
+    ".html": "html",
+    ".htm": "html",
+    ".pdf": "pdf",
+    ".docx": "docx",
+    ".doc": "doc",
+    ".odt": "odt",
+    ".rtf": "rtf",
+    ".txt": "plain",
+    ".rst": "rst",
+    ".tex": "latex",
+    ".adoc": "asciidoc",
+    ".org": "org",
+    ".epub": "epub",
+    ".ipynb": "ipynb",
+}
+# Formats above that Pandoc has no reader for
+UNREADABLE_FORMATS = {"pdf", "doc", "plain"}
 
 
 def detect_format(filename):
     """Detect document format from file extension."""
     ext = os.path.splitext(filename)[1].lower()
+    return FORMAT_MAP.get(ext)
 
-    # Map extensions to Pandoc format names
-    format_map = {
-        ".md": "markdown",
-        ".markdown": "markdown",
-        ".html": "html",
-        ".htm": "html",
-        ".pdf": "pdf",
-        ".docx": "docx",
-        ".doc": "doc",
-        ".odt": "odt",
-        ".rtf": "rtf",
-        ".txt": "plain",
-        ".rst": "rst",
-        ".tex": "latex",
-        ".adoc": "asciidoc",
-        ".org": "org",
-        ".epub": "epub",
-        ".ipynb": "ipynb",
-    }
 
-    return format_map.get(ext)
+def detect_input_format(filename):
+    """Detect the Pandoc reader for an input file, or None to let Pandoc pick.
+
+    Pandoc has no plain-text reader, so .txt files are left to Pandoc, which
+    reads them as Markdown.
+    """
+    input_format = detect_format(filename)
+    return None if input_format == "plain" else input_format
+
 
+def run_pandoc(
+    input_file, output_file, from_format=None, to_format=None, extra_args=None
+):
+    """Run Pandoc on one document. Returns (success, error_message).
 
-def convert_document(input_file, output_file, from_format=None, to_format=None):
-    """Convert document using Pandoc."""
-    # Build Pandoc command
-    cmd = ["pandoc", input_file, "-o", output_file]
+    Either file may be "-" for stdin or stdout. Those streams are handed to
+    pandoc as they are, so piped data flows straight between the processes
+    on either side without being buffered or written to disk here. Only the
+    last STDERR_TAIL_LINES lines of pandoc's stderr are kept.
+    """
+    # Build Pandoc command; pandoc reads stdin when given no input file and
+    # "-o -" writes any format, binary ones included, to stdout
+    cmd = ["pandoc"]
+    if input_file != "-":
+        cmd.append(input_file)
+    cmd.extend(["-o", output_file])
 
     # Add format specifications if provided
     if from_format:
         cmd.extend(["-f", from_format])
     if to_format:
         cmd.extend(["-t", to_format])
+    cmd.extend(extra_args or [])
 
+    if output_file == "-":
+        sys.stdout.flush()
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdin=None if input_file == "-" else subprocess.DEVNULL,
+            stdout=None if output_file == "-" else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True,
+            errors="replace",
         )
+    except OSError as e:
+        return False, f"Cannot run pandoc: {e}"
 
-        if result.returncode != 0:
-            print("Error: Pandoc conversion failed", file=sys.stderr)
-            if result.stderr:
-                print(result.stderr, file=sys.stderr)
-            return False
+    with process:
+        tail = collections.deque(
+            (line.rstrip() for line in process.stderr), maxlen=STDERR_TAIL_LINES
+        )
+    if process.returncode != 0:
+        details = "\n".join(line for line in tail if line).strip()
+        return False, f"Pandoc conversion failed\n{details}".rstrip()
+    return True, None
 
-        return True
-    except Exception as e:
-        print(f"Error converting document: {e}", file=sys.stderr)
+
+def pandoc_cache_options(from_format, to_format, extra_args=None):
+    """Return the options a cached Pandoc output is keyed on.
+
+    The Pandoc version is part of the key, so upgrading Pandoc invalidates
+    every entry. Files the document pulls in (templates, includes, images)
+    are not hashed.
+    """
+    pandoc = probe_tool("pandoc")
+    return {
+        "from": from_format,
+        "to": to_format,
+        "pandoc": pandoc["version"] if pandoc else None,
+        "args": list(extra_args or []),
+    }
+
+
+def convert_document(
+    input_file,
+    output_file,
+    from_format=None,
+    to_format=None,
+    extra_args=None,
+    cache=None,
+):
+    """Convert document using Pandoc, reusing cached outputs when given a cache."""
+    convert = functools.partial(
+        run_pandoc, from_format=from_format, to_format=to_format, extra_args=extra_args
+    )
+    options = pandoc_cache_options(from_format, to_format, extra_args)
+    success, error, _ = cached_conversion(
+        input_file, output_file, convert, cache, options
+    )
+    if not success:
+        print(f"Error: {error}", file=sys.stderr)
+    return success
+
+
+def is_up_to_date(input_file, output_file):
+    """Return True if output_file exists and is at least as new as input_file."""
+    try:
+        return os.stat(output_file).st_mtime_ns >= os.stat(input_file).st_mtime_ns
+    except OSError:
         return False
 
 
-def handle_command(args):
-    """Handle document conversion command."""
-    input_file = args.input_file
-    output_file = args.output_file
+def load_batch_state(out_dir):
+    """Return {output path relative to out_dir: options} from an earlier batch."""
+    try:
+        with open(os.path.join(out_dir, BATCH_STATE_FILE)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_batch_state(out_dir, state):
+    """Atomically write the batch state, ignoring an unwritable out_dir."""
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, sort_keys=True)
+        os.replace(tmp_path, os.path.join(out_dir, BATCH_STATE_FILE))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _convert_document_job(job):
+    """Thread pool worker: convert one (input, output, from, to, args, cache) job."""
+    input_file, output_file, from_format, to_format, extra_args, cache = job
+    from_format = from_format or detect_input_format(input_file)
+    to_format = to_format or detect_format(output_file)
+    convert = functools.partial(
+        run_pandoc, from_format=from_format, to_format=to_format, extra_args=extra_args
+    )
+
+    start = time.perf_counter()
+    success, error, cached = cached_conversion(
+        input_file,
+        output_file,
+        convert,
+        cache,
+        pandoc_cache_options(from_format, to_format, extra_args),
+    )
+    status = "cached" if cached else "converted" if success else "failed"
+    return input_file, output_file, status, error, time.perf_counter() - start
+
 
-    # Check if Pandoc is installed
+def convert_document_batch(
+    source,
+    out_dir,
+    target_extension,
+    from_format=None,
+    to_format=None,
+    jobs=None,
+    force=False,
+    extra_args=None,
+    cache=None,
+):
+    """Convert every document matching a glob pattern, or under a directory.
+
+    Pandoc runs as one subprocess per document with up to jobs running at
+    once; threads are enough since the work happens in pandoc. (pandoc-server,
+    from Pandoc 3, could serve every document from one process, but it is a
+    separate HTTP service that is often not installed.) Outputs newer than
+    their input and converted with the same formats, Pandoc arguments and
+    Pandoc version are skipped unless force is set, and the rest are served
+    from cache when it holds them. Directories are searched for
+    documents Pandoc can read that are not already in the target format.
+    Inputs sharing an output path fail without being converted. Returns a list of
+    (input_file, output_file, status, error_message, seconds) tuples, where
+    status is "converted", "cached", "skipped" or "failed".
+    """
+    if not target_extension.startswith("."):
+        target_extension = "." + target_extension
+    extensions = [
+        ext
+        for ext, input_format in FORMAT_MAP.items()
+        if ext != target_extension and pandoc_can_read(input_format)
+    ]
+
+    pairs, conflicts = batch_jobs(source, out_dir, target_extension, extensions)
+    results = [
+        (input_file, output_file, "failed", error, 0.0)
+        for input_file, output_file, error in conflicts
+    ]
+    options = pandoc_cache_options(from_format, to_format, extra_args)
+    state = load_batch_state(out_dir)
+    pending = []
+    for input_file, output_file in pairs:
+        converted_with = state.get(os.path.relpath(output_file, out_dir))
+        if (
+            not force
+            and converted_with == options
+            and is_up_to_date(input_file, output_file)
+        ):
+            results.append((input_file, output_file, "skipped", None, 0.0))
+        else:
+            job = (input_file, output_file, from_format, to_format, extra_args, cache)
+            pending.append(job)
+
+    workers = jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        completed = list(executor.map(_convert_document_job, pending))
+    for _, output_file, status, _, _ in completed:
+        if status == "failed":
+            state.pop(os.path.relpath(output_file, out_dir), None)
+        else:
+            state[os.path.relpath(output_file, out_dir)] = options
+    if completed:
+        save_batch_state(out_dir, state)
+    results.extend(completed)
+    return sorted(results)
+
+
+def cache_summary(results):
+    """Describe cache hits and misses in a batch, with the time saved.
+
+    Time saved is estimated from the average duration of the conversions
+    that missed.
+    """
+    hits = [result for result in results if result[2] == "cached"]
+    misses = [result for result in results if result[2] in ("converted", "failed")]
+    total = len(hits) + len(misses)
+    rate = len(hits) / total * 100 if total else 0.0
+    summary = f"Cache: {len(hits)} hits, {len(misses)} misses ({rate:.0f}% hit rate"
+    if hits and misses:
+        average = sum(result[4] for result in misses) / len(misses)
+        saved = max(0.0, average * len(hits) - sum(result[4] for result in hits))
+        summary += f", ~{saved:.1f}s saved"
+    return summary + ")"
+
+
+def require_pandoc():
+    """Exit with install instructions unless Pandoc is available."""
     if not check_pandoc_installed():
         print(
             "Error: Pandoc not installed. Install Pandoc to convert documents.",
             file=sys.stderr,
         )
-        install_cmd = get_pandoc_install_instructions()
+        install_cmd = install_instructions("pandoc")
         print(f"Install with: {install_cmd}", file=sys.stderr)
         sys.exit(1)
 
+
+def check_output_format(output_format):
+    """Exit if the installed Pandoc cannot write output_format."""
+    if not pandoc_can_write(output_format):
+        version = probe_tool("pandoc")["version"]
+        print(
+            f"Error: {version} cannot write '{output_format}' documents",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def handle_batch_command(args):
+    """Handle batch document conversion."""
+    if not args.to or not args.out_dir:
+        print("Error: --batch requires --to and --out-dir", file=sys.stderr)
+        sys.exit(1)
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    target_extension = "." + args.to.lower().lstrip(".")
+    output_format = args.to_format or FORMAT_MAP.get(target_extension)
+    if output_format is None:
+        print(
+            f"Error: Unknown document format '{args.to}'. Use --to-format",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    check_output_format(output_format)
+
+    cache = build_cache(args, "document")
+    start = time.perf_counter()
+    results = convert_document_batch(
+        args.batch,
+        args.out_dir,
+        target_extension,
+        from_format=args.from_format,
+        to_format=args.to_format,
+        jobs=args.jobs,
+        force=args.force,
+        extra_args=args.pandoc_arg,
+        cache=cache,
+    )
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        cache.evict()
+
+    if not results:
+        print(f"Error: No documents match '{args.batch}'", file=sys.stderr)
+        sys.exit(1)
+
+    failures = [result for result in results if result[2] == "failed"]
+    converted = sum(1 for result in results if result[2] in ("converted", "cached"))
+    skipped = sum(1 for result in results if result[2] == "skipped")
+
+    if failures:
+        print(
+            f"Error: {len(failures)} of {len(results)} documents failed:",
+            file=sys.stderr,
+        )
+        for input_file, _, _, error, _ in failures:
+            # Keep the aggregate readable: one line per failed document
+            reason = error.splitlines()[-1] if error else "unknown error"
+            print(f"  {input_file}: {reason}", file=sys.stderr)
+
+    rate = converted / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Converted {converted}/{converted + len(failures)} documents in "
+        f"{elapsed:.2f}s ({rate:.1f} documents/s), {skipped} up to date"
+    )
+    if cache is not None:
+        print(cache_summary(results))
+    if failures:
+        sys.exit(1)
+
+
+def handle_command(args):
+    """Handle document conversion command."""
+    require_pandoc()
+
+    if args.batch:
+        handle_batch_command(args)
+        return
+
+    if not args.input_file or not args.output_file:
+        print(
+            "Error: input_file and output_file are required (or use --batch)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    input_file = args.input_file
+    output_file = args.output_file
+
     # Check if input file exists
-    if not os.path.exists(input_file):
+    if input_file != "-" and not os.path.exists(input_file):
         print(f"Error: Input file '{input_file}' not found", file=sys.stderr)
         sys.exit(1)
 
     # Detect formats
-    input_format = detect_format(input_file)
+    input_format = detect_input_format(input_file)
     output_format = detect_format(output_file)
 
     # Use command-line format overrides if provided
@@ -130,13 +437,30 @@ def handle_command(args):
     if args.to_format:
         output_format = args.to_format
 
+    if output_format:
+        check_output_format(output_format)
+
     # Perform conversion
-    success = convert_document(input_file, output_file, input_format, output_format)
+    cache = build_cache(args, "document")
+    if "-" in (input_file, output_file):
+        # Streams are piped through pandoc as they are and never cached
+        cache = None
+    success = convert_document(
+        input_file,
+        output_file,
+        input_format,
+        output_format,
+        extra_args=args.pandoc_arg,
+        cache=cache,
+    )
+    if cache is not None:
+        cache.evict()
 
-    if success:
-        print(f"Successfully converted '{input_file}' to '{output_file}'")
-    else:
+    if not success:
         sys.exit(1)
+    if output_file != "-":
+        source = " (from cache)" if cache is not None and cache.hits else ""
+        print(f"Successfully converted '{input_file}' to '{output_file}'{source}")
 
 
 def setup_parser(subparsers):
@@ -147,9 +471,14 @@ def setup_parser(subparsers):
         help="Convert document formats",
         description="Convert between document formats using Pandoc (Markdown, HTML, PDF, DOCX, etc.).",
     )
-    doc_parser.add_argument("input_file", type=str, help="Input document file")
     doc_parser.add_argument(
-        "output_file", type=str, help="Output document file with desired format"
+        "input_file", type=str, nargs="?", help="Input document file ('-' for stdin)"
+    )
+    doc_parser.add_argument(
+        "output_file",
+        type=str,
+        nargs="?",
+        help="Output document file with desired format ('-' for stdout)",
     )
     doc_parser.add_argument(
         "--from-format",
@@ -163,4 +492,38 @@ def setup_parser(subparsers):
         type=str,
         help="Target format (auto-detected if not specified)",
     )
+    doc_parser.add_argument(
+        "--batch",
+        "-b",
+        type=str,
+        metavar="SOURCE",
+        help="Convert every document under a directory or matching a glob pattern, e.g. 'docs/**/*.md' (requires --to and --out-dir)",
+    )
+    doc_parser.add_argument(
+        "--to", type=str, help="Target extension for --batch, e.g. html"
+    )
+    doc_parser.add_argument(
+        "--out-dir",
+        "-o",
+        type=str,
+        help="Output directory for --batch",
+    )
+    doc_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of concurrent pandoc processes for --batch (default: CPU count)",
+    )
+    doc_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="With --batch, reconvert documents even if their output is up to date",
+    )
+    doc_parser.add_argument(
+        "--pandoc-arg",
+        action="append",
+        metavar="ARG",
+        help="Extra argument passed to pandoc; repeat for several (e.g. --pandoc-arg=--standalone)",
+    )
+    add_cache_arguments(doc_parser, "document")
     doc_parser.set_defaults(func=handle_command)
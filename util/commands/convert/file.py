@@ -1,134 +1,607 @@
+import argparse
+import asyncio
+import functools
 import os
-import platform
-import subprocess
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+from .. import json_backend
+from .batch import batch_jobs
+from .cache import add_cache_arguments, build_cache, cached_conversion
+from .media import run_ffmpeg, run_media_jobs
+from .tools import install_instructions, probe_tool
 
-def convert_image(input_file, output_file):
-    """Convert image using Pillow."""
+IMAGE_FORMATS = [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff", ".ico"]
+VIDEO_FORMATS = [".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv", ".webm", ".m4v"]
+AUDIO_FORMATS = [".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma"]
+
+RESAMPLE_FILTERS = ["lanczos", "bicubic", "bilinear", "box", "hamming", "nearest"]
+THUMBNAIL_SIZE = (256, 256)
+
+
+def parse_dimensions(value):
+    """Parse a WxH (or single N for NxN) size argument."""
+    match = re.match(r"^(\d+)(?:[xX](\d+))?$", value.strip())
+    if not match or int(match.group(1)) == 0 or int(match.group(2) or 1) == 0:
+        raise argparse.ArgumentTypeError(
+            f"invalid size '{value}', expected WxH such as 800x600"
+        )
+    width = int(match.group(1))
+    return width, int(match.group(2) or width)
+
+
+def parse_quality(value):
+    """Parse an encoder quality argument in the range 1-100."""
+    try:
+        quality = int(value)
+    except ValueError:
+        quality = 0
+    if not 1 <= quality <= 100:
+        raise argparse.ArgumentTypeError(f"invalid quality '{value}', expected 1-100")
+    return quality
+
+
+def fit_within(size, box):
+    """Scale size down to fit within box, keeping the aspect ratio."""
+    width, height = size
+    scale = min(box[0] / width, box[1] / height)
+    if scale >= 1:
+        return size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def can_reduce(mode):
+    """Return True if Image.reduce() accepts images of mode."""
+    return mode not in ("1", "P") and not mode.startswith("I;16")
+
+
+def reducible(img):
+    """Return img, converted if needed to a mode Image.reduce() accepts.
+
+    Palette images become RGB (RGBA with transparency); bilevel and 16-bit
+    greyscale images become L.
+    """
+    if can_reduce(img.mode):
+        return img
+    if img.mode == "P":
+        return img.convert("RGBA" if "transparency" in img.info else "RGB")
+    return img.convert("L")
+
+
+def resize_image(img, box, resample="lanczos", thumbnail=False):
+    """Shrink an opened image to fit within box.
+
+    JPEGs are decoded with Image.draft() at the smallest DCT scale that still
+    covers the target size, so a 40-megapixel photo never decodes at full
+    resolution. The remaining reduction uses Image.reduce() for the integer
+    part (via reducing_gap) and the chosen filter for the rest. Thumbnails use
+    a smaller reducing gap, trading a little quality for speed. Modes that
+    Image.reduce() rejects are resized by the filter alone.
+    """
+    from PIL import Image
+
+    target = fit_within(img.size, box)
+    if target == img.size:
+        return img
+
+    if img.format == "JPEG":
+        img.draft(img.mode, target)
+        target = fit_within(img.size, box)
+
+    filters = getattr(Image, "Resampling", Image)
+    reducing_gap = None
+    if can_reduce(img.mode):
+        reducing_gap = 2.0 if thumbnail else 3.0
+    return img.resize(
+        target,
+        resample=getattr(filters, resample.upper()),
+        reducing_gap=reducing_gap,
+    )
+
+
+def flatten_alpha(img, background=255):
+    """Return img in a mode JPEG can store, composited over a white background.
+
+    Alpha images are pasted through their own alpha band instead of split
+    copies, and palette images are flattened by compositing the palette, so
+    at most one new full-size frame is allocated. A palette image has its
+    palette rewritten in place.
+    """
+    from PIL import Image
+
+    if img.mode in ("RGB", "L"):
+        return img
+
+    if img.mode == "P":
+        transparency = img.info.get("transparency")
+        if transparency is not None:
+            palette = img.getpalette("RGB")
+            alphas = [255] * (len(palette) // 3)
+            if isinstance(transparency, bytes):
+                alphas[: len(transparency)] = transparency
+            elif transparency < len(alphas):
+                alphas[transparency] = 0
+            flattened = []
+            for i, value in enumerate(palette):
+                alpha = alphas[i // 3]
+                flattened.append(
+                    (value * alpha + background * (255 - alpha) + 127) // 255
+                )
+            img.putpalette(flattened)
+            del img.info["transparency"]
+        return img.convert("RGB")
+
+    if img.mode in ("PA", "RGBa", "La"):
+        img = img.convert("LA" if img.mode == "La" else "RGBA")
+    if img.mode not in ("RGBA", "LA"):
+        return img.convert("RGB")
+
+    gray = img.mode == "LA"
+    flat = Image.new(
+        "L" if gray else "RGB", img.size, background if gray else (background,) * 3
+    )
+    flat.paste(img.getchannel("L") if gray else img, mask=img)
+    flat.info = {k: v for k, v in img.info.items() if k != "transparency"}
+    return flat
+
+
+def reduce_factor(size, target, thumbnail=False):
+    """Return the integer pre-reduction factor resize(reducing_gap=...) uses."""
+    gap = 2.0 if thumbnail else 3.0
+    return max(1, int(min(size[0] / target[0], size[1] / target[1]) / gap))
+
+
+def read_image_in_strips(img, max_size, resample, thumbnail, prepare=None):
+    """Decode a large image strip by strip, reducing each strip as it goes."""
+    from PIL import Image
+
+    from .strips import read_strips
+
+    target = fit_within(img.size, max_size) if max_size is not None else img.size
+    factor = reduce_factor(img.size, target, thumbnail)
+    img = read_strips(img, prepare, factor)
+    if img.size == target:
+        return img
+    filters = getattr(Image, "Resampling", Image)
+    return img.resize(target, resample=getattr(filters, resample.upper()))
+
+
+def convert_image_file(
+    input_file,
+    output_file,
+    max_size=None,
+    quality=None,
+    thumbnail=False,
+    resample="lanczos",
+    low_memory=False,
+):
+    """Convert image using Pillow. Returns (success, error_message).
+
+    max_size is a (width, height) box the output must fit in; thumbnail
+    implies a 256x256 box when max_size is not given. low_memory decodes
+    uncompressed TIFFs and 8-bit PNGs in strips instead of all at once.
+    """
     try:
         from PIL import Image
+
+        from .strips import supports_strips
     except ImportError:
-        print(
-            "Error: Pillow library not installed. Install with: pip install Pillow",
-            file=sys.stderr,
-        )
-        sys.exit(1)
+        return False, "Pillow library not installed. Install with: pip install Pillow"
+
+    if thumbnail and max_size is None:
+        max_size = THUMBNAIL_SIZE
 
     try:
         with Image.open(input_file) as img:
-            # Convert RGBA to RGB if saving to formats that don't support alpha
-            if output_file.lower().endswith((".jpg", ".jpeg")):
-                if img.mode in ("RGBA", "LA", "P"):
-                    # Create white background
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    if img.mode == "P":
-                        img = img.convert("RGBA")
-                    background.paste(
-                        img, mask=img.split()[-1] if img.mode == "RGBA" else None
-                    )
-                    img = background
-                else:
-                    img = img.convert("RGB")
-
-            img.save(output_file)
-        return True
+            # JPEG cannot store alpha, so transparent images are flattened
+            to_jpeg = output_file.lower().endswith((".jpg", ".jpeg"))
+            if low_memory and supports_strips(img):
+                img = read_image_in_strips(
+                    img,
+                    max_size,
+                    resample,
+                    thumbnail,
+                    prepare=flatten_alpha if to_jpeg else None,
+                )
+            else:
+                if max_size is not None:
+                    img = resize_image(img, max_size, resample, thumbnail)
+                if to_jpeg:
+                    img = flatten_alpha(img)
+
+            save_options = {}
+            if quality is not None:
+                save_options["quality"] = quality
+            img.save(output_file, **save_options)
+        return True, None
     except Exception as e:
-        print(f"Error converting image: {e}", file=sys.stderr)
-        return False
-
-
-def get_ffmpeg_install_instructions():
-    """Get OS-specific FFmpeg installation instructions."""
-    system = platform.system()
-
-    if system == "Darwin":  # macOS
-        return "brew install ffmpeg"
-    elif system == "Linux":
-        # Try to detect the distro
-        try:
-            with open("/etc/os-release") as f:
-                os_info = f.read().lower()
-                if "ubuntu" in os_info or "debian" in os_info:
-                    return "sudo apt install ffmpeg"
-                elif "fedora" in os_info or "rhel" in os_info or "centos" in os_info:
-                    return "sudo dnf install ffmpeg"
-                elif "arch" in os_info:
-                    return "sudo pacman -S ffmpeg"
-        except FileNotFoundError:
-            pass
-        return "sudo apt install ffmpeg  # or dnf/yum/pacman depending on your distro"
-    elif system == "Windows":
-        return "choco install ffmpeg  # or download from ffmpeg.org"
-    else:
-        return "Visit: https://ffmpeg.org/download.html"
+        return False, f"Cannot convert image: {e}"
+
+
+def convert_image(input_file, output_file):
+    """Convert image using Pillow."""
+    success, error = convert_image_file(input_file, output_file)
+    if not success:
+        print(f"Error: {error}", file=sys.stderr)
+    return success
 
 
-def convert_video_audio(input_file, output_file):
-    """Convert video/audio using FFmpeg."""
-    # Check if ffmpeg is installed
+def _import_pillow():
+    """Process pool initializer: import Pillow once per worker."""
     try:
-        subprocess.run(
-            ["ffmpeg", "-version"],
-            capture_output=True,
-            check=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _convert_image_job(job):
+    """Process pool worker: convert one (input, output, cache, options) job."""
+    input_file, output_file, cache, options = job
+    start = time.perf_counter()
+    convert = functools.partial(convert_image_file, **options)
+    success, error, cached = cached_conversion(
+        input_file, output_file, convert, cache, options
+    )
+    elapsed = time.perf_counter() - start
+    return input_file, output_file, success, error, elapsed, cached
+
+
+def convert_image_batch(
+    pattern, out_dir, target_extension, jobs=None, cache=None, options=None
+):
+    """Convert every image matching a glob pattern into out_dir.
+
+    Images are converted in a process pool so Pillow is imported once per
+    worker rather than once per file. options are keyword arguments for
+    convert_image_file. Inputs sharing an output path fail without being
+    converted. Returns a list of
+    (input_file, output_file, success, error_message, seconds, from_cache)
+    tuples.
+    """
+    pairs, conflicts = batch_jobs(pattern, out_dir, target_extension, IMAGE_FORMATS)
+    pending = [
+        (input_file, output_file, cache, options or {})
+        for input_file, output_file in pairs
+    ]
+    results = [
+        (input_file, output_file, False, error, 0.0, False)
+        for input_file, output_file, error in conflicts
+    ]
+
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        results.extend(_convert_image_job(job) for job in pending)
+        return sorted(results)
+
+    chunksize = max(1, len(pending) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_import_pillow
+    ) as executor:
+        results.extend(executor.map(_convert_image_job, pending, chunksize=chunksize))
+    return sorted(results)
+
+
+def convert_media_batch(
+    pattern,
+    out_dir,
+    target_extension,
+    jobs=None,
+    threads=None,
+    cache=None,
+    on_event=None,
+):
+    """Convert every file matching a glob pattern into out_dir with ffmpeg.
+
+    Cached outputs are materialized first and the rest run as concurrent
+    ffmpeg processes, so cache hits do not need ffmpeg installed. on_event
+    receives run_media_jobs() events with the number of ffmpeg jobs added as
+    total. Inputs sharing an output path fail without being converted.
+    Returns a list of
+    (input_file, output_file, success, error_message, seconds, from_cache)
+    tuples.
+    """
+    pairs, conflicts = batch_jobs(
+        pattern, out_dir, target_extension, VIDEO_FORMATS + AUDIO_FORMATS
+    )
+    results = {
+        input_file: (input_file, output_file, False, error, 0.0, False)
+        for input_file, output_file, error in conflicts
+    }
+    pending = []
+    keys = {}
+    for input_file, output_file in pairs:
+        if cache is not None:
+            try:
+                keys[input_file] = cache.key(input_file, target_extension)
+            except OSError as e:
+                error = f"Cannot read '{input_file}': {e}"
+                results[input_file] = (
+                    input_file,
+                    output_file,
+                    False,
+                    error,
+                    0.0,
+                    False,
+                )
+                continue
+            if cache.fetch(keys[input_file], target_extension, output_file):
+                results[input_file] = (input_file, output_file, True, None, 0.0, True)
+                continue
+        pending.append((input_file, output_file))
+
+    def report(event):
+        if on_event is not None:
+            on_event(dict(event, total=len(pending)))
+
+    if pending:
+        require_ffmpeg()
+    for input_file, output_file, success, error, seconds in run_media_jobs(
+        pending, jobs, threads, on_event=report
+    ):
+        if success and cache is not None:
+            cache.store(keys[input_file], target_extension, output_file)
+        results[input_file] = (input_file, output_file, success, error, seconds, False)
+
+    return [results[input_file] for input_file in sorted(results)]
+
+
+def format_clock(seconds):
+    """Format a duration in seconds as H:MM:SS."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def format_progress(metrics):
+    """Format ffmpeg progress metrics as a one-line status."""
+    parts = []
+    if metrics.get("percent") is not None:
+        parts.append(f"{metrics['percent']:5.1f}%")
+    if metrics.get("out_time") is not None:
+        parts.append(f"time {format_clock(metrics['out_time'])}")
+    if metrics.get("speed"):
+        parts.append(f"{metrics['speed']:.2f}x")
+    if metrics.get("fps"):
+        parts.append(f"{metrics['fps']:.1f} fps")
+    if metrics.get("eta") is not None:
+        parts.append(f"ETA {format_clock(metrics['eta'])}")
+    return "  ".join(parts)
+
+
+def print_event(event):
+    """Write an event to stdout as one JSON line."""
+    print(json_backend.dumps(event, compact=True), flush=True)
+
+
+def media_reporter(json_lines=False):
+    """Build an on_event callback for ffmpeg jobs.
+
+    Events are written as JSON lines when json_lines is set; otherwise each
+    finished job prints a [k/n] line. Returns (callback, stats), where stats
+    accumulates the media seconds written by successful jobs.
+    """
+    stats = {"finished": 0, "out_time": 0.0}
+
+    def report(event):
+        if event["event"] == "finish":
+            stats["finished"] += 1
+            if event["success"]:
+                stats["out_time"] += event["out_time"] or 0.0
+        if json_lines:
+            print_event(event)
+            return
+        if event["event"] != "finish":
+            return
+        prefix = f"[{stats['finished']}/{event['total']}] {event['input']}"
+        if event["success"]:
+            print(f"{prefix} -> {event['output']} ({event['seconds']:.1f}s)")
+        else:
+            print(f"{prefix} failed")
+        sys.stdout.flush()
+
+    return report, stats
+
+
+def require_ffmpeg():
+    """Exit with install instructions unless ffmpeg is available."""
+    if probe_tool("ffmpeg") is None:
         print(
             "Error: FFmpeg not installed. Install FFmpeg to convert video/audio files.",
             file=sys.stderr,
         )
-        install_cmd = get_ffmpeg_install_instructions()
+        install_cmd = install_instructions("ffmpeg")
         print(f"Install with: {install_cmd}", file=sys.stderr)
         sys.exit(1)
 
-    try:
-        # Run ffmpeg conversion
-        cmd = [
-            "ffmpeg",
-            "-i",
-            input_file,
-            "-y",  # Overwrite output file
-            output_file,
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-        )
 
-        if result.returncode != 0:
-            print("Error: FFmpeg conversion failed", file=sys.stderr)
-            print(result.stderr, file=sys.stderr)
-            return False
+def convert_video_audio(input_file, output_file, on_progress=None):
+    """Convert video/audio using FFmpeg.
 
-        return True
-    except Exception as e:
-        print(f"Error converting file: {e}", file=sys.stderr)
-        return False
+    on_progress, if given, receives media.progress_metrics() dicts while
+    ffmpeg runs.
+    """
+    require_ffmpeg()
+
+    success, error = asyncio.run(
+        run_ffmpeg(input_file, output_file, on_progress=on_progress)
+    )
+    if not success:
+        print(f"Error: {error}", file=sys.stderr)
+    return success
 
 
 def detect_file_type(filename):
     """Detect file type based on extension."""
     ext = os.path.splitext(filename)[1].lower()
 
-    image_formats = [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff", ".ico"]
-    video_formats = [".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv", ".webm", ".m4v"]
-    audio_formats = [".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma"]
-
-    if ext in image_formats:
+    if ext in IMAGE_FORMATS:
         return "image"
-    elif ext in video_formats:
+    elif ext in VIDEO_FORMATS:
         return "video"
-    elif ext in audio_formats:
+    elif ext in AUDIO_FORMATS:
         return "audio"
     else:
         return "unknown"
 
 
+def image_options(args):
+    """Collect convert_image_file keyword arguments from the command line."""
+    return {
+        "max_size": args.max_size,
+        "quality": args.quality,
+        "thumbnail": args.thumbnail,
+        "resample": args.resample,
+        "low_memory": args.low_memory,
+    }
+
+
+def check_media_options(args):
+    """Exit if image-only options were given for an ffmpeg conversion."""
+    if args.max_size or args.quality is not None or args.thumbnail or args.low_memory:
+        print(
+            "Error: --max-size, --quality, --thumbnail and --low-memory only apply to images",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def handle_batch_command(args):
+    """Handle batch image and media conversion."""
+    if not args.to or not args.out_dir:
+        print("Error: --batch requires --to and --out-dir", file=sys.stderr)
+        sys.exit(1)
+    if args.jobs is not None and args.jobs < 1:
+        print("Error: --jobs must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    if args.threads is not None and args.threads < 1:
+        print("Error: --threads must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    target_extension = "." + args.to.lower().lstrip(".")
+    if target_extension in IMAGE_FORMATS:
+        kind = "images"
+    elif target_extension in VIDEO_FORMATS + AUDIO_FORMATS:
+        kind = "files"
+        check_media_options(args)
+    else:
+        print(
+            f"Error: Unsupported batch target format '{args.to}'",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    cache = build_cache(args, "file")
+    start = time.perf_counter()
+    stats = {"out_time": 0.0}
+    if kind == "images":
+        results = convert_image_batch(
+            args.batch,
+            args.out_dir,
+            target_extension,
+            jobs=args.jobs,
+            cache=cache,
+            options=image_options(args),
+        )
+    else:
+        report, stats = media_reporter(args.progress_json)
+        results = convert_media_batch(
+            args.batch,
+            args.out_dir,
+            target_extension,
+            jobs=args.jobs,
+            threads=args.threads,
+            cache=cache,
+            on_event=report,
+        )
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        cache.evict()
+
+    if not results:
+        print(f"Error: No files match '{args.batch}'", file=sys.stderr)
+        sys.exit(1)
+
+    failed = 0
+    from_cache = 0
+    for input_file, _, success, error, _, cached in results:
+        if not success:
+            failed += 1
+            print(f"Error: {input_file}: {error}", file=sys.stderr)
+        elif cached:
+            from_cache += 1
+
+    converted = len(results) - failed
+    rate = converted / elapsed if elapsed > 0 else 0.0
+    # Media seconds written per wall-clock second across all ffmpeg jobs
+    realtime = stats["out_time"] / elapsed if kind == "files" and elapsed else 0.0
+    if args.progress_json:
+        print_event(
+            {
+                "event": "summary",
+                "converted": converted,
+                "total": len(results),
+                "failed": failed,
+                "from_cache": from_cache,
+                "seconds": elapsed,
+                "speed": realtime or None,
+            }
+        )
+    else:
+        summary = (
+            f"Converted {converted}/{len(results)} {kind} in {elapsed:.2f}s "
+            f"({rate:.1f} {kind}/s)"
+        )
+        if realtime:
+            summary += f", {realtime:.1f}x realtime"
+        if cache is not None:
+            summary += f", {from_cache} from cache"
+        print(summary)
+    if failed:
+        sys.exit(1)
+
+
+def single_file_progress(args, input_file, output_file):
+    """Return an on_progress callback for one ffmpeg conversion, or None.
+
+    Progress is written as JSON lines with --progress-json, and as a status
+    line redrawn on stderr when stderr is a terminal.
+    """
+    if args.progress_json:
+
+        def on_progress(metrics):
+            print_event(
+                dict(event="progress", input=input_file, output=output_file, **metrics)
+            )
+
+        return on_progress
+
+    if sys.stderr.isatty():
+
+        def on_progress(metrics):
+            end = "\n" if metrics["done"] else ""
+            print(f"\r\033[K{format_progress(metrics)}", end=end, file=sys.stderr)
+            sys.stderr.flush()
+
+        return on_progress
+
+    return None
+
+
 def handle_command(args):
     """Handle file conversion command."""
+    if args.batch:
+        handle_batch_command(args)
+        return
+
+    if not args.input_file or not args.output_file:
+        print(
+            "Error: input_file and output_file are required (or use --batch)",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     input_file = args.input_file
     output_file = args.output_file
 
@@ -149,12 +622,19 @@ def handle_command(args):
         print("Error: Unsupported output file format", file=sys.stderr)
         sys.exit(1)
 
-    # Perform conversion based on type
-    success = False
+    # Pick the converter based on type
+    options = None
     if input_type == "image" and output_type == "image":
-        success = convert_image(input_file, output_file)
+        options = image_options(args)
+        convert = functools.partial(convert_image_file, **options)
     elif input_type in ["video", "audio"] or output_type in ["video", "audio"]:
-        success = convert_video_audio(input_file, output_file)
+        check_media_options(args)
+        on_progress = single_file_progress(args, input_file, output_file)
+
+        def convert(input_file, output_file):
+            # convert_video_audio reports its own errors
+            return convert_video_audio(input_file, output_file, on_progress), None
+
     else:
         print(
             f"Error: Cannot convert from {input_type} to {output_type}",
@@ -162,9 +642,29 @@ def handle_command(args):
         )
         sys.exit(1)
 
-    if success:
-        print(f"Successfully converted '{input_file}' to '{output_file}'")
-    else:
+    cache = build_cache(args, "file")
+    success, error, cached = cached_conversion(
+        input_file, output_file, convert, cache, options
+    )
+    if cache is not None:
+        cache.evict()
+
+    if args.progress_json and options is None:
+        print_event(
+            {
+                "event": "finish",
+                "input": input_file,
+                "output": output_file,
+                "success": success,
+                "cached": cached,
+            }
+        )
+    elif success:
+        source = " (from cache)" if cached else ""
+        print(f"Successfully converted '{input_file}' to '{output_file}'{source}")
+    if not success:
+        if error:
+            print(f"Error: {error}", file=sys.stderr)
         sys.exit(1)
 
 
@@ -175,8 +675,73 @@ def setup_parser(subparsers):
         help="Convert file formats",
         description="Convert between image, video, and audio file formats.",
     )
-    file_parser.add_argument("input_file", type=str, help="Input file path")
+    file_parser.add_argument("input_file", type=str, nargs="?", help="Input file path")
+    file_parser.add_argument(
+        "output_file",
+        type=str,
+        nargs="?",
+        help="Output file path with desired format",
+    )
+    file_parser.add_argument(
+        "--batch",
+        "-b",
+        type=str,
+        metavar="PATTERN",
+        help="Convert every image matching a glob pattern, e.g. 'src/*.png' (requires --to and --out-dir)",
+    )
+    file_parser.add_argument(
+        "--to", type=str, help="Target extension for --batch, e.g. jpg"
+    )
+    file_parser.add_argument(
+        "--out-dir",
+        "-o",
+        type=str,
+        help="Output directory for --batch",
+    )
+    file_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of worker processes for --batch (default: CPU count; for video/audio, CPU count / --threads)",
+    )
+    file_parser.add_argument(
+        "--threads",
+        type=int,
+        help="Threads per ffmpeg process for video/audio --batch (default: CPU count / --jobs, or 2)",
+    )
+    file_parser.add_argument(
+        "--max-size",
+        type=parse_dimensions,
+        metavar="WxH",
+        help="Shrink images to fit within WxH, keeping the aspect ratio (JPEGs decode at reduced scale)",
+    )
+    file_parser.add_argument(
+        "--thumbnail",
+        action="store_true",
+        help="Make a thumbnail: faster reduction, 256x256 unless --max-size is given",
+    )
+    file_parser.add_argument(
+        "--quality",
+        type=parse_quality,
+        metavar="1-100",
+        help="Encoder quality for lossy image formats (JPEG, WebP)",
+    )
+    file_parser.add_argument(
+        "--resample",
+        type=str,
+        choices=RESAMPLE_FILTERS,
+        default="lanczos",
+        help="Resampling filter used when resizing (default: lanczos)",
+    )
+    file_parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Decode uncompressed TIFFs and 8-bit PNGs in strips so very large images never load whole",
+    )
     file_parser.add_argument(
-        "output_file", type=str, help="Output file path with desired format"
+        "--progress-json",
+        action="store_true",
+        help="Write video/audio progress, per-job results and the batch summary to stdout as JSON lines",
     )
+    add_cache_arguments(file_parser, "file")
     file_parser.set_defaults(func=handle_command)
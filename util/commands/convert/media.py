@@ -0,0 +1,205 @@
+"""
+Concurrent FFmpeg conversions.
+
+Jobs run as asyncio subprocesses behind a semaphore, sized so that the number
+of concurrent jobs times the threads each job may use stays near the core
+count instead of every ffmpeg process spreading across all cores. Progress is
+read from `-progress pipe:1` as it is written, and only the last lines of
+stderr are kept for error reports.
+"""
+
+import asyncio
+import collections
+import os
+import re
+import time
+
+DEFAULT_THREADS = 2
+STDERR_TAIL_LINES = 20
+STREAM_LIMIT = 1024 * 1024
+
+_DURATION = re.compile(r"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+
+def plan_slots(jobs=None, threads=None, cpu_count=None):
+    """Return (concurrent jobs, threads per job) for the available cores."""
+    cpus = cpu_count or os.cpu_count() or 1
+    if jobs is None and threads is None:
+        threads = min(DEFAULT_THREADS, cpus)
+    if jobs is None:
+        jobs = max(1, cpus // threads)
+    if threads is None:
+        threads = max(1, cpus // jobs)
+    return jobs, threads
+
+
+def ffmpeg_command(input_file, output_file, threads=None):
+    """Build the ffmpeg command line for one conversion.
+
+    Progress goes to stdout as key=value blocks; -nostats drops the
+    carriage-return status line ffmpeg would otherwise keep writing to stderr.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-nostdin", "-nostats", "-y"]
+    cmd += ["-progress", "pipe:1", "-i", input_file]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd.append(output_file)
+    return cmd
+
+
+def parse_duration(line):
+    """Return the input duration in seconds from an ffmpeg log line, or None."""
+    match = _DURATION.search(line)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _number(value):
+    """Parse a -progress value such as "29.97" or "1.5x"; None for N/A."""
+    try:
+        return float(value.rstrip("x"))
+    except (AttributeError, ValueError):
+        return None
+
+
+def progress_metrics(block, duration=None):
+    """Turn one ffmpeg -progress block into speed, fps and ETA metrics.
+
+    duration is the input length in seconds; percent and eta are only
+    reported when it is known.
+    """
+    # out_time_ms is microseconds too, kept for older ffmpeg releases
+    out_time_us = block.get("out_time_us", block.get("out_time_ms"))
+    out_time = _number(out_time_us)
+    metrics = {
+        "frame": int(_number(block.get("frame")) or 0),
+        "fps": _number(block.get("fps")),
+        "speed": _number(block.get("speed")),
+        "out_time": out_time / 1_000_000 if out_time is not None else None,
+        "done": block.get("progress") == "end",
+    }
+    if duration and metrics["out_time"] is not None:
+        remaining = max(0.0, duration - metrics["out_time"])
+        metrics["percent"] = min(100.0, metrics["out_time"] / duration * 100)
+        metrics["eta"] = remaining / metrics["speed"] if metrics["speed"] else None
+    return metrics
+
+
+async def _read_progress(stream, on_block):
+    """Call on_block with every key=value block ffmpeg writes to stream."""
+    block = {}
+    async for raw in stream:
+        key, sep, value = raw.decode("utf-8", errors="replace").strip().partition("=")
+        if not sep:
+            continue
+        block[key] = value
+        if key == "progress":
+            on_block(block)
+            block = {}
+
+
+async def _read_stderr(stream, tail, info):
+    """Keep the last lines of stderr and note the input duration."""
+    async for raw in stream:
+        line = raw.decode("utf-8", errors="replace").rstrip()
+        if info.get("duration") is None:
+            info["duration"] = parse_duration(line)
+        tail.append(line)
+
+
+async def run_ffmpeg(input_file, output_file, threads=None, on_progress=None):
+    """Run one ffmpeg conversion. Returns (success, error_message).
+
+    on_progress, if given, is called with progress_metrics() for every
+    progress block. The error message carries at most STDERR_TAIL_LINES
+    lines of ffmpeg's stderr.
+    """
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *ffmpeg_command(input_file, output_file, threads),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+        )
+    except OSError as e:
+        return False, f"Cannot run ffmpeg: {e}"
+
+    tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+    info = {}
+
+    def on_block(block):
+        if on_progress is not None:
+            on_progress(progress_metrics(block, info.get("duration")))
+
+    await asyncio.gather(
+        _read_progress(process.stdout, on_block),
+        _read_stderr(process.stderr, tail, info),
+    )
+    await process.wait()
+    if process.returncode != 0:
+        details = "\n".join(line for line in tail if line).strip()
+        return False, f"FFmpeg conversion failed\n{details}".rstrip()
+    return True, None
+
+
+async def _run_jobs(jobs, concurrency, threads, on_event):
+    """Run every job, at most concurrency at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index, input_file, output_file):
+        async with semaphore:
+            event = {
+                "event": "start",
+                "job": index,
+                "input": input_file,
+                "output": output_file,
+            }
+            if on_event is not None:
+                on_event(event)
+
+            last = {}
+
+            def on_progress(metrics):
+                last.update(metrics)
+                if on_event is not None:
+                    on_event(dict(event, event="progress", **metrics))
+
+            start = time.perf_counter()
+            success, error = await run_ffmpeg(
+                input_file, output_file, threads, on_progress
+            )
+            seconds = time.perf_counter() - start
+
+            if on_event is not None:
+                media_seconds = last.get("out_time")
+                on_event(
+                    dict(
+                        event,
+                        event="finish",
+                        success=success,
+                        error=error,
+                        seconds=seconds,
+                        out_time=media_seconds,
+                        speed=media_seconds / seconds if media_seconds else None,
+                    )
+                )
+            return input_file, output_file, success, error, seconds
+
+    return await asyncio.gather(*(run(index, *job) for index, job in enumerate(jobs)))
+
+
+def run_media_jobs(jobs, concurrency=None, threads=None, on_event=None):
+    """Convert (input_file, output_file) pairs with concurrent ffmpeg processes.
+
+    on_event, if given, is called with a dict for every job that starts
+    ("start"), reports progress ("progress", see progress_metrics) and
+    finishes ("finish", with success, error, seconds, the media seconds
+    written as out_time and the overall speed relative to realtime).
+    Returns a list of (input_file, output_file, success, error_message,
+    seconds) tuples in job order.
+    """
+    concurrency, threads = plan_slots(concurrency, threads)
+    return asyncio.run(_run_jobs(jobs, concurrency, threads, on_event))
@@ -0,0 +1,228 @@
+"""
+Integer <-> string conversion in any base from 2 to 62, plus base58.
+
+int() and str() are quadratic for bases that are not powers of two, and
+CPython refuses decimal strings longer than sys.get_int_max_str_digits().
+Large values are converted here by divide and conquer instead: strings are
+parsed by combining chunks pairwise as high * base^len(low) + low, and
+integers are formatted by splitting them around precomputed powers
+base^(w * 2^k), so the cost follows that of big-integer multiplication.
+Divisions use Burnikel-Ziegler recursive division, and decimal output goes
+through the decimal module, whose multiplication is faster still.
+"""
+
+import decimal
+import functools
+
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+DIGITS_62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+PARSE_CHUNK = 1000  # digits handed to int() at once
+DIVMOD_CUTOFF = 2000  # bits below which the builtin divmod is used
+DECIMAL_CUTOFF = 4096  # bits converted with a single Decimal() call
+
+
+def radix_digits(base):
+    """Return the digit alphabet of a base from 2 to 62.
+
+    Bases up to 36 use lowercase letters, like hex(), and read either
+    case; larger bases use 0-9, A-Z, then a-z.
+    """
+    if not 2 <= base <= 62:
+        raise ValueError(f"base must be between 2 and 62, not {base}")
+    return DIGITS[:base] if base <= 36 else DIGITS_62[:base]
+
+
+@functools.lru_cache(maxsize=None)
+def _alphabet(digits):
+    """Return (native, power-of-two bits, valid characters, translation).
+
+    native alphabets are those int() understands; translation maps other
+    alphabets onto digit values.
+    """
+    base = len(digits)
+    native = base <= 36 and digits == DIGITS[:base]
+    bits = base.bit_length() - 1 if base & (base - 1) == 0 else 0
+    valid = digits + digits.upper() if native else digits
+    translation = {ord(char): value for value, char in enumerate(digits)}
+    return native, bits, dict.fromkeys(map(ord, valid)), translation
+
+
+def _combine(values, power):
+    """Join digit groups, most significant first, each worth power."""
+    while len(values) > 1:
+        if len(values) & 1:
+            values.insert(0, 0)
+        values = [high * power + low for high, low in zip(values[::2], values[1::2])]
+        if len(values) > 1:
+            power *= power
+    return values[0] if values else 0
+
+
+def parse_int(text, digits):
+    """Parse a signed integer written with the given digit alphabet.
+
+    Underscores are ignored. Raises ValueError on any other character that
+    is not a digit of the alphabet.
+    """
+    base = len(digits)
+    text = text.strip().replace("_", "")
+    sign = 1
+    if text[:1] in ("-", "+"):
+        sign = -1 if text[0] == "-" else 1
+        text = text[1:]
+    if not text:
+        raise ValueError("no digits")
+
+    native, bits, valid, translation = _alphabet(digits)
+    invalid = text.translate(valid)
+    if invalid:
+        raise ValueError(f"invalid digit '{invalid[0]}' for base {base}")
+
+    if native and (bits or len(text) <= PARSE_CHUNK):
+        # int() is linear for power-of-two bases
+        return sign * int(text, base)
+    if native:
+        head = len(text) % PARSE_CHUNK or PARSE_CHUNK
+        chunks = [int(text[:head], base)]
+        chunks += [
+            int(text[i : i + PARSE_CHUNK], base)
+            for i in range(head, len(text), PARSE_CHUNK)
+        ]
+        return sign * _combine(chunks, base**PARSE_CHUNK)
+    values = list(text.translate(translation).encode("latin-1"))
+    return sign * _combine(values, base)
+
+
+def _div2n1n(a, b, n):
+    """Burnikel-Ziegler division of a < b * 2**n by b, an n-bit number."""
+    if a.bit_length() - n <= DIVMOD_CUTOFF:
+        return divmod(a, b)
+    pad = n & 1
+    if pad:
+        a <<= 1
+        b <<= 1
+        n += 1
+    half = n >> 1
+    mask = (1 << half) - 1
+    b1, b2 = b >> half, b & mask
+    q1, r = _div3n2n(a >> n, (a >> half) & mask, b, b1, b2, half)
+    q2, r = _div3n2n(r, a & mask, b, b1, b2, half)
+    if pad:
+        r >>= 1
+    return q1 << half | q2, r
+
+
+def _div3n2n(a12, a3, b, b1, b2, n):
+    """Divide a12 * 2**n + a3 by b = b1 * 2**n + b2, with a quotient < 2**n."""
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _div2n1n(a12, b1, n)
+    r = (r << n | a3) - q * b2
+    while r < 0:
+        q -= 1
+        r += b
+    return q, r
+
+
+def _decimal_string(n):
+    """Format a non-negative integer in decimal through the decimal module."""
+    context = decimal.Context(
+        prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN
+    )
+    powers = {}
+
+    def power_of_two(bits):
+        result = powers.get(bits)
+        if result is None:
+            result = powers[bits] = context.power(2, bits)
+        return result
+
+    def inner(n, bits):
+        if bits <= DECIMAL_CUTOFF:
+            return decimal.Decimal(n)
+        half = bits >> 1
+        high = n >> half
+        low = n - (high << half)
+        return context.add(
+            context.multiply(inner(high, bits - half), power_of_two(half)),
+            inner(low, half),
+        )
+
+    return format(inner(n, n.bit_length()), "f")
+
+
+def _leaf_width(base):
+    """Return the even number of digits formatted from one machine-sized int."""
+    width = 2
+    while base ** (width + 2) < 1 << 64:
+        width += 2
+    return width
+
+
+@functools.lru_cache(maxsize=None)
+def _digit_pairs(digits):
+    """Return every two-digit string of an alphabet, indexed by value."""
+    return [high + low for high in digits for low in digits]
+
+
+def _format_positive(n, digits):
+    """Format n > 0 by splitting it around powers of the base."""
+    base = len(digits)
+    bits = _alphabet(digits)[1]
+    zero = digits[0]
+    pairs = _digit_pairs(digits)
+    square = base * base
+    width = _leaf_width(base)
+
+    powers = [base**width]
+    while powers[-1] * powers[-1] <= n:
+        powers.append(powers[-1] * powers[-1])
+    if powers[0] > n:
+        powers = []
+
+    out = []
+
+    def leaf(n):
+        chunk = []
+        while n:
+            n, pair = divmod(n, square)
+            chunk.append(pairs[pair])
+        out.append("".join(reversed(chunk)).rjust(width, zero))
+
+    def split(n, level):
+        power = powers[level]
+        if bits:
+            shift = (width << level) * bits
+            return n >> shift, n & ((1 << shift) - 1)
+        return _div2n1n(n, power, power.bit_length())
+
+    def emit(n, level):
+        if level < 0:
+            leaf(n)
+            return
+        high, low = split(n, level)
+        emit(high, level - 1)
+        emit(low, level - 1)
+
+    emit(n, len(powers) - 1)
+    return "".join(out).lstrip(zero)
+
+
+def format_int(n, digits):
+    """Format an integer with the given digit alphabet."""
+    if n < 0:
+        return "-" + format_int(-n, digits)
+    if n == 0:
+        return digits[0]
+    native = _alphabet(digits)[0]
+    base = len(digits)
+    if native and base in (2, 8, 16):
+        return format(n, {2: "b", 8: "o", 16: "x"}[base])
+    if native and base == 10:
+        if n.bit_length() <= DECIMAL_CUTOFF:
+            return str(n)
+        return _decimal_string(n)
+    return _format_positive(n, digits)
@@ -0,0 +1,173 @@
+"""
+Strip-wise decoding for very large images.
+
+Pillow decodes a whole image before it can be converted. Uncompressed TIFFs
+and non-interlaced 8-bit PNGs can instead be read one band of rows at a time,
+so a conversion only has to hold its output and a single strip in memory.
+"""
+
+import struct
+import zlib
+
+from PIL import Image
+
+STRIP_BYTES = 2 * 1024 * 1024
+PNG_STRIP_MODES = ("L", "LA", "RGB", "RGBA", "P")
+
+
+def _row_bytes(mode, rawmode, width):
+    """Return the size in bytes of one packed row of raw pixel data."""
+    return len(Image.new(mode, (width, 1)).tobytes("raw", rawmode))
+
+
+def supports_strips(img):
+    """Return True if an opened (not yet loaded) image can be read in strips."""
+    width = img.size[0]
+    if img.format == "PNG":
+        return (
+            len(img.tile) == 1
+            and img.tile[0][0] == "zip"
+            and img.tile[0][3] == img.mode
+            and img.mode in PNG_STRIP_MODES
+            and not img.info.get("interlace")
+        )
+    if img.format == "TIFF" and img.tile:
+        next_row = 0
+        for codec, extents, _, args in sorted(img.tile, key=lambda t: t[1][1]):
+            if codec != "raw" or not isinstance(args, tuple) or len(args) < 3:
+                return False
+            # Only full-width strips stored top-down in row order
+            if extents[0] != 0 or extents[2] != width or extents[1] != next_row:
+                return False
+            if args[1] != 0 or args[2] != 1 or args[0] != img.tile[0][3][0]:
+                return False
+            next_row = extents[3]
+        try:
+            _row_bytes(img.mode, img.tile[0][3][0], width)
+        except (ValueError, OSError):
+            return False
+        return next_row == img.size[1]
+    return False
+
+
+def _tiff_strips(img, rows):
+    """Yield (y, strip) bands from an uncompressed TIFF."""
+    width, height = img.size
+    rawmode = img.tile[0][3][0]
+    stride = _row_bytes(img.mode, rawmode, width)
+    tiles = sorted(img.tile, key=lambda t: t[1][1])
+
+    for y in range(0, height, rows):
+        band_end = min(y + rows, height)
+        data = bytearray()
+        for _, (_, top, _, bottom), offset, _ in tiles:
+            start, end = max(y, top), min(band_end, bottom)
+            if start < end:
+                img.fp.seek(offset + (start - top) * stride)
+                data += img.fp.read((end - start) * stride)
+        if len(data) != (band_end - y) * stride:
+            raise OSError("image file is truncated")
+        yield y, Image.frombytes(
+            img.mode, (width, band_end - y), bytes(data), "raw", rawmode
+        )
+
+
+def _png_idat(fp):
+    """Yield the payloads of a PNG file's IDAT chunks."""
+    fp.seek(8)
+    while True:
+        header = fp.read(8)
+        if len(header) < 8:
+            raise OSError("image file is truncated")
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"IDAT":
+            yield fp.read(length)
+            fp.seek(4, 1)
+        elif chunk_type == b"IEND":
+            return
+        else:
+            fp.seek(length + 4, 1)
+
+
+def _png_strips(img, rows):
+    """Yield (y, strip) bands from a non-interlaced PNG.
+
+    The IDAT stream is inflated incrementally. PNG row filters refer to the
+    previous row, so each band is re-wrapped as a stored zlib stream headed by
+    the previous band's last row (unfiltered) and unfiltered by Pillow's own
+    decoder.
+    """
+    width, height = img.size
+    stride = _row_bytes(img.mode, img.mode, width)
+    idat = _png_idat(img.fp)
+    inflater = zlib.decompressobj()
+    pending = b""
+    filtered = bytearray()
+    previous = None
+
+    for y in range(0, height, rows):
+        count = min(rows, height - y)
+        needed = count * (stride + 1)
+        while len(filtered) < needed:
+            if not pending:
+                pending = next(idat, None)
+                if pending is None:
+                    raise OSError("image file is truncated")
+            # Cap output so highly compressible data cannot balloon a strip
+            filtered += inflater.decompress(pending, needed - len(filtered))
+            pending = inflater.unconsumed_tail
+
+        band = bytes(filtered[:needed])
+        del filtered[:needed]
+        if previous is not None:
+            band = b"\x00" + previous + band
+        strip = Image.frombytes(
+            img.mode,
+            (width, count + (previous is not None)),
+            zlib.compress(band, 0),
+            "zip",
+            img.mode,
+        )
+        if previous is not None:
+            strip = strip.crop((0, 1, width, count + 1))
+        previous = strip.crop((0, count - 1, width, count)).tobytes()
+
+        if img.mode == "P":
+            strip.putpalette(img.palette)
+        yield y, strip
+
+
+def iter_strips(img, rows):
+    """Yield (y, strip) bands of at most rows rows from a supported image."""
+    if img.format == "PNG":
+        return _png_strips(img, rows)
+    return _tiff_strips(img, rows)
+
+
+def read_strips(img, prepare=None, factor=1):
+    """Decode img strip by strip into a new image.
+
+    prepare, if given, is applied to every strip (e.g. to flatten alpha)
+    before the strip is shrunk by an integer factor with Image.reduce(), so
+    the only full-size allocation is the output itself.
+    """
+    width, height = img.size
+    rows = max(1, STRIP_BYTES // (width * 4))
+    rows = max(factor, rows - rows % factor)
+
+    output = None
+    for y, strip in iter_strips(img, rows):
+        strip.info = dict(img.info)
+        if prepare is not None:
+            strip = prepare(strip)
+        if factor > 1:
+            if strip.mode == "P":
+                strip = strip.convert("RGBA" if "transparency" in strip.info else "RGB")
+            strip = strip.reduce(factor)
+        if output is None:
+            output = Image.new(strip.mode, (-(-width // factor), -(-height // factor)))
+            if strip.mode == "P":
+                output.putpalette(strip.palette)
+            output.info = dict(strip.info)
+        output.paste(strip, (0, y // factor))
+    return output
@@ -3,14 +3,16 @@ import json
 import os
 import sys
 
+from .. import json_backend
 
-def csv_to_json(csv_file):
+
+def csv_to_json(csv_file, compact=False):
     """Convert CSV to JSON."""
     try:
         with open(csv_file, "r", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             data = list(reader)
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return json_backend.dumps(data, compact=compact)
     except Exception as e:
         print(f"Error converting CSV to JSON: {e}", file=sys.stderr)
         sys.exit(1)
@@ -19,8 +21,8 @@ def csv_to_json(csv_file):
 def json_to_csv(json_file):
     """Convert JSON to CSV."""
     try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(json_file, "rb") as f:
+            data = json_backend.loads(f.read())
 
         # Handle both array of objects and single object
         if isinstance(data, dict):
@@ -102,8 +104,8 @@ def csv_to_markdown(csv_file):
 def json_to_markdown(json_file):
     """Convert JSON to Markdown table."""
     try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(json_file, "rb") as f:
+            data = json_backend.loads(f.read())
 
         # Handle both array of objects and single object
         if isinstance(data, dict):
@@ -163,7 +165,7 @@ def handle_command(args):
     # Perform conversion
     if ext == ".csv":
         if target_format in ["json"]:
-            result = csv_to_json(input_file)
+            result = csv_to_json(input_file, compact=args.compact)
         elif target_format in ["markdown", "md", "table"]:
             result = csv_to_markdown(input_file)
         else:
@@ -206,4 +208,9 @@ def setup_parser(subparsers):
         choices=["csv", "json", "markdown", "md", "table"],
         help="Target format",
     )
+    tabular_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Emit JSON output without indentation or whitespace",
+    )
     tabular_parser.set_defaults(func=handle_command)
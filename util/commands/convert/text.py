@@ -3,6 +3,8 @@ import os
 import sys
 import urllib.parse
 
+from .. import json_backend
+
 
 def url_encode(text):
     """URL encode text."""
@@ -62,9 +64,7 @@ def escape_string(text, language):
         # SQL string escape (double single quotes)
         return text.replace("'", "''")
     elif language in ["json"]:
-        import json
-
-        return json.dumps(text)[1:-1]  # Remove outer quotes
+        return json_backend.dumps(text, ensure_ascii=True)[1:-1]  # Remove outer quotes
     else:
         print(f"Error: Unsupported language '{language}'", file=sys.stderr)
         sys.exit(1)
@@ -1,48 +1,466 @@
+import functools
+import itertools
+import os
+import re
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from .timeformat import compile_format
+
+UNIX_FORMATS = ["unix", "timestamp", "epoch"]
+ISO_FORMATS = ["iso", "iso8601", "datetime"]
+
+# Timestamps found in log lines by --stream, as (seconds, fraction) for
+# epochs and (seconds, fraction, offset) for ISO 8601, so output can be
+# cached per second
+EPOCH_PATTERN = r"(?<![\d.])(\d{10})(\.\d+)?(?![\d.])"
+ISO_PATTERN = r"(\d\d\d\d-\d\d-\d\d[T ]\d\d:\d\d:\d\d)(\.\d+)?(Z|[+-]\d\d:?\d\d)?(?!\d)"
+STREAM_CACHE_SIZE = 65536  # formatted seconds kept while rewriting
+READ_LINES_HINT = 1024 * 1024  # bytes of lines rewritten at once
+BATCH_LINES = 65536  # values converted per batch with -
+UNIX_EPOCH = datetime(1970, 1, 1)
 
-def convert(from_format, value, to_format):
-    """Convert time between formats."""
-    from_format = from_format.lower()
-    to_format = to_format.lower()
 
+def numpy_module():
+    """Return NumPy for batch conversions, or None to use pure Python.
+
+    NumPy is imported on first use so single conversions don't pay for it.
+    Set UTIL_TIME_BACKEND=python to force the pure-Python path.
+    """
+    if os.environ.get("UTIL_TIME_BACKEND", "").lower() == "python":
+        return None
     try:
-        # Parse input
-        if from_format in ["unix", "timestamp", "epoch"]:
-            dt = datetime.fromtimestamp(int(value))
-        elif from_format in ["iso", "iso8601", "datetime"]:
-            # Try to parse ISO format
-            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
-        elif from_format == "now":
-            dt = datetime.now()
-        else:
-            print(f"Error: Unsupported source format '{from_format}'", file=sys.stderr)
-            sys.exit(1)
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@functools.lru_cache(maxsize=None)
+def get_zone(name):
+    """Return the tz database zone for a name, loaded once per process.
+
+    Raises ValueError for an unknown zone.
+    """
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone '{name}'") from None
+
+
+def offset_at(zone, epoch):
+    """Return the UTC offset in seconds of a zone (None for local) at an epoch."""
+    if zone is None:
+        return time.localtime(epoch).tm_gmtoff
+    return int(datetime.fromtimestamp(epoch, zone).utcoffset().total_seconds())
+
+
+@functools.lru_cache(maxsize=65536)
+def _hour_offset(zone, hour):
+    """Return the UTC offset of a zone through an hour since the epoch.
+
+    Returns None when a transition falls inside the hour.
+    """
+    start = offset_at(zone, hour * 3600)
+    return start if offset_at(zone, hour * 3600 + 3599) == start else None
+
+
+def utc_offset(zone, epoch):
+    """Return the UTC offset in seconds of a zone (None for local) at an epoch.
+
+    Offsets only change at DST and other transitions, so they are looked up
+    once per zone and hour, and per epoch only in hours with a transition.
+    """
+    offset = _hour_offset(zone, epoch // 3600)
+    return offset_at(zone, epoch) if offset is None else offset
+
+
+@functools.lru_cache(maxsize=None)
+def fixed_zone(offset):
+    """Return a fixed-offset tzinfo for an offset in seconds."""
+    return timezone(timedelta(seconds=offset))
+
+
+@functools.lru_cache(maxsize=None)
+def offset_suffix(offset):
+    """Return the ISO 8601 suffix of an offset in seconds, as isoformat writes it."""
+    return datetime(2000, 1, 1, tzinfo=fixed_zone(offset)).isoformat()[19:]
+
+
+def source_format(name):
+    """Normalize a source format name; strptime formats are kept as they are."""
+    return name if "%" in name else name.lower()
 
-        # Convert to target format
-        if to_format in ["unix", "timestamp", "epoch"]:
-            return str(int(dt.timestamp()))
-        elif to_format in ["iso", "iso8601"]:
-            return dt.isoformat()
-        elif to_format in ["date"]:
-            return dt.strftime("%Y-%m-%d")
-        elif to_format in ["time"]:
-            return dt.strftime("%H:%M:%S")
-        elif to_format in ["datetime"]:
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        else:
-            print(f"Error: Unsupported target format '{to_format}'", file=sys.stderr)
-            sys.exit(1)
 
+def parse_time(from_format, value, tz=None):
+    """Parse a time value in a source format into a datetime.
+
+    from_format is a format name or a strptime format such as
+    "%d/%b/%Y:%H:%M:%S %z". Epochs are placed in tz and naive values are
+    read as tz; with no tz both are naive local times. Raises ValueError
+    for an unsupported format or an invalid value.
+    """
+    if "%" in from_format:
+        dt = compile_format(from_format)[0](value.strip())
+        if tz is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=tz)
+        return dt
+    if from_format == "auto":
+        from_format = "unix" if value.strip().isdigit() else "iso"
+    if from_format in UNIX_FORMATS:
+        return datetime.fromtimestamp(int(value), tz)
+    elif from_format in ISO_FORMATS:
+        # Try to parse ISO format
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if tz is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=tz)
+        return dt
+    elif from_format == "now":
+        return datetime.now(tz)
+    raise ValueError(f"Unsupported source format '{from_format}'")
+
+
+def time_formatter(to_format, zone=None):
+    """Return a function formatting a datetime in a target format, or None.
+
+    With a zone, datetimes are converted to it before formatting.
+    """
+    if to_format in UNIX_FORMATS:
+        return lambda dt: str(int(dt.timestamp()))
+    elif to_format in ["iso", "iso8601"]:
+        pattern = None
+    elif to_format in ["date"]:
+        pattern = "%Y-%m-%d"
+    elif to_format in ["time"]:
+        pattern = "%H:%M:%S"
+    elif to_format in ["datetime"]:
+        pattern = "%Y-%m-%d %H:%M:%S"
+    else:
+        return None
+
+    if zone is None:
+        if pattern is None:
+            return datetime.isoformat
+        return lambda dt: dt.strftime(pattern)
+    if pattern is None:
+        return lambda dt: dt.astimezone(zone).isoformat()
+    return lambda dt: dt.astimezone(zone).strftime(pattern)
+
+
+def resolve_zones(tz=None, to_tz=None):
+    """Return the (source, target) zones for --tz and --to-tz.
+
+    Output defaults to the source zone; without either option times stay
+    naive local times. Exits on an unknown zone.
+    """
+    try:
+        source = get_zone(tz) if tz else None
+        target = get_zone(to_tz) if to_tz else source
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    return source, target
+
+
+def convert(from_format, value, to_format, tz=None, to_tz=None):
+    """Convert time between formats."""
+    from_format = source_format(from_format)
+    to_format = to_format.lower()
+    source, target = resolve_zones(tz, to_tz)
+
+    formatter = time_formatter(to_format, target)
+    if formatter is None:
+        print(f"Error: Unsupported target format '{to_format}'", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        return formatter(parse_time(from_format, value, source))
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def stream_pattern(from_format):
+    """Compile the regex finding timestamps of a source format in text.
+
+    Returns None for formats that cannot be searched for.
+    """
+    if "%" in from_format:
+        return compile_format(from_format)[1]
+    if from_format in UNIX_FORMATS:
+        return re.compile(EPOCH_PATTERN)
+    elif from_format in ISO_FORMATS:
+        return re.compile(ISO_PATTERN)
+    elif from_format == "auto":
+        return re.compile(f"{EPOCH_PATTERN}|{ISO_PATTERN}")
+    return None
+
+
+def timestamp_rewriter(from_format, to_format, source=None, target=None):
+    """Return a re.sub callback rewriting timestamps matched by stream_pattern.
+
+    Output is formatted once per distinct second and cached, since
+    consecutive log lines mostly share their timestamp. Fractions of a
+    second are carried over to iso and unix output and dropped otherwise;
+    strptime formats are cached per matched text. Timestamps that do not
+    parse are left as they are.
+    """
+    formatter = time_formatter(to_format, target)
+    keep_fraction = to_format in UNIX_FORMATS or to_format in ["iso", "iso8601"]
+    # The fraction goes after the seconds, before any UTC offset
+    fraction_at = None if to_format in UNIX_FORMATS else 19
+    cache = {}
+
+    def parse_epoch(text):
+        return datetime.fromtimestamp(int(text), source)
+
+    def parse_iso(text):
+        dt = datetime.fromisoformat(text)
+        if source is not None and dt.tzinfo is None:
+            dt = dt.replace(tzinfo=source)
+        return dt
+
+    def format_second(key, parse, text):
+        """Format and cache a second not seen yet; None if it does not parse."""
+        try:
+            result = formatter(parse(text))
+        except (ValueError, OverflowError, OSError):
+            return None
+        if len(cache) >= STREAM_CACHE_SIZE:
+            cache.clear()
+        cache[key] = result
+        return result
+
+    def with_fraction(result, fraction):
+        if fraction_at is None:
+            return result + fraction
+        return result[:fraction_at] + fraction + result[fraction_at:]
+
+    def rewrite_epoch(match, first=1):
+        second, fraction = match.group(first, first + 1)
+        result = cache.get(second)
+        if result is None:
+            result = format_second(second, parse_epoch, second)
+            if result is None:
+                return match.group()
+        if fraction and keep_fraction:
+            return with_fraction(result, fraction)
+        return result
+
+    def rewrite_iso(match, first=1):
+        second, fraction, offset = match.group(first, first + 1, first + 2)
+        key = (second, offset)
+        result = cache.get(key)
+        if result is None:
+            if offset == "Z":
+                offset = "+00:00"
+            result = format_second(key, parse_iso, second + (offset or ""))
+            if result is None:
+                return match.group()
+        if fraction and keep_fraction:
+            return with_fraction(result, fraction)
+        return result
+
+    def rewrite_custom(match):
+        text = match.group()
+        result = cache.get(text)
+        if result is None:
+            result = format_second(text, parse_custom, text)
+            if result is None:
+                return text
+        return result
+
+    if "%" in from_format:
+        parse_custom = functools.partial(parse_time, from_format, tz=source)
+        return rewrite_custom
+    elif from_format in UNIX_FORMATS:
+        return rewrite_epoch
+    elif from_format in ISO_FORMATS:
+        return rewrite_iso
+    # Auto: epoch groups come first, then ISO groups
+    return lambda match: (
+        rewrite_epoch(match) if match.lastindex <= 2 else rewrite_iso(match, 3)
+    )
+
+
+def rewrite_timestamps(lines, from_format, to_format, out=None, zones=(None, None)):
+    """Rewrite every timestamp found in lines, writing the result to out.
+
+    zones is the (source, target) pair from resolve_zones. Lines are
+    rewritten in blocks of about READ_LINES_HINT bytes, so the regex runs
+    over large strings rather than once per line.
+    """
+    out = out or sys.stdout
+    pattern = stream_pattern(from_format)
+    rewrite = timestamp_rewriter(from_format, to_format, *zones)
+    for block in iter(lambda: lines.readlines(READ_LINES_HINT), []):
+        out.write(pattern.sub(rewrite, "".join(block)))
+
+
+def _epoch_offsets(np, epochs, zone):
+    """Return the UTC offsets of a zone at every epoch of an int64 array."""
+    hours, inverse = np.unique(epochs // 3600, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    hour_offsets = [_hour_offset(zone, hour) for hour in hours.tolist()]
+    offsets = np.array([offset or 0 for offset in hour_offsets], dtype=np.int64)
+    offsets = offsets[inverse]
+    for index, offset in enumerate(hour_offsets):
+        if offset is None:
+            # An hour with a transition: look its epochs up one by one
+            for position in np.flatnonzero(inverse == index).tolist():
+                offsets[position] = offset_at(zone, int(epochs[position]))
+    return offsets
+
+
+def format_epochs(epochs, to_format, zone=None, np=None):
+    """Format a sequence of epoch seconds in a target format.
+
+    With NumPy the epochs are shifted by their zone offsets and formatted
+    as datetime64 in one pass; otherwise each distinct epoch is formatted
+    once. Without a zone times are naive local times, as in convert().
+    Raises ValueError or OverflowError on values out of range.
+    """
+    if to_format in UNIX_FORMATS:
+        return [str(epoch) for epoch in epochs]
+
+    if np is None:
+        formatter = time_formatter(to_format)
+        found = {}
+        results = []
+        for epoch in epochs:
+            result = found.get(epoch)
+            if result is None:
+                offset = utc_offset(zone, epoch)
+                dt = UNIX_EPOCH + timedelta(seconds=epoch + offset)
+                if zone is not None:
+                    dt = dt.replace(tzinfo=fixed_zone(offset))
+                result = found[epoch] = formatter(dt)
+            results.append(result)
+        return results
+
+    epochs = np.asarray(epochs, dtype=np.int64)
+    offsets = _epoch_offsets(np, epochs, zone)
+    local = (epochs + offsets).astype("datetime64[s]")
+    if to_format == "date":
+        return np.datetime_as_string(local.astype("datetime64[D]")).tolist()
+    strings = np.datetime_as_string(local, unit="s").tolist()
+    if to_format == "time":
+        return [value[11:] for value in strings]
+    if to_format == "datetime":
+        return [value[:10] + " " + value[11:] for value in strings]
+    if zone is None:
+        return strings
+    suffixes = [offset_suffix(offset) for offset in offsets.tolist()]
+    return [value + suffix for value, suffix in zip(strings, suffixes)]
+
+
+def convert_batch(values, from_format, to_format, source=None, target=None):
+    """Convert a batch of values, returning (result, error) for each value.
+
+    Epochs go through format_epochs, with NumPy when it is installed; other
+    sources, and batches holding an invalid epoch, are parsed one by one.
+    """
+    if from_format in UNIX_FORMATS:
+        np = numpy_module()
+        try:
+            if np is not None:
+                epochs = np.array(values).astype(np.int64)
+            else:
+                epochs = [int(value) for value in values]
+            results = format_epochs(epochs, to_format, target, np)
+            return [(result, None) for result in results]
+        except (ValueError, OverflowError, OSError):
+            pass
+
+    formatter = time_formatter(to_format, target)
+    results = []
+    for value in values:
+        try:
+            results.append((formatter(parse_time(from_format, value, source)), None))
+        except (ValueError, OverflowError, OSError) as e:
+            results.append((None, e))
+    return results
+
+
+def convert_lines(lines, from_format, to_format, zones=(None, None), out=None):
+    """Convert one value per line, writing results to out in large batches.
+
+    Blank lines are skipped and invalid values are reported on stderr with
+    their line number. Returns the number of invalid values.
+    """
+    out = out or sys.stdout
+    failed = 0
+    numbered = enumerate(lines, 1)
+    while True:
+        batch = list(itertools.islice(numbered, BATCH_LINES))
+        if not batch:
+            return failed
+        batch = [(number, line.strip()) for number, line in batch if line.strip()]
+        values = [value for _, value in batch]
+        output = []
+        results = convert_batch(values, from_format, to_format, *zones)
+        for (number, value), (result, error) in zip(batch, results):
+            if error is None:
+                output.append(result)
+                continue
+            print(
+                f"Error: line {number}: Invalid {from_format} value '{value}': {error}",
+                file=sys.stderr,
+            )
+            failed += 1
+        if output:
+            out.write("\n".join(output) + "\n")
+
+
 def handle_command(args):
     """Handle time conversion command."""
-    result = convert(args.from_format, args.value, args.to_format)
+    zones = resolve_zones(args.tz, args.to_tz)
+    if args.from_format_string:
+        # The source format comes from the option, so the positionals shift
+        if args.to_format is not None:
+            print(
+                "Error: With --from-format give only the value and target format",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        args.value, args.to_format = args.from_format, args.value
+        args.from_format = args.from_format_string
+    if args.stream:
+        if args.to_format is None:
+            # With --stream the value positional is left out
+            args.to_format, args.value = args.value, None
+        from_format = source_format(args.from_format)
+        to_format = (args.to_format or "").lower()
+        if args.value is not None or stream_pattern(from_format) is None:
+            print(
+                "Error: --stream takes a source format (unix, iso, auto or --from-format) and a target format",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+        if time_formatter(to_format) is None:
+            print(f"Error: Unsupported target format '{to_format}'", file=sys.stderr)
+            sys.exit(1)
+        rewrite_timestamps(sys.stdin, from_format, to_format, zones=zones)
+        return
+    if args.to_format is None and args.from_format.lower() == "now":
+        args.to_format, args.value = args.value, None
+    if args.to_format is None:
+        print("Error: A value and a target format are required", file=sys.stderr)
+        sys.exit(1)
+
+    if args.value == "-":
+        from_format = source_format(args.from_format)
+        to_format = args.to_format.lower()
+        if time_formatter(to_format) is None:
+            print(f"Error: Unsupported target format '{to_format}'", file=sys.stderr)
+            sys.exit(1)
+        if convert_lines(sys.stdin, from_format, to_format, zones):
+            sys.exit(1)
+        return
+
+    result = convert(args.from_format, args.value, args.to_format, args.tz, args.to_tz)
     print(result)
 
 
@@ -51,15 +469,42 @@ def setup_parser(subparsers):
     time_parser = subparsers.add_parser(
         "time",
         help="Convert time formats",
-        description="Convert between Unix timestamp, ISO format, and datetime.",
+        description="Convert between Unix timestamp, ISO format, and datetime, in any time zone.",
     )
     time_parser.add_argument(
-        "from_format", type=str, help="Source format: unix, iso, now"
+        "from_format", type=str, help="Source format: unix, iso, auto, now"
+    )
+    time_parser.add_argument(
+        "value",
+        type=str,
+        nargs="?",
+        help="Time value to convert, or - to convert one value per line from stdin",
     )
-    time_parser.add_argument("value", type=str, help="Time value to convert")
     time_parser.add_argument(
         "to_format",
         type=str,
+        nargs="?",
         help="Target format: unix, iso, date, time, datetime",
     )
+    time_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Rewrite every timestamp of the source format found in stdin lines (e.g. unix iso --stream < app.log)",
+    )
+    time_parser.add_argument(
+        "--from-format",
+        dest="from_format_string",
+        type=str,
+        help="Parse input with a strptime format instead of a source format name, e.g. '%%d/%%b/%%Y:%%H:%%M:%%S %%z' for Apache logs",
+    )
+    time_parser.add_argument(
+        "--tz",
+        type=str,
+        help="Time zone of the input, e.g. Europe/Paris (default: local time); epochs are shown in it",
+    )
+    time_parser.add_argument(
+        "--to-tz",
+        type=str,
+        help="Time zone to convert the output to (default: --tz)",
+    )
     time_parser.set_defaults(func=handle_command)
@@ -0,0 +1,161 @@
+"""
+Compiled strptime formats for bulk time parsing.
+
+A format such as "%d/%b/%Y:%H:%M:%S %z" is compiled once into a parser.
+When every directive has a fixed width the parser slices fields at known
+offsets and builds the datetime directly, which is several times faster
+than datetime.strptime; values that do not fit the fixed layout, and
+formats with variable-width directives, go through datetime.strptime. Each
+format also gets a regex for finding its timestamps inside log lines.
+"""
+
+import functools
+import operator
+import re
+from datetime import datetime, timedelta, timezone
+
+# Directive: (regex finding it in text, width in the fast path or None)
+DIRECTIVES = {
+    "Y": (r"\d{4}", 4),
+    "y": (r"\d\d", 2),
+    "m": (r"\d{1,2}", 2),
+    "d": (r"\d{1,2}", 2),
+    "H": (r"\d{1,2}", 2),
+    "M": (r"\d{1,2}", 2),
+    "S": (r"\d{1,2}", 2),
+    "b": (r"[A-Za-z]{3}", 3),
+    "h": (r"[A-Za-z]{3}", 3),
+    "z": (r"Z|[+-]\d\d(?::?\d\d(?::?\d\d)?)?", 5),
+    "f": (r"\d{1,6}", None),
+    "j": (r"\d{1,3}", None),
+    "I": (r"\d{1,2}", None),
+    "p": (r"[AaPp][Mm]", None),
+    "a": (r"[A-Za-z]+", None),
+    "A": (r"[A-Za-z]+", None),
+    "B": (r"[A-Za-z]+", None),
+    "Z": (r"[A-Za-z]+", None),
+}
+# Fixed-width numeric directive: index in datetime(year, month, day, ...)
+FIELD_INDEX = {"Y": 0, "y": 0, "m": 1, "d": 2, "H": 3, "M": 4, "S": 5}
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun"]
+        + ["jul", "aug", "sep", "oct", "nov", "dec"],
+        1,
+    )
+}
+
+_TOKENS = re.compile(r"%(.)|([^%]+)", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=None)
+def offset_zone(text):
+    """Return the tzinfo of a +HHMM offset, or None if text is not one."""
+    if len(text) != 5 or text[0] not in "+-" or not text[1:].isdigit():
+        return None
+    hours, minutes = int(text[1:3]), int(text[3:])
+    if hours > 23 or minutes > 59:
+        return None
+    minutes += hours * 60
+    return timezone(timedelta(minutes=-minutes if text[0] == "-" else minutes))
+
+
+def _slicer(spans):
+    """Return a function taking the tuple of slices spans of a string."""
+    if len(spans) == 1:
+        span = spans[0]
+        return lambda text: (text[span],)
+    if not spans:
+        return lambda text: ()
+    return operator.itemgetter(*spans)
+
+
+def _fixed_parser(fmt, tokens):
+    """Build the slicing parser for a fixed-width format, or None."""
+    offset = 0
+    literals, numbers, targets = [], [], []
+    month = zone = None
+    for directive, literal in tokens:
+        if literal or directive == "%":
+            literal = literal or "%"
+            literals.append((slice(offset, offset + len(literal)), literal))
+            offset += len(literal)
+            continue
+        width = DIRECTIVES.get(directive, (None, None))[1]
+        if width is None:
+            return None
+        span = slice(offset, offset + width)
+        if directive in FIELD_INDEX:
+            numbers.append(span)
+            targets.append((FIELD_INDEX[directive], directive == "y"))
+        elif directive in "bh":
+            month = span
+        else:
+            zone = span
+        offset += width
+    if not numbers:
+        return None
+
+    width = offset
+    get_numbers = _slicer(numbers)
+    get_literals = _slicer([span for span, _ in literals])
+    expected = tuple(literal for _, literal in literals)
+
+    def parse(text):
+        if len(text) != width or get_literals(text) != expected:
+            return datetime.strptime(text, fmt)
+        parts = get_numbers(text)
+        if not "".join(parts).isdigit():
+            return datetime.strptime(text, fmt)
+
+        fields = [1900, 1, 1, 0, 0, 0]
+        for (index, short_year), part in zip(targets, parts):
+            value = int(part)
+            if short_year:
+                value += 2000 if value < 69 else 1900
+            fields[index] = value
+        if month is not None:
+            fields[1] = MONTHS.get(text[month].lower())
+            if fields[1] is None:
+                return datetime.strptime(text, fmt)
+        tzinfo = None
+        if zone is not None:
+            tzinfo = offset_zone(text[zone])
+            if tzinfo is None:
+                return datetime.strptime(text, fmt)
+        try:
+            return datetime(*fields, tzinfo=tzinfo)
+        except ValueError:
+            # Let strptime report out-of-range fields
+            return datetime.strptime(text, fmt)
+
+    return parse
+
+
+@functools.lru_cache(maxsize=None)
+def compile_format(fmt):
+    """Compile a strptime format into (parse, search regex).
+
+    parse turns a string into a datetime and raises ValueError like
+    datetime.strptime. The regex finds timestamps of the format in text;
+    it is None if the format has directives it cannot search for.
+    """
+    tokens = _TOKENS.findall(fmt)
+    parse = _fixed_parser(fmt, tokens)
+    if parse is None:
+
+        def parse(text):
+            return datetime.strptime(text, fmt)
+
+    pieces = []
+    for directive, literal in tokens:
+        if literal or directive == "%":
+            # strptime lets whitespace in the format match any run of it
+            for part in re.split(r"(\s+)", literal or "%"):
+                pieces.append(r"\s+" if part.isspace() else re.escape(part))
+        elif directive in DIRECTIVES:
+            pieces.append(f"(?:{DIRECTIVES[directive][0]})")
+        else:
+            return parse, None
+    return parse, re.compile("".join(pieces))
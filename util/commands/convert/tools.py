@@ -0,0 +1,174 @@
+"""
+Discovery of the external tools conversions shell out to (ffmpeg, pandoc).
+
+Tools are resolved with shutil.which. Their version, and for pandoc the
+formats it can read and write, are cached on disk keyed by the binary's path, mtime
+and size, so repeated runs skip the probe subprocesses until the binary
+changes.
+"""
+
+import functools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+
+from .cache import default_cache_dir
+
+TOOLS_CACHE_VERSION = 3
+
+# Tool name: (version arguments, {entry field: arguments listing formats})
+TOOL_PROBES = {
+    "ffmpeg": (["-version"], {}),
+    "pandoc": (
+        ["--version"],
+        {
+            "writers": ["--list-output-formats"],
+            "readers": ["--list-input-formats"],
+        },
+    ),
+}
+
+# Tool name: (Windows install command, download page)
+TOOL_DOWNLOADS = {
+    "ffmpeg": (
+        "choco install ffmpeg  # or download from ffmpeg.org",
+        "ffmpeg.org/download.html",
+    ),
+    "pandoc": (
+        "choco install pandoc  # or download from pandoc.org",
+        "pandoc.org/installing.html",
+    ),
+}
+
+
+def tools_cache_path():
+    """Return the path of the on-disk tool probe cache."""
+    return os.path.join(default_cache_dir("tools"), "tools.json")
+
+
+def _load_probes(path):
+    """Read cached probes, ignoring a missing, corrupt or outdated cache."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != TOOLS_CACHE_VERSION:
+        return {}
+    return data.get("tools", {})
+
+
+def _save_probes(path, probes):
+    """Atomically write probes, dropping entries for binaries that are gone."""
+    probes = {key: entry for key, entry in probes.items() if os.path.exists(key)}
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": TOOLS_CACHE_VERSION, "tools": probes}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _run_probe(path, args):
+    """Run a tool with probe arguments and return its stdout, or None."""
+    try:
+        result = subprocess.run(
+            [path] + args,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    return result.stdout
+
+
+@functools.lru_cache(maxsize=None)
+def probe_tool(name):
+    """Return {"path", "version", ...} for an installed tool.
+
+    pandoc entries also hold "readers" and "writers", the input and output
+    formats it lists.
+
+    Returns None when the tool is not on PATH or does not run.
+    """
+    path = shutil.which(name)
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    fingerprint = [stat.st_mtime_ns, stat.st_size]
+
+    cache_path = tools_cache_path()
+    probes = _load_probes(cache_path)
+    cached = probes.get(path)
+    if (
+        cached
+        and cached.get("name") == name
+        and cached.get("fingerprint") == fingerprint
+    ):
+        return cached
+
+    version_args, format_probes = TOOL_PROBES[name]
+    output = _run_probe(path, version_args)
+    if output is None:
+        return None
+
+    entry = {
+        "name": name,
+        "path": path,
+        "fingerprint": fingerprint,
+        "version": (output.splitlines() or [name])[0].strip(),
+    }
+    for field, args in format_probes.items():
+        entry[field] = (_run_probe(path, args) or "").split()
+    probes[path] = entry
+    _save_probes(cache_path, probes)
+    return entry
+
+
+@functools.lru_cache(maxsize=None)
+def linux_install_command():
+    """Return the package install command for this Linux distro, or None."""
+    try:
+        with open("/etc/os-release") as f:
+            os_info = f.read().lower()
+    except OSError:
+        return None
+    if "ubuntu" in os_info or "debian" in os_info:
+        return "sudo apt install"
+    elif "fedora" in os_info or "rhel" in os_info or "centos" in os_info:
+        return "sudo dnf install"
+    elif "arch" in os_info:
+        return "sudo pacman -S"
+    return None
+
+
+def install_instructions(name):
+    """Get OS-specific installation instructions for a tool."""
+    system = platform.system()
+    windows, download_page = TOOL_DOWNLOADS[name]
+
+    if system == "Darwin":  # macOS
+        return f"brew install {name}"
+    elif system == "Linux":
+        command = linux_install_command()
+        if command:
+            return f"{command} {name}"
+        return f"sudo apt install {name}  # or dnf/yum/pacman depending on your distro"
+    elif system == "Windows":
+        return windows
+    else:
+        return f"Visit: https://{download_page}"
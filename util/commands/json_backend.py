@@ -0,0 +1,112 @@
+"""
+JSON backend shared by every command that parses or emits JSON.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Set UTIL_JSON_BACKEND=stdlib to force the standard library.
+"""
+
+import datetime
+import json
+import math
+import os
+import re
+
+try:
+    if os.environ.get("UTIL_JSON_BACKEND", "").lower() == "stdlib":
+        raise ImportError
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses this, so callers can catch one type
+JSONDecodeError = json.JSONDecodeError
+
+# orjson silently turns integers wider than 64 bits into floats, so documents
+# containing 19+ digit runs are left to the standard library
+_LONG_DIGITS = re.compile(r"\d{19,}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{19,}")
+
+
+def _has_non_finite(obj):
+    """Return True if obj holds a NaN or infinite float, as a value or key."""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value)
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _isoformat(value):
+    """Default serializer writing dates and times (YAML, TOML) as ISO 8601."""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def backend_name():
+    """Return the name of the active JSON backend."""
+    return "orjson" if ORJSON_AVAILABLE else "json"
+
+
+def loads(data):
+    """Parse a JSON document from str or bytes."""
+    long_digits = _LONG_DIGITS_BYTES if isinstance(data, bytes) else _LONG_DIGITS
+    if ORJSON_AVAILABLE and not long_digits.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (NaN, lone surrogates); let the stdlib
+            # decide so results and error messages match the fallback
+            pass
+    return json.loads(data)
+
+
+def dumps(obj, compact=False, ensure_ascii=False, sort_keys=False, default=None):
+    """Serialize obj to a JSON string.
+
+    Output is indented by two spaces unless compact is set, in which case no
+    whitespace is emitted at all. Dates and times are written as ISO 8601
+    strings unless default handles them; both backends pass them to the
+    same default so their output matches.
+    """
+    default = default or _isoformat
+    if ORJSON_AVAILABLE and not ensure_ascii:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            output = orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            output = None  # e.g. integers wider than 64 bits; the stdlib handles them
+        # orjson writes NaN and infinities as null where the stdlib writes
+        # NaN and Infinity, so only trust output without nulls or with none
+        # of those floats
+        if output is not None and (b"null" not in output or not _has_non_finite(obj)):
+            return output.decode("utf-8")
+
+    if compact:
+        return json.dumps(
+            obj,
+            ensure_ascii=ensure_ascii,
+            sort_keys=sort_keys,
+            default=default,
+            separators=(",", ":"),
+        )
+    return json.dumps(
+        obj,
+        indent=2,
+        ensure_ascii=ensure_ascii,
+        sort_keys=sort_keys,
+        default=default,
+    )
@@ -1,6 +1,5 @@
 import base64
 import hashlib
-import json
 import os
 import re
 import sys
@@ -11,13 +10,15 @@ import tomli
 import xmltodict
 import yaml
 
+from . import json_backend
+
 
 def validate_json(content: str) -> tuple[bool, Optional[str]]:
     """Validate JSON syntax."""
     try:
-        json.loads(content)
+        json_backend.loads(content)
         return True, None
-    except json.JSONDecodeError as e:
+    except json_backend.JSONDecodeError as e:
         return False, str(e)
 
 